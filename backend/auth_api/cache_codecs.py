@@ -0,0 +1,200 @@
+"""Serializers and compressors for the django_redis caches.
+
+Selected per cache alias in settings.CACHES through OPTIONS:
+
+    'SERIALIZER': 'auth_api.cache_codecs.MsgpackSerializer',
+    'COMPRESSOR': 'auth_api.cache_codecs.ThresholdCompressor',
+    'COMPRESS_MIN_LEN': 1024,
+    'COMPRESS_ALGORITHM': 'lz4',
+
+MsgpackSerializer keeps datetimes, dates, Decimals, UUIDs and sets intact
+(JSON turns them into strings); Pickle5Serializer stores any picklable
+value. ThresholdCompressor leaves payloads under COMPRESS_MIN_LEN bytes
+alone and compresses larger ones with lz4, zstd or zlib, whichever is
+configured (or the first one installed). A one-byte header records how
+each value was stored, so the threshold and algorithm can change without
+flushing the cache. It also remembers the size of the last value it
+produced on each thread; `take_written_size()` hands that to the cache
+telemetry, which records the bytes actually sent to Redis.
+
+Neither msgpack nor lz4 is required: settings falls back to django_redis'
+JSONSerializer when msgpack is missing (or CACHE_MSGPACK=False) and
+ThresholdCompressor to zstd or zlib without lz4.
+
+Switching serializer changes the stored format: bump the alias VERSION
+at the same time so entries written by the old serializer are not read
+(settings.CACHE_CODEC_VERSION does this for the msgpack/JSON switch).
+"""
+
+import datetime
+import decimal
+import pickle
+import threading
+import uuid
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from django_redis.exceptions import CompressorError
+except ImportError:
+    class CompressorError(Exception):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Serializers
+# ----------------------------------------------------------------------
+
+# msgpack extension type codes
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_DECIMAL = 3
+EXT_UUID = 4
+EXT_SET = 5
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime.datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, datetime.date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    if isinstance(value, decimal.Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, value.bytes)
+    if isinstance(value, (set, frozenset)):
+        return msgpack.ExtType(EXT_SET, msgpack.packb(list(value), default=_msgpack_default, use_bin_type=True))
+    raise TypeError(f"Cannot serialize {type(value).__name__} for the cache")
+
+
+def _msgpack_ext_hook(code, data):
+    if code == EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return datetime.date.fromisoformat(data.decode())
+    if code == EXT_DECIMAL:
+        return decimal.Decimal(data.decode())
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == EXT_SET:
+        return set(_msgpack_loads(data))
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_loads(data):
+    return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+class MsgpackSerializer:
+    """msgpack with extension types for datetime, date, Decimal, UUID and set."""
+
+    def __init__(self, options=None):
+        if msgpack is None:
+            raise ImportError("MsgpackSerializer requires the msgpack package")
+
+    def dumps(self, value):
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+    def loads(self, value):
+        return _msgpack_loads(value)
+
+
+class Pickle5Serializer:
+    """pickle protocol 5; only for caches no untrusted party can write to."""
+
+    def __init__(self, options=None):
+        pass
+
+    def dumps(self, value):
+        return pickle.dumps(value, protocol=5)
+
+    def loads(self, value):
+        return pickle.loads(value)
+
+
+# ----------------------------------------------------------------------
+# Compressors
+# ----------------------------------------------------------------------
+
+HEADER_RAW = b'\x00'
+HEADER_ZLIB = b'\x01'
+HEADER_LZ4 = b'\x02'
+HEADER_ZSTD = b'\x03'
+
+
+_written = threading.local()
+
+
+def take_written_size():
+    """Size of the last value compressed on this thread, or None; clears it"""
+    size = getattr(_written, 'size', None)
+    _written.size = None
+    return size
+
+
+def available_algorithms():
+    """Compression algorithms usable in this environment, fastest first"""
+    algorithms = []
+    if lz4_frame is not None:
+        algorithms.append('lz4')
+    if zstandard is not None:
+        algorithms.append('zstd')
+    algorithms.append('zlib')
+    return algorithms
+
+
+class ThresholdCompressor:
+    """Compresses values of at least COMPRESS_MIN_LEN bytes, stores smaller ones as is."""
+
+    def __init__(self, options=None):
+        options = options or {}
+        self.min_length = options.get('COMPRESS_MIN_LEN', 1024)
+        self.algorithm = options.get('COMPRESS_ALGORITHM') or available_algorithms()[0]
+        self.level = options.get('COMPRESS_LEVEL')
+        if self.algorithm not in available_algorithms():
+            raise ImportError(f"Compression algorithm {self.algorithm} is not installed")
+        if self.algorithm == 'zstd':
+            self._zstd_compressor = zstandard.ZstdCompressor(level=self.level or 3)
+
+    def compress(self, value):
+        stored = self._compress(value)
+        _written.size = len(stored)
+        return stored
+
+    def _compress(self, value):
+        if len(value) < self.min_length:
+            return HEADER_RAW + value
+        if self.algorithm == 'lz4':
+            return HEADER_LZ4 + lz4_frame.compress(value, compression_level=self.level or 0)
+        if self.algorithm == 'zstd':
+            return HEADER_ZSTD + self._zstd_compressor.compress(value)
+        return HEADER_ZLIB + zlib.compress(value, self.level or 6)
+
+    def decompress(self, value):
+        header, body = value[:1], value[1:]
+        try:
+            if header == HEADER_RAW:
+                return body
+            if header == HEADER_LZ4 and lz4_frame is not None:
+                return lz4_frame.decompress(body)
+            if header == HEADER_ZSTD and zstandard is not None:
+                return zstandard.ZstdDecompressor().decompress(body)
+            if header == HEADER_ZLIB:
+                return zlib.decompress(body)
+        except Exception as e:
+            raise CompressorError(e)
+        raise CompressorError(f"Unknown or unavailable compression header {header!r}")
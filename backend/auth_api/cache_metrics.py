@@ -0,0 +1,323 @@
+"""Cache telemetry.
+
+`instrumented_cache(alias)` wraps the (possibly two-tier) cache of an
+alias and records every operation in the process-wide `cache_metrics`:
+hits, misses, sets, deletes and errors per namespace, an operation
+latency histogram, written payload sizes, and the hottest keys read,
+estimated with a count-min sketch so memory stays bounded.
+
+Payload sizes are the bytes ThresholdCompressor produced for the write,
+i.e. after serialization and compression; nothing is encoded twice.
+Aliases without that compressor report no payload sizes.
+
+Counters are per process; `snapshot()` adds server-wide numbers from
+Redis INFO (memory, keys per DB, evictions) when the caches are Redis.
+`prometheus_text()` renders everything in the Prometheus text format.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .cache_codecs import take_written_size
+from .local_cache import MISSING, key_namespace, tier_stats, tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HOT_KEYS = 20
+
+
+class CountMinSketch:
+    """Approximate per-key counts in fixed memory (never under-estimates)."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], 'big') % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        """Count `key` and return its new estimate"""
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key):
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+
+class CacheMetrics:
+    """Thread-safe in-process cache counters."""
+
+    def __init__(self, hot_keys=HOT_KEYS):
+        self.hot_keys = hot_keys
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.payloads = {}
+            self.latency = {}
+            self.sketch = CountMinSketch()
+            self.top = {}
+
+    def count(self, alias, key, name, amount=1):
+        counter = (alias, key_namespace(key), name)
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def observe(self, alias, op, seconds):
+        with self._lock:
+            histogram = self.latency.get((alias, op))
+            if histogram is None:
+                histogram = self.latency[(alias, op)] = {'buckets': [0] * len(LATENCY_BUCKETS), 'count': 0, 'sum': 0.0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+
+    def payload(self, alias, key, size):
+        counter = (alias, key_namespace(key))
+        with self._lock:
+            total = self.payloads.setdefault(counter, [0, 0, 0])
+            total[0] += 1
+            total[1] += size
+            total[2] = max(total[2], size)
+
+    def read(self, alias, key):
+        name = f"{alias}/{key}"
+        with self._lock:
+            estimate = self.sketch.add(name)
+            if name in self.top or len(self.top) < self.hot_keys:
+                self.top[name] = estimate
+                return
+            coldest = min(self.top, key=self.top.get)
+            if estimate > self.top[coldest]:
+                del self.top[coldest]
+                self.top[name] = estimate
+
+    def hottest(self):
+        with self._lock:
+            return sorted(self.top.items(), key=lambda item: item[1], reverse=True)
+
+    def snapshot(self):
+        """Per-alias counters, latencies and payload sizes plus hot keys, L1 and Redis figures"""
+        with self._lock:
+            counters = dict(self.counters)
+            payloads = {counter: list(total) for counter, total in self.payloads.items()}
+            latency = {op: {**h, 'buckets': list(h['buckets'])} for op, h in self.latency.items()}
+
+        aliases = {}
+        for (alias, namespace, name), value in counters.items():
+            entry = aliases.setdefault(alias, {'namespaces': {}, 'latency': {}})
+            ns = entry['namespaces'].setdefault(namespace, {})
+            ns[name] = ns.get(name, 0) + value
+            entry[name] = entry.get(name, 0) + value
+        for (alias, namespace), (count, total, largest) in payloads.items():
+            ns = aliases.setdefault(alias, {'namespaces': {}, 'latency': {}})['namespaces'].setdefault(namespace, {})
+            ns.update({'payload_bytes_avg': round(total / count), 'payload_bytes_max': largest})
+        for (alias, op), histogram in latency.items():
+            aliases.setdefault(alias, {'namespaces': {}, 'latency': {}})['latency'][op] = {
+                'count': histogram['count'],
+                'avg_ms': round(histogram['sum'] / histogram['count'] * 1000, 3),
+                'sum_seconds': round(histogram['sum'], 6),
+                # Count per bucket upper bound (seconds), not cumulative
+                'buckets': {str(bound): count for bound, count in zip(LATENCY_BUCKETS, histogram['buckets'])},
+            }
+        for entry in aliases.values():
+            lookups = entry.get('hits', 0) + entry.get('misses', 0)
+            entry['hit_ratio'] = round(entry.get('hits', 0) / lookups, 4) if lookups else 0.0
+
+        return {
+            'aliases': aliases,
+            'hot_keys': [{'key': key, 'reads': reads} for key, reads in self.hottest()],
+            'l1': tier_stats(),
+            'redis': redis_info(aliases),
+        }
+
+
+def redis_info(aliases):
+    """Server-wide memory, key counts and evictions for each Redis-backed alias"""
+    info = {}
+    for alias in aliases:
+        try:
+            from django_redis import get_redis_connection
+            server = get_redis_connection(alias).info()
+        except Exception:
+            continue
+        info[alias] = {
+            'used_memory': server.get('used_memory'),
+            'evicted_keys': server.get('evicted_keys'),
+            'expired_keys': server.get('expired_keys'),
+            'keyspace_hits': server.get('keyspace_hits'),
+            'keyspace_misses': server.get('keyspace_misses'),
+            'keyspace': {name: value for name, value in server.items() if name.startswith('db')},
+        }
+    return info
+
+
+class InstrumentedCache:
+    """Django cache API recording every operation in a CacheMetrics."""
+
+    def __init__(self, cache, alias, metrics):
+        self.cache = cache
+        self.alias = alias
+        self.metrics = metrics
+
+    def _timed(self, op, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            self.metrics.count(self.alias, args[0] if args and isinstance(args[0], str) else '', 'errors')
+            raise
+        finally:
+            self.metrics.observe(self.alias, op, time.perf_counter() - started)
+
+    def get(self, key, default=None, version=None):
+        value = self._timed('get', self.cache.get, key, MISSING, version=version)
+        self.metrics.read(self.alias, key)
+        if value is MISSING:
+            self.metrics.count(self.alias, key, 'misses')
+            return default
+        self.metrics.count(self.alias, key, 'hits')
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._timed('get_many', self.cache.get_many, keys, version=version)
+        for key in keys:
+            self.metrics.read(self.alias, key)
+            self.metrics.count(self.alias, key, 'hits' if key in found else 'misses')
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.metrics.count(self.alias, key, 'sets')
+        take_written_size()
+        result = self._timed('set', self.cache.set, key, value, timeout, version=version)
+        size = take_written_size()
+        if size is not None:
+            self.metrics.payload(self.alias, key, size)
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._timed('add', self.cache.add, key, value, timeout, version=version)
+        if added:
+            self.metrics.count(self.alias, key, 'sets')
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        return self._timed('incr', self.cache.incr, key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self._timed('decr', self.cache.decr, key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._timed('touch', self.cache.touch, key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.metrics.count(self.alias, key, 'deletes')
+        return self._timed('delete', self.cache.delete, key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self.metrics.count(self.alias, key, 'deletes')
+        return self._timed('delete_many', self.cache.delete_many, keys, version=version)
+
+    def clear(self):
+        return self._timed('clear', self.cache.clear)
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+
+cache_metrics = CacheMetrics()
+
+_instrumented = {}
+_instrumented_lock = threading.Lock()
+
+
+def instrumented_cache(alias='default'):
+    """The cache of `alias` (two-tier when L1 is enabled) with telemetry"""
+    with _instrumented_lock:
+        cache = _instrumented.get(alias)
+        if cache is None:
+            cache = _instrumented[alias] = InstrumentedCache(tiered_cache(alias), alias, cache_metrics)
+        return cache
+
+
+def _labels(**labels):
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in labels.items()
+    ) + '}'
+
+
+def prometheus_text(snapshot=None):
+    """Render a snapshot in the Prometheus text exposition format (0.0.4)"""
+    snapshot = snapshot or cache_metrics.snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP careerquest_cache_{name} {help_text}")
+        lines.append(f"# TYPE careerquest_cache_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"careerquest_cache_{name}{suffix}{_labels(**labels)} {value}")
+
+    aliases = snapshot['aliases']
+    for name, help_text in (('hits', 'Cache hits'), ('misses', 'Cache misses'), ('sets', 'Cache writes'),
+                            ('deletes', 'Cache deletes'), ('errors', 'Failed cache operations')):
+        metric(f"{name}_total", 'counter', help_text, [
+            ('', {'alias': alias, 'namespace': ns}, counts.get(name, 0))
+            for alias, entry in aliases.items() for ns, counts in entry['namespaces'].items()
+        ])
+
+    metric('payload_bytes_avg', 'gauge', 'Average size of written values (bytes stored, after serialization and compression)', [
+        ('', {'alias': alias, 'namespace': ns}, counts['payload_bytes_avg'])
+        for alias, entry in aliases.items() for ns, counts in entry['namespaces'].items() if 'payload_bytes_avg' in counts
+    ])
+
+    samples = []
+    for alias, entry in aliases.items():
+        for op, histogram in entry['latency'].items():
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                samples.append(('_bucket', {'alias': alias, 'op': op, 'le': bound}, cumulative))
+            samples.append(('_bucket', {'alias': alias, 'op': op, 'le': '+Inf'}, histogram['count']))
+            samples.append(('_sum', {'alias': alias, 'op': op}, histogram['sum_seconds']))
+            samples.append(('_count', {'alias': alias, 'op': op}, histogram['count']))
+    metric('operation_seconds', 'histogram', 'Cache operation latency', samples)
+
+    metric('l1_evictions_total', 'counter', 'Entries evicted from the in-process L1', [
+        ('', {'alias': alias}, tier['l1_evictions']) for alias, tier in snapshot['l1'].items()
+    ])
+    metric('l1_hits_total', 'counter', 'Reads answered by the in-process L1', [
+        ('', {'alias': alias}, tier['l1_hits']) for alias, tier in snapshot['l1'].items()
+    ])
+    metric('hot_key_reads', 'gauge', 'Estimated reads of the hottest keys (count-min sketch)', [
+        ('', {'key': hot['key']}, hot['reads']) for hot in snapshot['hot_keys']
+    ])
+    metric('redis_used_memory_bytes', 'gauge', 'Memory used by the Redis server', [
+        ('', {'alias': alias}, info['used_memory']) for alias, info in snapshot['redis'].items()
+        if info['used_memory'] is not None
+    ])
+    metric('redis_evicted_keys_total', 'counter', 'Keys evicted by the Redis server', [
+        ('', {'alias': alias}, info['evicted_keys']) for alias, info in snapshot['redis'].items()
+        if info['evicted_keys'] is not None
+    ])
+    return '\n'.join(lines) + '\n'
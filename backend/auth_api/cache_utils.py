@@ -1,18 +1,24 @@
-from django.core.cache import caches
-import hashlib
-import json
-import logging
-from django.core.cache import caches
-import hashlib
-import json
-import logging
-from django.core.cache import caches
+from django.db import connections
+import functools
 import hashlib
+import inspect
 import json
 import logging
+import math
+import random
+import threading
+import time
+
+from .cache_metrics import instrumented_cache
 
 logger = logging.getLogger(__name__)
 
+# Namespaces whose cached values are derived from a user's test sessions
+TEST_SESSION_NAMESPACES = ('dashboard', 'achievements')
+
+# Marks values written by CacheDecorator (see CacheDecorator._store)
+ENVELOPE_MARKER = '__cached__'
+
 
 class CacheManager:
     """Robust cache manager used by auth_api.
@@ -20,6 +26,11 @@ class CacheManager:
     Keeps the interface small: invalidate_test_session_cache,
     invalidate_user_cache, get/set helpers and a module-level instance
     `cache_manager` is provided for existing imports.
+
+    Invalidation is generation based: every user, namespace and
+    (namespace, user) pair has a counter in the default cache that is
+    embedded in the keys derived from it, so invalidating is a single
+    INCR and the stale entries simply age out.
     """
 
     def __init__(self):
@@ -34,16 +45,32 @@ class CacheManager:
             def get(self, key, default=None):
                 return self._data.get(key, default)
 
+            def get_many(self, keys):
+                return {key: self._data[key] for key in keys if key in self._data}
+
             def set(self, key, value, timeout=None):
                 self._data[key] = value
 
+            def add(self, key, value, timeout=None):
+                if key in self._data:
+                    return False
+                self._data[key] = value
+                return True
+
+            def incr(self, key, delta=1):
+                if key not in self._data:
+                    raise ValueError(f"Key '{key}' not found")
+                self._data[key] += delta
+                return self._data[key]
+
             def delete(self, key):
                 self._data.pop(key, None)
 
         try:
-            self.dashboard_cache = caches['dashboard']
-            self.achievements_cache = caches['achievements']
-            self.default_cache = caches['default']
+            # Instrumented caches, two-tier when settings.CACHE_L1 is enabled
+            self.dashboard_cache = instrumented_cache('dashboard')
+            self.achievements_cache = instrumented_cache('achievements')
+            self.default_cache = instrumented_cache('default')
         except Exception:
             # Fall back to in-memory caches so import-time doesn't fail.
             logger.info("Falling back to in-memory cache for cache_utils")
@@ -51,14 +78,62 @@ class CacheManager:
             self.achievements_cache = _SimpleCache()
             self.default_cache = _SimpleCache()
 
+    def get_cache(self, cache_name):
+        return getattr(self, f"{cache_name}_cache", self.default_cache)
+
     def _cache_key(self, prefix, user_id, *parts):
         key = ':'.join([prefix, str(user_id)] + [str(p) for p in parts])
         return hashlib.md5(key.encode()).hexdigest()
 
+    # ------------------------------------------------------------------
+    # Generations
+    # ------------------------------------------------------------------
+
+    def _generation_keys(self, namespaces=(), user_id=None):
+        keys = [f"gen:ns:{ns}" for ns in namespaces]
+        if user_id is not None:
+            keys.append(f"gen:user:{user_id}")
+            keys.extend(f"gen:ns:{ns}:user:{user_id}" for ns in namespaces)
+        return keys
+
+    def _initial_generation(self):
+        # Seeded from the clock so an evicted counter never restarts at a
+        # value that old entries were written under
+        return time.time_ns() // 1000
+
+    def generations(self, namespaces=(), user_id=None):
+        """Current generation of each counter a key depends on (one round trip)"""
+        keys = self._generation_keys(namespaces, user_id)
+        if not keys:
+            return []
+        found = self.default_cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.default_cache.add(key, self._initial_generation(), None)
+                found[key] = self.default_cache.get(key)
+        return [found[key] for key in keys]
+
+    def bump_generation(self, key):
+        """Atomically advance one generation counter"""
+        try:
+            return self.default_cache.incr(key)
+        except ValueError:
+            self.default_cache.add(key, self._initial_generation(), None)
+            return self.default_cache.incr(key)
+
+    def versioned_key(self, prefix, *parts, namespaces=(), user_id=None):
+        """Key embedding the current generations of its namespaces and user"""
+        generations = self.generations(namespaces, user_id)
+        return self._cache_key(prefix, user_id, *parts, *generations)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
     def invalidate_test_session_cache(self, user_id):
         try:
-            self.dashboard_cache.delete(self._cache_key('dashboard_summary', user_id))
-            self.achievements_cache.delete(self._cache_key('achievements', user_id))
+            for ns in TEST_SESSION_NAMESPACES:
+                self.bump_generation(f"gen:ns:{ns}:user:{user_id}")
             logger.info(f"Invalidated test session cache for user: {user_id}")
             return True
         except Exception:
@@ -67,18 +142,27 @@ class CacheManager:
 
     def invalidate_user_cache(self, user_id):
         try:
-            self.dashboard_cache.delete(self._cache_key('dashboard_summary', user_id))
-            self.achievements_cache.delete(self._cache_key('achievements', user_id))
+            self.bump_generation(f"gen:user:{user_id}")
             logger.info(f"Invalidated cache for user: {user_id}")
             return True
         except Exception:
             logger.exception("Error invalidating user cache")
             return False
 
+    def invalidate_namespace(self, namespace, user_id=None):
+        """Invalidate a namespace for everyone, or for a single user"""
+        key = f"gen:ns:{namespace}" if user_id is None else f"gen:ns:{namespace}:user:{user_id}"
+        try:
+            self.bump_generation(key)
+            logger.info(f"Invalidated cache namespace {namespace}" + (f" for user: {user_id}" if user_id is not None else ""))
+            return True
+        except Exception:
+            logger.exception("Error invalidating cache namespace")
+            return False
+
     def set(self, cache_name, key, value, timeout=None):
         try:
-            cache = getattr(self, f"{cache_name}_cache", self.default_cache)
-            cache.set(key, value, timeout)
+            self.get_cache(cache_name).set(key, value, timeout)
             return True
         except Exception:
             logger.exception("Error setting cache value")
@@ -86,43 +170,181 @@ class CacheManager:
 
     def get(self, cache_name, key):
         try:
-            cache = getattr(self, f"{cache_name}_cache", self.default_cache)
-            return cache.get(key)
+            return self.get_cache(cache_name).get(key)
         except Exception:
             logger.exception("Error getting cache value")
             return None
 
 
 class CacheDecorator:
-    """Simple decorator to cache function results using a named cache."""
+    """Simple decorator to cache function results using a named cache.
+
+    `namespaces` lists the namespaces the cached value depends on and
+    `user_arg` names the argument identifying the user (an id, a user or
+    a request); their generations are part of the key, so
+    CacheManager.invalidate_* reaches the decorated results.
+
+    Values are stored in an envelope recording their logical expiry and
+    how long they took to compute, which enables:
+
+    - single-flight recomputation: on a miss only the caller holding a
+      short-lived lock (cache.add) computes, the others wait for its value
+    - probabilistic early expiration: a hit is recomputed ahead of expiry
+      with a probability growing as expiry nears and with compute cost
+      (`early_expiration_beta`, 0 disables)
+    - stale-while-revalidate: with `stale_ttl`, an expired value is still
+      served for that long while one caller refreshes it in the background
+    - negative caching: a None result is stored as such (for
+      `negative_timeout` seconds) instead of being recomputed every call
+    """
+
+    # Poll interval while waiting for another caller's computation (seconds)
+    LOCK_POLL_INTERVAL = 0.05
 
-    def __init__(self, cache_name='default', timeout=None, key_prefix=''):
+    def __init__(self, cache_name='default', timeout=None, key_prefix='', namespaces=(), user_arg='user_id',
+                 lock_timeout=10, early_expiration_beta=1.0, stale_ttl=0, cache_none=True, negative_timeout=None):
         self.cache_name = cache_name
         self.timeout = timeout
         self.key_prefix = key_prefix
-        self.cache = caches.get(cache_name, caches['default'])
+        self.namespaces = tuple(namespaces)
+        self.user_arg = user_arg
+        self.lock_timeout = lock_timeout
+        self.early_expiration_beta = early_expiration_beta
+        self.stale_ttl = stale_ttl
+        self.cache_none = cache_none
+        self.negative_timeout = timeout if negative_timeout is None else negative_timeout
 
-    def _generate_key(self, func_name, args, kwargs):
-        payload = json.dumps({'f': func_name, 'a': args, 'k': kwargs}, default=str)
+    @property
+    def cache(self):
+        return cache_manager.get_cache(self.cache_name)
+
+    def _user_id(self, signature, args, kwargs):
+        if not self.user_arg or signature is None:
+            return None
+        try:
+            value = signature.bind_partial(*args, **kwargs).arguments.get(self.user_arg)
+        except TypeError:
+            return None
+        if hasattr(value, 'user'):
+            value = value.user
+        return getattr(value, 'pk', value)
+
+    def _generate_key(self, func_name, args, kwargs, generations=()):
+        payload = json.dumps({'f': func_name, 'a': args, 'k': kwargs, 'g': list(generations)}, default=str)
         return self.key_prefix + hashlib.md5(payload.encode()).hexdigest()
 
+    # ------------------------------------------------------------------
+    # Envelope
+    # ------------------------------------------------------------------
+
+    def _read(self, key):
+        entry = self.cache.get(key)
+        if isinstance(entry, dict) and ENVELOPE_MARKER in entry:
+            return entry
+        return None
+
+    def _store(self, key, value, delta):
+        timeout = self.negative_timeout if value is None else self.timeout
+        if value is None and not self.cache_none:
+            return
+        entry = {
+            ENVELOPE_MARKER: 1,
+            'v': value,
+            'x': time.time() + timeout if timeout else None,
+            'd': delta,
+        }
+        try:
+            self.cache.set(key, entry, timeout + self.stale_ttl if timeout else timeout)
+        except Exception:
+            logger.exception("Failed to set cache for decorated function")
+
+    def _due_early(self, entry, now):
+        """XFetch: recompute before expiry with probability rising towards it"""
+        if entry['x'] is None or not self.early_expiration_beta:
+            return False
+        return now - entry['d'] * self.early_expiration_beta * math.log(random.random() or 1e-12) >= entry['x']
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+
+    def _acquire(self, key):
+        try:
+            return self.cache.add(key + ':lock', 1, self.lock_timeout)
+        except Exception:
+            logger.exception("Failed to take cache lock")
+            return False
+
+    def _release(self, key):
+        try:
+            self.cache.delete(key + ':lock')
+        except Exception:
+            logger.exception("Failed to release cache lock")
+
+    def _compute(self, key, func, args, kwargs):
+        """Run func and store its value; the caller holds the lock"""
+        try:
+            started = time.monotonic()
+            value = func(*args, **kwargs)
+            self._store(key, value, time.monotonic() - started)
+            return value
+        finally:
+            self._release(key)
+
+    def _compute_single_flight(self, key, func, args, kwargs):
+        if self._acquire(key):
+            return self._compute(key, func, args, kwargs)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.LOCK_POLL_INTERVAL)
+            entry = self._read(key)
+            if entry is not None:
+                return entry['v']
+        # The lock holder died or is very slow: stop waiting for it
+        return func(*args, **kwargs)
+
+    def _spawn(self, target, *args):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    def _refresh(self, key, func, args, kwargs):
+        try:
+            self._compute(key, func, args, kwargs)
+        except Exception:
+            logger.exception("Background cache refresh failed")
+        finally:
+            connections.close_all()
+
     def __call__(self, func):
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            key = self._generate_key(func.__name__, args, kwargs)
             try:
-                value = self.cache.get(key)
-                if value is not None:
-                    return value
-                result = func(*args, **kwargs)
-                try:
-                    self.cache.set(key, result, self.timeout)
-                except Exception:
-                    logger.exception("Failed to set cache for decorated function")
-                return result
+                user_id = self._user_id(signature, args, kwargs)
+                generations = cache_manager.generations(self.namespaces, user_id)
+                key = self._generate_key(func.__name__, args, kwargs, generations)
+                entry = self._read(key)
             except Exception:
                 logger.exception("Cache decorator error")
                 return func(*args, **kwargs)
 
+            if entry is None:
+                return self._compute_single_flight(key, func, args, kwargs)
+
+            now = time.time()
+            if entry['x'] is not None and now >= entry['x']:
+                # Only reachable within the stale window
+                if self._acquire(key):
+                    self._spawn(self._refresh, key, func, args, kwargs)
+                return entry['v']
+            if self._due_early(entry, now) and self._acquire(key):
+                return self._compute(key, func, args, kwargs)
+            return entry['v']
+
         return wrapper
 
 
@@ -130,16 +352,19 @@ class CacheDecorator:
 cache_manager = CacheManager()
 
 
-def cache_dashboard_data(timeout=600):
+def cache_dashboard_data(timeout=600, namespaces=('dashboard',), user_arg='user_id', **options):
     """Cache dashboard data for `timeout` seconds."""
-    return CacheDecorator(cache_name='dashboard', timeout=timeout, key_prefix='dashboard:')
+    return CacheDecorator(cache_name='dashboard', timeout=timeout, key_prefix='dashboard:',
+                          namespaces=namespaces, user_arg=user_arg, **options)
 
 
-def cache_achievements(timeout=1800):
+def cache_achievements(timeout=1800, namespaces=('achievements',), user_arg='user_id', **options):
     """Cache achievements data for `timeout` seconds."""
-    return CacheDecorator(cache_name='achievements', timeout=timeout, key_prefix='achievements:')
+    return CacheDecorator(cache_name='achievements', timeout=timeout, key_prefix='achievements:',
+                          namespaces=namespaces, user_arg=user_arg, **options)
 
 
-def cache_default(timeout=300):
+def cache_default(timeout=300, namespaces=(), user_arg='user_id', **options):
     """Default cache decorator (short-lived)."""
-    return CacheDecorator(cache_name='default', timeout=timeout, key_prefix='default:')
+    return CacheDecorator(cache_name='default', timeout=timeout, key_prefix='default:',
+                          namespaces=namespaces, user_arg=user_arg, **options)
@@ -1,12 +1,14 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.http import HttpResponse
 import logging
 
 logger = logging.getLogger(__name__)
 
 try:
     from .cache_utils import cache_manager
+    from .cache_metrics import cache_metrics, prometheus_text
 except ImportError:
     cache_manager = None
 
@@ -16,6 +18,9 @@ except ImportError:
 def cache_stats(request):
     """
     Get cache statistics for monitoring
+
+    Counters cover the worker process that answers; cache_metrics_export
+    serves the same data in the Prometheus text format.
     """
     try:
         # Only allow admin users to view cache stats
@@ -35,7 +40,8 @@ def cache_stats(request):
             'success': True,
             'stats': {
                 'cache_enabled': True,
-                'message': 'Cache is running'
+                'message': 'Cache is running',
+                **cache_metrics.snapshot()
             }
         }, status=status.HTTP_200_OK)
 
@@ -47,6 +53,34 @@ def cache_stats(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def cache_metrics_export(request):
+    """
+    Cache statistics in the Prometheus text exposition format
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'error': 'Permission denied. Admin access required.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if not cache_manager:
+        return Response({
+            'success': False,
+            'message': 'Cache manager not available'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    try:
+        return HttpResponse(prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"Cache metrics error: {str(e)}")
+        return Response({
+            'success': False,
+            'message': 'Failed to get cache metrics'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def invalidate_user_cache(request):
@@ -0,0 +1,114 @@
+"""Cache invalidation deferred to transaction commit.
+
+With ATOMIC_REQUESTS the TestSession signals fire inside the request
+transaction: invalidating there lets a concurrent reader repopulate the
+cache from the not yet committed (old) rows. `schedule()` instead records
+the invalidation and runs it from `transaction.on_commit`, once per
+distinct invalidation however many saves asked for it, and not at all
+when the transaction rolls back. Outside a transaction it runs at once.
+
+With settings.CACHE_INVALIDATION['ASYNC'] the batch is handed to a small
+in-process worker pool so the committing request does not wait on Redis.
+Receivers of `caches_invalidated` run after each batch, for work that
+should follow an invalidation (recomputing summaries, warming caches).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.dispatch import Signal
+
+from .cache_utils import cache_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INVALIDATION_CONFIG = {
+    'ASYNC': False,
+    'LOCAL_WORKERS': 1,
+}
+
+# Sent with `user_ids` (a set) after a batch of invalidations has run
+caches_invalidated = Signal()
+
+_local = threading.local()
+
+
+def invalidation_config():
+    return {**DEFAULT_INVALIDATION_CONFIG, **getattr(settings, 'CACHE_INVALIDATION', {})}
+
+
+def _pending(using):
+    if not hasattr(_local, 'pending'):
+        _local.pending = {}
+    return _local.pending.setdefault(using, {})
+
+
+def _flush_registered(using):
+    return any(
+        isinstance(entry[1], partial) and entry[1].func is flush
+        for entry in connections[using].run_on_commit
+    )
+
+
+def schedule(method, *args, user_id=None, using=None):
+    """Call cache_manager.`method`(*args) once the current transaction commits"""
+    using = using or DEFAULT_DB_ALIAS
+    batch = _pending(using)
+    if batch and not _flush_registered(using):
+        # Left over from a transaction that rolled back
+        batch.clear()
+    # Keyed by the call, so repeated saves collapse into one invalidation
+    batch[(method, args)] = user_id
+    # The first flush to run takes the whole batch, the others find it empty
+    transaction.on_commit(partial(flush, using), using=using)
+
+
+def schedule_test_session_invalidation(user_id, using=None):
+    schedule('invalidate_test_session_cache', user_id, user_id=user_id, using=using)
+
+
+def schedule_namespace_invalidation(namespace, user_id=None, using=None):
+    schedule('invalidate_namespace', namespace, user_id, user_id=user_id, using=using)
+
+
+def flush(using=DEFAULT_DB_ALIAS):
+    """Run the pending invalidations of `using` (now, or on the worker pool)"""
+    batch = _pending(using)
+    if not batch:
+        return
+    calls = dict(batch)
+    batch.clear()
+    if invalidation_config()['ASYNC']:
+        _local_executor().submit(run, calls)
+    else:
+        run(calls)
+
+
+def run(calls):
+    user_ids = set()
+    for (method, args), user_id in calls.items():
+        try:
+            getattr(cache_manager, method)(*args)
+        except Exception:
+            logger.exception(f"Cache invalidation {method}{args} failed")
+        if user_id is not None:
+            user_ids.add(user_id)
+    caches_invalidated.send_robust(sender=cache_manager.__class__, user_ids=user_ids)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _local_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=invalidation_config()['LOCAL_WORKERS'], thread_name_prefix='cache-invalidation'
+            )
+        return _executor
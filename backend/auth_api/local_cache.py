@@ -0,0 +1,319 @@
+"""In-process L1 cache in front of the Redis caches.
+
+Hot values (scoring configs, test lists, answer keys, dashboards) are
+read thousands of times per minute; each Redis read costs a round trip
+plus zlib and JSON decoding. `tiered_cache(alias)` returns a cache that
+first looks in a per-process LRU with a short TTL and only then in the
+configured Django cache.
+
+Workers stay coherent in two ways: keys written by CacheDecorator embed
+generation counters (see cache_utils), so invalidated entries are never
+looked up again, and every write or delete made through a tiered cache
+is broadcast over Redis pub/sub so the other workers drop their copy.
+The L1 TTL bounds staleness otherwise, including for entries that
+expire in Redis first.
+
+Configured by settings.CACHE_L1; disabled unless ENABLED is set.
+"""
+
+from collections import OrderedDict
+import copy
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_L1_CONFIG = {
+    'ENABLED': False,
+    'ALIASES': ('default', 'dashboard', 'achievements'),
+    # Seconds an entry may be served from process memory
+    'TTL': 30,
+    # Entries per namespace (the key up to its first ':')
+    'MAX_ENTRIES': 1000,
+    'NAMESPACE_LIMITS': {},
+    # Keys of these namespaces always go to Redis (generation counters)
+    'BYPASS_NAMESPACES': ('gen',),
+    # Hand out copies so callers cannot mutate the shared entry
+    'COPY': True,
+    'CHANNEL': 'cache-l1-invalidate',
+}
+
+MISSING = object()
+
+
+def key_namespace(key):
+    """The key up to its first ':'"""
+    return str(key).split(':', 1)[0]
+
+
+class LocalCache:
+    """Thread-safe LRU with per-entry TTL and per-namespace size limits."""
+
+    def __init__(self, max_entries=1000, ttl=30, namespace_limits=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.namespace_limits = namespace_limits or {}
+        self.evictions = 0
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        namespace = self._namespaces.get(key_namespace(key))
+        if namespace is None:
+            return MISSING
+        with self._lock:
+            entry = namespace.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del namespace[key]
+                return MISSING
+            namespace.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        name = key_namespace(key)
+        limit = self.namespace_limits.get(name, self.max_entries)
+        with self._lock:
+            namespace = self._namespaces.setdefault(name, OrderedDict())
+            namespace[key] = (value, time.monotonic() + ttl)
+            namespace.move_to_end(key)
+            while len(namespace) > limit:
+                namespace.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        namespace = self._namespaces.get(key_namespace(key))
+        if namespace is not None:
+            with self._lock:
+                namespace.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._namespaces.clear()
+
+    def sizes(self):
+        with self._lock:
+            return {name: len(entries) for name, entries in self._namespaces.items()}
+
+
+class _Invalidator:
+    """Broadcasts L1 deletions to the other workers over Redis pub/sub."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.locals = {}
+        self._client = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def register(self, alias, local):
+        self.locals[alias] = local
+        self._start(alias)
+
+    def _start(self, alias):
+        with self._lock:
+            if self._thread is not None:
+                return
+            try:
+                from django_redis import get_redis_connection
+                self._client = get_redis_connection(alias)
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+            except Exception:
+                logger.info("Redis pub/sub unavailable, L1 entries expire by TTL only")
+                self._thread = False
+                return
+            self._thread = threading.Thread(target=self._listen, args=(pubsub,), daemon=True,
+                                            name='cache-l1-invalidator')
+            self._thread.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            try:
+                payload = json.loads(message['data'])
+                if payload['origin'] == self.origin:
+                    continue
+                local = self.locals.get(payload['alias'])
+                if local is None:
+                    continue
+                if payload.get('clear'):
+                    local.clear()
+                for key in payload.get('keys', ()):
+                    local.delete(key)
+            except Exception:
+                logger.exception("Bad L1 invalidation message")
+
+    def publish(self, alias, keys=(), clear=False):
+        if not self._client:
+            return
+        try:
+            self._client.publish(self.channel, json.dumps(
+                {'origin': self.origin, 'alias': alias, 'keys': list(keys), 'clear': clear}
+            ))
+        except Exception:
+            logger.exception("Failed to publish L1 invalidation")
+
+
+class TwoTierCache:
+    """Django cache API over an L1 LocalCache and the `alias` cache (L2)."""
+
+    def __init__(self, alias, local, invalidator=None, bypass_namespaces=(), copy_values=True):
+        self.alias = alias
+        self.local = local
+        self.invalidator = invalidator
+        self.bypass_namespaces = set(bypass_namespaces)
+        self.copy_values = copy_values
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    @property
+    def l2(self):
+        # Django cache connections are per thread
+        return caches[self.alias]
+
+    def _cacheable(self, key):
+        return key_namespace(key) not in self.bypass_namespaces
+
+    def _out(self, value):
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def _forget(self, keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.invalidator is not None:
+            self.invalidator.publish(self.alias, keys)
+
+    def get(self, key, default=None, version=None):
+        if self._cacheable(key):
+            value = self.local.get(key)
+            if value is not MISSING:
+                self.l1_hits += 1
+                return self._out(value)
+        value = self.l2.get(key, MISSING, version=version)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.l2_hits += 1
+        if self._cacheable(key):
+            self.local.set(key, value)
+        return self._out(value)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            value = self.local.get(key) if self._cacheable(key) else MISSING
+            if value is MISSING:
+                remote.append(key)
+            else:
+                self.l1_hits += 1
+                found[key] = self._out(value)
+        if remote:
+            fetched = self.l2.get_many(remote, version=version)
+            self.l2_hits += len(fetched)
+            self.misses += len(remote) - len(fetched)
+            for key, value in fetched.items():
+                if self._cacheable(key):
+                    self.local.set(key, value)
+                found[key] = self._out(value)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self._forget([key])
+        if self._cacheable(key) and timeout != 0:
+            self.local.set(key, value, None if timeout in (DEFAULT_TIMEOUT, None) else timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.add(key, value, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        self._forget([key])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.l2.decr(key, delta, version=version)
+        self._forget([key])
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        result = self.l2.delete(key, version=version)
+        self._forget([key])
+        return result
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version=version)
+        self._forget(keys)
+
+    def clear(self):
+        self.l2.clear()
+        self.local.clear()
+        if self.invalidator is not None:
+            self.invalidator.publish(self.alias, clear=True)
+
+    def stats(self):
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'l1_hit_ratio': round(self.l1_hits / lookups, 4) if lookups else 0.0,
+            'l2_hit_ratio': round(self.l2_hits / lookups, 4) if lookups else 0.0,
+            'l1_evictions': self.local.evictions,
+            'l1_sizes': self.local.sizes(),
+        }
+
+    def __getattr__(self, name):
+        # Anything else (ttl, make_key, ...) is answered by L2
+        return getattr(self.l2, name)
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+_invalidator = None
+
+
+def l1_config():
+    return {**DEFAULT_L1_CONFIG, **getattr(settings, 'CACHE_L1', {})}
+
+
+def tiered_cache(alias='default'):
+    """The process-wide two-tier cache for `alias`, or the plain cache when L1 is off."""
+    global _invalidator
+    config = l1_config()
+    if not config['ENABLED'] or alias not in config['ALIASES']:
+        return caches[alias]
+    with _tiers_lock:
+        tier = _tiers.get(alias)
+        if tier is None:
+            local = LocalCache(config['MAX_ENTRIES'], config['TTL'], config['NAMESPACE_LIMITS'])
+            if _invalidator is None:
+                _invalidator = _Invalidator(config['CHANNEL'])
+            _invalidator.register(alias, local)
+            tier = _tiers[alias] = TwoTierCache(alias, local, _invalidator,
+                                                config['BYPASS_NAMESPACES'], config['COPY'])
+        return tier
+
+
+def tier_stats():
+    """L1/L2 hit ratios of every two-tier cache created in this process"""
+    return {alias: tier.stats() for alias, tier in _tiers.items()}
@@ -0,0 +1,153 @@
+"""
+Compare cache serializer/compressor combinations on real payloads
+
+Payloads are sampled from the live caches (django_redis only) and built
+from the database: the achievement and dashboard summaries of the most
+recently active users, and their top job recommendations.
+"""
+
+import json
+import pickle
+import time
+import zlib
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from auth_api.cache_codecs import (
+    MsgpackSerializer, Pickle5Serializer, ThresholdCompressor, available_algorithms, msgpack
+)
+
+
+class _JSONSerializer:
+    """Same encoding as django_redis' JSONSerializer (the previous setting)"""
+
+    def dumps(self, value):
+        return json.dumps(value, cls=DjangoJSONEncoder).encode()
+
+    def loads(self, value):
+        return json.loads(value.decode())
+
+
+class _ZlibAlways:
+    """Same behaviour as django_redis' ZlibCompressor: every value is compressed"""
+
+    def compress(self, value):
+        return zlib.compress(value)
+
+    def decompress(self, value):
+        return zlib.decompress(value)
+
+
+class _NoCompression:
+    def compress(self, value):
+        return value
+
+    def decompress(self, value):
+        return value
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cache serializers and compressors on dashboard, achievement and recommendation payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=50, help='Payloads per source (default: 50)')
+        parser.add_argument('--repeat', type=int, default=20, help='Encode/decode rounds per payload (default: 20)')
+        parser.add_argument('--min-len', type=int, default=1024,
+                            help='ThresholdCompressor COMPRESS_MIN_LEN (default: 1024)')
+        parser.add_argument('--no-live', action='store_true', help='Do not sample values stored in the caches')
+
+    def handle(self, *args, **options):
+        payloads = self.collect_payloads(options['samples'], live=not options['no_live'])
+        if not payloads:
+            self.stdout.write(self.style.WARNING('No payloads found'))
+            return
+
+        for source, values in payloads.items():
+            self.stdout.write(f"{source}: {len(values)} payloads")
+
+        serializers = {'json': _JSONSerializer(), 'pickle5': Pickle5Serializer()}
+        if msgpack is not None:
+            serializers['msgpack'] = MsgpackSerializer()
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed, skipping it'))
+
+        compressors = {'zlib (always)': _ZlibAlways(), 'none': _NoCompression()}
+        for algorithm in available_algorithms():
+            compressors[f"{algorithm} >= {options['min_len']}B"] = ThresholdCompressor(
+                {'COMPRESS_MIN_LEN': options['min_len'], 'COMPRESS_ALGORITHM': algorithm}
+            )
+
+        header = f"{'source':<16}{'serializer':<12}{'compressor':<20}{'encode us':>11}{'decode us':>11}{'bytes':>12}{'ratio':>8}"
+        self.stdout.write('\n' + header)
+        self.stdout.write('-' * len(header))
+        for source, values in payloads.items():
+            baseline = None
+            for serializer_name, serializer in serializers.items():
+                for compressor_name, compressor in compressors.items():
+                    row = self.measure(values, serializer, compressor, options['repeat'])
+                    if row is None:
+                        continue
+                    encode_us, decode_us, size = row
+                    baseline = baseline or size
+                    self.stdout.write(
+                        f"{source:<16}{serializer_name:<12}{compressor_name:<20}"
+                        f"{encode_us:>11.1f}{decode_us:>11.1f}{size:>12}{size / baseline:>8.2f}"
+                    )
+        self.stdout.write('\nTimes are per payload; ratio is relative to json + zlib (the previous setting).')
+
+    def measure(self, values, serializer, compressor, repeat):
+        """Average encode and decode time (microseconds) and total encoded size"""
+        try:
+            encoded = [compressor.compress(serializer.dumps(value)) for value in values]
+        except (TypeError, ValueError, pickle.PicklingError):
+            return None
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for value in values:
+                compressor.compress(serializer.dumps(value))
+        encode_us = (time.perf_counter() - started) / (repeat * len(values)) * 1e6
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for data in encoded:
+                serializer.loads(compressor.decompress(data))
+        decode_us = (time.perf_counter() - started) / (repeat * len(values)) * 1e6
+
+        return encode_us, decode_us, sum(len(data) for data in encoded)
+
+    def collect_payloads(self, samples, live=True):
+        payloads = {}
+
+        if live:
+            for alias in ('dashboard', 'achievements', 'default'):
+                try:
+                    cache = caches[alias]
+                    keys = list(islice(cache.iter_keys('*'), samples))
+                    values = [value for value in cache.get_many(keys).values() if value is not None]
+                except Exception:
+                    # Only django_redis can enumerate keys
+                    continue
+                if values:
+                    payloads[f"live:{alias}"] = values
+
+        users = list(User.objects.order_by('-last_login')[:samples])
+        try:
+            from auth_api.services import AchievementsService
+            payloads['achievements'] = [AchievementsService(user).get_achievement_summary() for user in users]
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"Skipping achievement payloads: {e}"))
+
+        try:
+            from auth_api.services import DashboardService
+            # The values dashboard_summary caches, built without touching the cache
+            payloads['dashboard'] = [DashboardService(user).get_summary() for user in users]
+            payloads['recommendations'] = [summary['recommendations'] for summary in payloads['dashboard']]
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"Skipping dashboard payloads: {e}"))
+
+        return {source: values for source, values in payloads.items() if values}
@@ -1,7 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
 from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Max
+from django.db.models import Avg, Count, Max, Min
 import logging
 
+from .cache_utils import cache_achievements, cache_dashboard_data
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -10,18 +15,104 @@ except ImportError:
     TestSession = None
     Test = None
 
+try:
+    from recommendation.models import JobRecommendationDetail
+except ImportError:
+    JobRecommendationDetail = None
+
+
+@dataclass(frozen=True)
+class Achievement:
+    """An achievement earned once `metric` of the user's stats reaches `target`"""
+    id: str
+    name: str
+    description: str
+    metric: str
+    target: int
+    # Stat holding the date the achievement was earned, when one query can tell
+    earned_date_metric: Optional[str] = None
+    # Description used when suggesting the achievement; None: never suggested
+    goal: Optional[str] = None
+
+
+# The achievement catalogue; evaluated against AchievementsService.get_stats()
+ACHIEVEMENTS = (
+    Achievement('first_test', 'First Steps', 'Completed your first test', 'tests_taken', 1,
+                earned_date_metric='first_taken_at'),
+    Achievement('test_taker', 'Test Taker', 'Completed 5 tests', 'tests_taken', 5,
+                goal='Complete 5 tests'),
+    Achievement('dedicated_learner', 'Dedicated Learner', 'Completed 10 tests', 'tests_taken', 10,
+                goal='Complete 10 tests'),
+    Achievement('high_achiever', 'High Achiever', 'Maintain an average score of 80% or higher', 'average_score', 80),
+)
+
+# Reported as total_available; clients show progress against this figure
+TOTAL_AVAILABLE = 10
+
+# How many unearned achievements to suggest next
+NEXT_ACHIEVEMENTS = 1
+
+EMPTY_STATS = {
+    'tests_taken': 0,
+    'average_score': None,
+    'first_taken_at': None,
+}
+
+
+def _empty_summary():
+    return {
+        'achievements': [],
+        'total_earned': 0,
+        'total_available': 0,
+        'completion_percentage': 0,
+        'next_achievements': []
+    }
+
 
 class AchievementsService:
     """
     Service for calculating user achievements based on test performance
+
+    All statistics come from a single aggregate query over the user's
+    sessions; the catalogue itself is declared in ACHIEVEMENTS.
     """
 
     def __init__(self, user):
         self.user = user
-        if TestSession:
-            self.sessions = TestSession.objects.filter(user=user).select_related('test')
-        else:
-            self.sessions = []
+
+    def get_stats(self):
+        """Test count, average score and first test date over all of the user's sessions"""
+        if not TestSession:
+            return dict(EMPTY_STATS)
+        return TestSession.objects.filter(user=self.user).aggregate(
+            tests_taken=Count('id'),
+            average_score=Avg('score'),
+            first_taken_at=Min('start_time'),
+        )
+
+    def evaluate(self, stats):
+        """Split the catalogue into earned achievements and the next ones to suggest"""
+        earned = []
+        suggested = []
+        for achievement in ACHIEVEMENTS:
+            value = stats.get(achievement.metric) or 0
+            if value >= achievement.target:
+                earned.append({
+                    'id': achievement.id,
+                    'name': achievement.name,
+                    'description': achievement.description,
+                    'earned': True,
+                    'earned_date': stats.get(achievement.earned_date_metric) if achievement.earned_date_metric else None
+                })
+            elif achievement.goal:
+                suggested.append({
+                    'id': achievement.id,
+                    'name': achievement.name,
+                    'description': achievement.goal,
+                    'progress': value,
+                    'target': achievement.target
+                })
+        return earned, suggested[:NEXT_ACHIEVEMENTS]
 
     def get_achievement_summary(self):
         """
@@ -29,89 +120,121 @@ class AchievementsService:
         """
         try:
             if not TestSession:
-                return {
-                    'achievements': [],
-                    'total_earned': 0,
-                    'total_available': 0,
-                    'completion_percentage': 0,
-                    'next_achievements': []
-                }
-
-            total_tests = self.sessions.count()
-            achievements = []
-            
-            # Basic achievements based on test count
-            if total_tests >= 1:
-                achievements.append({
-                    'id': 'first_test',
-                    'name': 'First Steps',
-                    'description': 'Completed your first test',
-                    'earned': True,
-                    'earned_date': self.sessions.first().created_at if self.sessions.exists() else None
-                })
-            
-            if total_tests >= 5:
-                achievements.append({
-                    'id': 'test_taker',
-                    'name': 'Test Taker',
-                    'description': 'Completed 5 tests',
-                    'earned': True,
-                    'earned_date': None
-                })
-            
-            if total_tests >= 10:
-                achievements.append({
-                    'id': 'dedicated_learner',
-                    'name': 'Dedicated Learner',
-                    'description': 'Completed 10 tests',
-                    'earned': True,
-                    'earned_date': None
-                })
-
-            # Calculate average score if we have sessions
-            if self.sessions.exists():
-                avg_score = self.sessions.aggregate(avg=Avg('score'))['avg'] or 0
-                if avg_score >= 80:
-                    achievements.append({
-                        'id': 'high_achiever',
-                        'name': 'High Achiever',
-                        'description': 'Maintain an average score of 80% or higher',
-                        'earned': True,
-                        'earned_date': None
-                    })
-
-            next_achievements = []
-            if total_tests < 5:
-                next_achievements.append({
-                    'id': 'test_taker',
-                    'name': 'Test Taker',
-                    'description': 'Complete 5 tests',
-                    'progress': total_tests,
-                    'target': 5
-                })
-            elif total_tests < 10:
-                next_achievements.append({
-                    'id': 'dedicated_learner',
-                    'name': 'Dedicated Learner',
-                    'description': 'Complete 10 tests',
-                    'progress': total_tests,
-                    'target': 10
-                })
+                return _empty_summary()
 
+            achievements, next_achievements = self.evaluate(self.get_stats())
             return {
                 'achievements': achievements,
                 'total_earned': len(achievements),
-                'total_available': 10,  # Total possible achievements
-                'completion_percentage': (len(achievements) / 10) * 100,
+                'total_available': TOTAL_AVAILABLE,
+                'completion_percentage': (len(achievements) / TOTAL_AVAILABLE) * 100,
                 'next_achievements': next_achievements
             }
 
         except Exception as e:
             logger.error(f"Error calculating achievements: {str(e)}")
-            return {
-                'achievements': [],
-                'total_earned': 0,
-                'total_available': 0,
-                'completion_percentage': 0,
-                'next_achievements': []
-            }
\ No newline at end of file
+            return _empty_summary()
+
+
+@cache_achievements()
+def get_achievement_summary(user_id):
+    """Achievement summary of a user, cached until their test sessions change"""
+    return AchievementsService(User(pk=user_id)).get_achievement_summary()
+
+
+class DashboardService:
+    """
+    Aggregated dashboard data for one user in a fixed number of queries:
+    one grouped aggregate over completed sessions (per test type) and one
+    for the top recommendations, whatever the length of the history.
+    """
+
+    TOP_RECOMMENDATIONS = 5
+
+    def __init__(self, user):
+        self.user = user
+
+    def get_test_type_stats(self):
+        """Count, average/best score and last test date per test type"""
+        if not TestSession:
+            return []
+        return list(
+            TestSession.objects.filter(user=self.user, status='completed', score__isnull=False)
+            .values('test__test_type')
+            .annotate(
+                tests=Count('id'),
+                average_score=Avg('score'),
+                best_score=Max('score'),
+                last_test_date=Max('start_time'),
+            )
+            # Drop the model's default ordering so it does not join the GROUP BY
+            .order_by()
+        )
+
+    def get_recommendations(self):
+        if not JobRecommendationDetail:
+            return []
+        details = (
+            JobRecommendationDetail.objects.filter(user=self.user)
+            .select_related('job_offer')
+            .order_by('-overall_score')[:self.TOP_RECOMMENDATIONS]
+        )
+        return [
+            {
+                'job_id': detail.job_offer_id,
+                'title': detail.job_offer.title,
+                'company': detail.job_offer.company,
+                'score': round(detail.overall_score, 2),
+            }
+            for detail in details
+        ]
+
+    def _merge(self, rows):
+        tests = sum(row['tests'] for row in rows)
+        return {
+            'tests': tests,
+            'average_score': round(sum(row['average_score'] * row['tests'] for row in rows) / tests, 2) if tests else None,
+            'best_score': max((row['best_score'] for row in rows), default=None),
+            'last_test_date': max((row['last_test_date'] for row in rows), default=None),
+        }
+
+    def _employability(self, test_types):
+        """Overall employability score: mean of the per-test-type averages"""
+        from testsengine.employability_scoring import score_interpretation
+
+        averages = [stats['average_score'] for stats in test_types.values()]
+        overall = round(sum(averages) / len(averages), 2) if averages else 0
+        return {
+            'overall_score': overall,
+            'test_types_completed': len(averages),
+            'interpretation': score_interpretation(overall),
+        }
+
+    def get_summary(self):
+        from testsengine.employability_scoring import EmployabilityCategories
+
+        rows = self.get_test_type_stats()
+        test_types = {row['test__test_type']: self._merge([row]) for row in rows}
+
+        by_category = {}
+        for row in rows:
+            category = EmployabilityCategories.get_category_for_test_type(row['test__test_type'])
+            by_category.setdefault(category, []).append(row)
+
+        overall = self._merge(rows)
+        return {
+            'tests_taken': overall['tests'],
+            'average_score': overall['average_score'],
+            'best_score': overall['best_score'],
+            'last_test_date': overall['last_test_date'],
+            'categories': {category: self._merge(group) for category, group in by_category.items()},
+            'test_types': test_types,
+            'employability': self._employability(test_types),
+            'recommendations': self.get_recommendations(),
+        }
+
+
+@cache_dashboard_data()
+def dashboard_summary(user_id):
+    """Dashboard summary of a user, cached until their test sessions change"""
+    return DashboardService(User(pk=user_id)).get_summary()
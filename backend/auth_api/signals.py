@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from testsengine.models import TestSession
-from .cache_utils import cache_manager
+from .invalidation import schedule_namespace_invalidation, schedule_test_session_invalidation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,13 +10,14 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=TestSession)
 def invalidate_cache_on_test_session_save(sender, instance, created, **kwargs):
     """
-    Invalidate user cache when a test session is created or updated
+    Invalidate user cache when a test session is created or updated,
+    once the saving transaction commits
     """
     try:
-        user_id = instance.user.id
-        cache_manager.invalidate_test_session_cache(user_id)
-        logger.info(
-            f"Invalidated cache for user {user_id} after test session {'creation' if created else 'update'}"
+        user_id = instance.user_id
+        schedule_test_session_invalidation(user_id, using=kwargs.get('using'))
+        logger.debug(
+            f"Scheduled cache invalidation for user {user_id} after test session {'creation' if created else 'update'}"
         )
     except Exception as e:
         logger.error(f"Error invalidating cache on test session save: {str(e)}")
@@ -25,11 +26,30 @@ def invalidate_cache_on_test_session_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=TestSession)
 def invalidate_cache_on_test_session_delete(sender, instance, **kwargs):
     """
-    Invalidate user cache when a test session is deleted
+    Invalidate user cache when a test session is deleted, once the
+    deleting transaction commits
     """
     try:
-        user_id = instance.user.id
-        cache_manager.invalidate_test_session_cache(user_id)
-        logger.info(f"Invalidated cache for user {user_id} after test session deletion")
+        user_id = instance.user_id
+        schedule_test_session_invalidation(user_id, using=kwargs.get('using'))
+        logger.debug(f"Scheduled cache invalidation for user {user_id} after test session deletion")
     except Exception as e:
         logger.error(f"Error invalidating cache on test session delete: {str(e)}")
+
+
+try:
+    from recommendation.models import JobRecommendationDetail
+except ImportError:
+    JobRecommendationDetail = None
+
+if JobRecommendationDetail is not None:
+    @receiver(post_save, sender=JobRecommendationDetail)
+    @receiver(post_delete, sender=JobRecommendationDetail)
+    def invalidate_dashboard_on_recommendation_change(sender, instance, **kwargs):
+        """
+        The dashboard summary lists the user's top recommendations
+        """
+        try:
+            schedule_namespace_invalidation('dashboard', instance.user_id, using=kwargs.get('using'))
+        except Exception as e:
+            logger.error(f"Error invalidating dashboard cache on recommendation change: {str(e)}")
@@ -1,3 +1,487 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import threading
+import time
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.cache import caches
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import cache_codecs, cache_utils, invalidation, local_cache
+from .cache_codecs import (
+    CompressorError, MsgpackSerializer, Pickle5Serializer, ThresholdCompressor, available_algorithms
+)
+from .cache_metrics import CacheMetrics, CountMinSketch, InstrumentedCache, prometheus_text
+from .cache_utils import CacheDecorator, CacheManager
+from .local_cache import MISSING, LocalCache, TwoTierCache
+from .services import EMPTY_STATS, NEXT_ACHIEVEMENTS, AchievementsService, DashboardService, dashboard_summary
+
+LOCMEM_CACHES = {
+    name: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': name}
+    for name in ('default', 'dashboard', 'achievements')
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GenerationInvalidationTestCase(SimpleTestCase):
+    """Invalidation reaches decorated results through generation counters"""
+
+    def setUp(self):
+        self.manager = CacheManager()
+        for cache in (self.manager.default_cache, self.manager.dashboard_cache, self.manager.achievements_cache):
+            cache.clear()
+        patcher = mock.patch.object(cache_utils, 'cache_manager', self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def _summary(self, **options):
+        @CacheDecorator(cache_name='dashboard', key_prefix='dashboard:', namespaces=('dashboard',), **options)
+        def summary(user_id):
+            self.calls += 1
+            return {'user_id': user_id, 'calls': self.calls}
+        return summary
+
+    def test_results_are_cached(self):
+        summary = self._summary()
+        summary(1)
+        summary(1)
+        self.assertEqual(self.calls, 1)
+
+    def test_user_invalidation(self):
+        summary = self._summary()
+        summary(1)
+        summary(2)
+        self.manager.invalidate_user_cache(1)
+        summary(1)
+        summary(2)
+        self.assertEqual(self.calls, 3)
+
+    def test_test_session_invalidation_targets_dependent_namespaces(self):
+        summary = self._summary()
+        summary(1)
+        self.manager.invalidate_test_session_cache(1)
+        self.assertEqual(summary(1)['calls'], 2)
+
+    def test_namespace_invalidation(self):
+        summary = self._summary()
+        summary(1)
+        summary(2)
+        self.manager.invalidate_namespace('dashboard')
+        summary(1)
+        summary(2)
+        self.assertEqual(self.calls, 4)
+
+    def test_user_resolved_from_request(self):
+        request = mock.Mock(user=mock.Mock(pk=7))
+
+        @CacheDecorator(namespaces=('dashboard',), user_arg='request')
+        def view(request):
+            self.calls += 1
+            return self.calls
+
+        view(request)
+        self.manager.invalidate_user_cache(7)
+        self.assertEqual(view(request), 2)
+
+    def test_evicted_generation_does_not_resurrect_old_entries(self):
+        summary = self._summary()
+        summary(1)
+        self.manager.default_cache.delete('gen:user:1')
+        summary(1)
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StampedeProtectionTestCase(SimpleTestCase):
+    """Single flight, early expiration, stale-while-revalidate and negative caching"""
+
+    def setUp(self):
+        self.manager = CacheManager()
+        for cache in (self.manager.default_cache, self.manager.dashboard_cache, self.manager.achievements_cache):
+            cache.clear()
+        patcher = mock.patch.object(cache_utils, 'cache_manager', self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def _decorate(self, result=lambda calls: calls, **options):
+        decorator = CacheDecorator(cache_name='dashboard', timeout=60, **options)
+
+        @decorator
+        def compute(user_id):
+            self.calls += 1
+            return result(self.calls)
+        return decorator, compute
+
+    def test_concurrent_misses_compute_once(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @CacheDecorator(cache_name='dashboard', timeout=60)
+        def slow(user_id):
+            self.calls += 1
+            started.set()
+            release.wait(5)
+            return 'value'
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(slow(1)))
+        first.start()
+        started.wait(5)
+        others = [threading.Thread(target=lambda: results.append(slow(1))) for _ in range(3)]
+        for thread in others:
+            thread.start()
+        release.set()
+        for thread in [first] + others:
+            thread.join(5)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['value'] * 4)
+
+    def test_none_is_cached(self):
+        _, compute = self._decorate(result=lambda calls: None)
+        self.assertIsNone(compute(1))
+        self.assertIsNone(compute(1))
+        self.assertEqual(self.calls, 1)
+
+    def test_none_not_cached_when_disabled(self):
+        _, compute = self._decorate(result=lambda calls: None, cache_none=False)
+        compute(1)
+        compute(1)
+        self.assertEqual(self.calls, 2)
+
+    def test_early_expiration_recomputes_before_expiry(self):
+        # Takes ~10ms to compute, so a draw of 0 moves expiry ~0.3s earlier
+        _, compute = self._decorate(result=lambda calls: time.sleep(0.01) or calls, early_expiration_beta=1.0)
+        compute(1)
+        with mock.patch.object(cache_utils.random, 'random', return_value=0.0):
+            with mock.patch.object(cache_utils.time, 'time', return_value=cache_utils.time.time() + 59.9):
+                self.assertEqual(compute(1), 2)
+
+    def test_stale_value_served_while_refreshing(self):
+        decorator, compute = self._decorate(stale_ttl=60)
+        compute(1)
+        with mock.patch.object(decorator, '_spawn', side_effect=lambda target, *args: target(*args)) as spawn:
+            with mock.patch.object(cache_utils.time, 'time', return_value=cache_utils.time.time() + 90):
+                self.assertEqual(compute(1), 1)
+                spawn.assert_called_once()
+                self.assertEqual(compute(1), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TwoTierCacheTestCase(SimpleTestCase):
+    """L1 process cache in front of the configured caches"""
+
+    def setUp(self):
+        self.local = LocalCache(max_entries=2, ttl=30, namespace_limits={'big': 3})
+        self.cache = TwoTierCache('dashboard', self.local, bypass_namespaces=('gen',))
+        self.cache.clear()
+
+    def test_reads_are_served_from_l1_after_first_fetch(self):
+        self.cache.l2.set('dashboard:1', {'score': 1})
+        self.assertEqual(self.cache.get('dashboard:1'), {'score': 1})
+        self.cache.l2.set('dashboard:1', {'score': 2})
+        self.assertEqual(self.cache.get('dashboard:1'), {'score': 1})
+        self.assertEqual((self.cache.l1_hits, self.cache.l2_hits), (1, 1))
+
+    def test_writes_and_deletes_update_l1(self):
+        self.cache.set('dashboard:1', 'a')
+        self.cache.set('dashboard:1', 'b')
+        self.assertEqual(self.cache.get('dashboard:1'), 'b')
+        self.cache.delete('dashboard:1')
+        self.assertIsNone(self.cache.get('dashboard:1'))
+
+    def test_values_are_copied(self):
+        self.cache.set('dashboard:1', {'items': []})
+        self.cache.get('dashboard:1')['items'].append(1)
+        self.assertEqual(self.cache.get('dashboard:1'), {'items': []})
+
+    def test_bypassed_namespaces_always_read_l2(self):
+        self.cache.set('gen:user:1', 1)
+        self.cache.l2.incr('gen:user:1')
+        self.assertEqual(self.cache.get('gen:user:1'), 2)
+
+    def test_per_namespace_lru_limits(self):
+        for i in range(3):
+            self.local.set(f'small:{i}', i)
+            self.local.set(f'big:{i}', i)
+        self.local.get('big:0')
+        self.local.set('big:3', 3)
+        self.assertEqual(self.local.sizes(), {'small': 2, 'big': 3})
+        self.assertIs(self.local.get('small:0'), MISSING)
+        self.assertIs(self.local.get('big:1'), MISSING)
+        self.assertEqual(self.local.get('big:0'), 0)
+
+    def test_entries_expire(self):
+        self.local.set('small:1', 1, ttl=10)
+        with mock.patch.object(local_cache.time, 'monotonic', return_value=time.monotonic() + 11):
+            self.assertIs(self.local.get('small:1'), MISSING)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheMetricsTestCase(SimpleTestCase):
+    """Telemetry recorded by InstrumentedCache"""
+
+    def setUp(self):
+        self.metrics = CacheMetrics(hot_keys=2)
+        self.cache = InstrumentedCache(caches['default'], 'default', self.metrics)
+        self.cache.clear()
+
+    def test_hits_misses_and_sets_per_namespace(self):
+        self.cache.set('dashboard:1', {'score': 10})
+        self.cache.get('dashboard:1')
+        self.cache.get('dashboard:2')
+        self.cache.get_many(['gen:user:1'])
+
+        stats = self.metrics.snapshot()['aliases']['default']
+        self.assertEqual((stats['hits'], stats['misses'], stats['sets']), (1, 2, 1))
+        self.assertEqual(stats['hit_ratio'], 0.3333)
+        self.assertEqual(stats['namespaces']['gen'], {'misses': 1})
+        self.assertNotIn('payload_bytes_max', stats['namespaces']['dashboard'])
+        self.assertEqual(stats['latency']['get']['count'], 2)
+
+    def test_payload_size_is_the_stored_size(self):
+        compressor = ThresholdCompressor({'COMPRESS_MIN_LEN': 100, 'COMPRESS_ALGORITHM': 'zlib'})
+        backend = mock.Mock()
+        backend.set.side_effect = lambda key, value, *args, **kwargs: compressor.compress(value)
+        cache = InstrumentedCache(backend, 'default', self.metrics)
+
+        cache.set('dashboard:1', b'dashboard ' * 200)
+        cache.set('dashboard:2', b'small')
+
+        stats = self.metrics.snapshot()['aliases']['default']['namespaces']['dashboard']
+        stored = len(compressor.compress(b'dashboard ' * 200))
+        self.assertLess(stored, 2000)
+        self.assertEqual(stats['payload_bytes_max'], stored)
+        self.assertEqual(stats['payload_bytes_avg'], round((stored + len(b'small') + 1) / 2))
+
+    def test_hot_keys(self):
+        for key, reads in (('a:1', 5), ('a:2', 1), ('a:3', 3)):
+            for _ in range(reads):
+                self.cache.get(key)
+        self.assertEqual(self.metrics.hottest(), [('default/a:1', 5), ('default/a:3', 3)])
+
+    def test_count_min_sketch_never_underestimates(self):
+        sketch = CountMinSketch(width=16, depth=3)
+        for i in range(100):
+            sketch.add(f'key:{i % 10}')
+        self.assertTrue(all(sketch.estimate(f'key:{i}') >= 10 for i in range(10)))
+
+    def test_prometheus_text(self):
+        self.cache.set('dashboard:1', 1)
+        self.cache.get('dashboard:1')
+        text = prometheus_text(self.metrics.snapshot())
+
+        self.assertIn('# TYPE careerquest_cache_hits_total counter', text)
+        self.assertIn('careerquest_cache_hits_total{alias="default",namespace="dashboard"} 1', text)
+        self.assertIn('careerquest_cache_operation_seconds_count{alias="default",op="get"} 1', text)
+        self.assertIn('careerquest_cache_operation_seconds_bucket{alias="default",op="get",le="+Inf"} 1', text)
+
+
+class CacheCodecTestCase(SimpleTestCase):
+    """Serializers and the threshold compressor"""
+
+    VALUE = {
+        'taken_at': datetime.datetime(2024, 5, 1, 12, 30),
+        'score': decimal.Decimal('87.50'),
+        'skills': {'python'},
+        'sessions': [1, 2, 3],
+    }
+
+    def test_small_values_are_not_compressed(self):
+        compressor = ThresholdCompressor({'COMPRESS_MIN_LEN': 100, 'COMPRESS_ALGORITHM': 'zlib'})
+        self.assertEqual(compressor.compress(b'small'), b'\x00small')
+        self.assertEqual(compressor.decompress(b'\x00small'), b'small')
+
+    def test_large_values_round_trip(self):
+        data = b'dashboard ' * 200
+        for algorithm in available_algorithms():
+            compressor = ThresholdCompressor({'COMPRESS_MIN_LEN': 100, 'COMPRESS_ALGORITHM': algorithm})
+            compressed = compressor.compress(data)
+            self.assertLess(len(compressed), len(data))
+            self.assertEqual(compressor.decompress(compressed), data)
+
+    def test_unknown_header(self):
+        with self.assertRaises(CompressorError):
+            ThresholdCompressor().decompress(b'\x7fdata')
+
+    def test_pickle5_keeps_types(self):
+        serializer = Pickle5Serializer()
+        self.assertEqual(serializer.loads(serializer.dumps(self.VALUE)), self.VALUE)
+
+    @skipIf(cache_codecs.msgpack is None, 'msgpack is not installed')
+    def test_msgpack_keeps_types(self):
+        serializer = MsgpackSerializer()
+        self.assertEqual(serializer.loads(serializer.dumps(self.VALUE)), self.VALUE)
+
+
+class AchievementCatalogueTestCase(SimpleTestCase):
+    """Declarative achievements evaluated from aggregated stats"""
+
+    def test_evaluate(self):
+        first = datetime.datetime(2024, 1, 1)
+        stats = {'tests_taken': 6, 'average_score': 82.5, 'first_taken_at': first}
+
+        earned, upcoming = AchievementsService(user=None).evaluate(stats)
+
+        self.assertEqual([a['id'] for a in earned], ['first_test', 'test_taker', 'high_achiever'])
+        self.assertEqual(earned[0]['earned_date'], first)
+        self.assertEqual(upcoming, [{'id': 'dedicated_learner', 'name': 'Dedicated Learner',
+                                     'description': 'Complete 10 tests', 'progress': 6, 'target': 10}])
+
+    def test_nothing_left_to_suggest(self):
+        stats = {'tests_taken': 12, 'average_score': 79.99, 'first_taken_at': None}
+
+        earned, upcoming = AchievementsService(user=None).evaluate(stats)
+
+        self.assertEqual([a['id'] for a in earned], ['first_test', 'test_taker', 'dedicated_learner'])
+        self.assertEqual(upcoming, [])
+
+    def test_score_interpretation(self):
+        from testsengine.employability_scoring import EmployabilityScorer, score_interpretation
+
+        self.assertEqual(score_interpretation(76.67)['level'], 'Good')
+        self.assertEqual(score_interpretation(0)['level'], 'Needs Improvement')
+        self.assertEqual(EmployabilityScorer(user=None)._get_score_interpretation(95), score_interpretation(95))
+
+    def test_no_sessions(self):
+        earned, upcoming = AchievementsService(user=None).evaluate(EMPTY_STATS)
+        self.assertEqual(earned, [])
+        self.assertEqual(len(upcoming), NEXT_ACHIEVEMENTS)
+        self.assertEqual((upcoming[0]['id'], upcoming[0]['progress']), ('test_taker', 0))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardSummaryTestCase(TestCase):
+    """The dashboard summary costs a fixed number of queries and is invalidated by session changes"""
+
+    def setUp(self):
+        from testsengine.models import Test, TestSession
+
+        for name in LOCMEM_CACHES:
+            caches[name].clear()
+        self.user = User.objects.create_user(username='dashboard', password='testpass')
+        tests = [
+            Test.objects.create(title=f'{test_type} test', test_type=test_type, description='Dashboard',
+                                duration_minutes=20, total_questions=10, passing_score=70)
+            for test_type in ('verbal_reasoning', 'numerical_reasoning', 'situational_judgment')
+        ]
+        now = timezone.now()
+        for index, score in enumerate([60, 80, 90, 70, 85, 75]):
+            session = TestSession.objects.create(user=self.user, test=tests[index % 3],
+                                                 attempt_number=index // 3 + 1, status='completed', score=score)
+            # start_time is auto_now_add, so backdate it after the insert
+            TestSession.objects.filter(pk=session.pk).update(start_time=now - datetime.timedelta(days=index))
+        self.TestSession = TestSession
+        self.test = tests[0]
+
+    def test_summary(self):
+        summary = dashboard_summary(self.user.id)
+
+        self.assertEqual(summary['tests_taken'], 6)
+        self.assertEqual(summary['average_score'], 76.67)
+        self.assertEqual(summary['best_score'], 90)
+        self.assertEqual(summary['test_types']['verbal_reasoning'],
+                         {'tests': 2, 'average_score': 65.0, 'best_score': 70,
+                          'last_test_date': summary['last_test_date']})
+        self.assertEqual(summary['employability']['test_types_completed'], 3)
+
+    def test_query_count_does_not_grow_with_history(self):
+        with self.assertNumQueries(2):
+            dashboard_summary(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for attempt in range(3, 23):
+                self.TestSession.objects.create(user=self.user, test=self.test, attempt_number=attempt,
+                                                status='completed', score=50, start_time=timezone.now())
+        with self.assertNumQueries(2):
+            self.assertEqual(dashboard_summary(self.user.id)['tests_taken'], 26)
+
+    def test_cached_until_a_session_changes(self):
+        dashboard_summary(self.user.id)
+        with self.assertNumQueries(0):
+            dashboard_summary(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.TestSession.objects.create(user=self.user, test=self.test, attempt_number=3,
+                                            status='completed', score=100, start_time=timezone.now())
+        self.assertEqual(dashboard_summary(self.user.id)['best_score'], 100)
+
+    def test_achievements_count_every_session(self):
+        self.TestSession.objects.create(user=self.user, test=self.test, attempt_number=3, status='in_progress')
+
+        with self.assertNumQueries(1):
+            summary = AchievementsService(self.user).get_achievement_summary()
+
+        first_session = self.TestSession.objects.order_by('start_time').first()
+        self.assertEqual([a['id'] for a in summary['achievements']], ['first_test', 'test_taker'])
+        self.assertEqual(summary['achievements'][0]['earned_date'], first_session.start_time)
+        self.assertEqual(summary['next_achievements'][0]['progress'], 7)
+        self.assertEqual((summary['total_earned'], summary['total_available']), (2, 10))
+        self.assertEqual(summary['completion_percentage'], 20.0)
+        self.assertNotIn('stats', summary)
+
+    def test_benchmark_uses_the_dashboard_summary(self):
+        from .management.commands.benchmark_cache_codecs import Command
+
+        payloads = Command().collect_payloads(samples=5, live=False)
+        self.assertEqual(payloads['dashboard'], [DashboardService(self.user).get_summary()])
+        self.assertEqual(payloads['recommendations'], [[]])
+
+        out = io.StringIO()
+        call_command('benchmark_cache_codecs', '--no-live', '--repeat', '1', stdout=out)
+        self.assertNotIn('Skipping', out.getvalue())
+        self.assertIn('dashboard: 1 payloads', out.getvalue())
+
+
+class DeferredInvalidationTestCase(TestCase):
+    """Signal invalidations run once per call after commit, never after a rollback"""
+
+    def setUp(self):
+        patcher = mock.patch.object(invalidation, 'cache_manager')
+        self.cache_manager = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batched_until_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for user_id in (1, 1, 2, 1):
+                invalidation.schedule_test_session_invalidation(user_id)
+            invalidation.schedule_namespace_invalidation('dashboard', 2)
+            self.cache_manager.invalidate_test_session_cache.assert_not_called()
+
+        self.assertEqual(
+            sorted(c.args for c in self.cache_manager.invalidate_test_session_cache.call_args_list),
+            [(1,), (2,)]
+        )
+        self.cache_manager.invalidate_namespace.assert_called_once_with('dashboard', 2)
+
+    def test_rolled_back_invalidations_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    invalidation.schedule_test_session_invalidation(1)
+                    raise ValueError
+            except ValueError:
+                pass
+            invalidation.schedule_test_session_invalidation(2)
+
+        self.cache_manager.invalidate_test_session_cache.assert_called_once_with(2)
+
+    @override_settings(CACHE_INVALIDATION={'ASYNC': True})
+    def test_async_dispatch(self):
+        done = threading.Event()
+        invalidation.caches_invalidated.connect(lambda sender, user_ids, **kwargs: done.set(),
+                                                weak=False, dispatch_uid='test_async_dispatch')
+        self.addCleanup(invalidation.caches_invalidated.disconnect, dispatch_uid='test_async_dispatch')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidation.schedule_test_session_invalidation(1)
+
+        self.assertTrue(done.wait(5))
+        self.cache_manager.invalidate_test_session_cache.assert_called_once_with(1)
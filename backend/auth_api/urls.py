@@ -15,6 +15,7 @@ urlpatterns = [
 
     # Cache management endpoints (admin only)
     path('cache/stats/', cache_views.cache_stats, name='cache-stats'),
+    path('cache/metrics/', cache_views.cache_metrics_export, name='cache-metrics'),
     path('cache/invalidate-user/', cache_views.invalidate_user_cache, name='invalidate-user-cache'),
     
     # Health check
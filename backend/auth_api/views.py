@@ -25,9 +25,11 @@ except ImportError:
     JobOffer = None
 
 try:
-    from .services import AchievementsService
+    from .services import AchievementsService, dashboard_summary, get_achievement_summary
 except ImportError:
     AchievementsService = None
+    dashboard_summary = None
+    get_achievement_summary = None
 
 try:
     from .cache_utils import cache_manager
@@ -178,13 +180,16 @@ class UserLogoutView(APIView):
 
 
 @api_view(['GET'])
-# @permission_classes([IsAuthenticated])  # Temporarily disabled for testing
+@permission_classes([IsAuthenticated])
 def get_user_dashboard(request):
-    """Get user dashboard data"""
+    """Get user dashboard data: the dashboard summary plus achievements"""
     try:
         return Response({
             'user': request.user.username,
-            'dashboard_data': {},
+            'dashboard_data': {
+                **dashboard_summary(request.user.id),
+                'achievements': get_achievement_summary(request.user.id),
+            },
             'message': 'Dashboard data retrieved successfully'
         })
     except Exception as e:
@@ -195,16 +200,15 @@ def get_user_dashboard(request):
         )
 
 @api_view(['GET'])
-# @permission_classes([IsAuthenticated])  # Temporarily disabled for testing
+@permission_classes([IsAuthenticated])
 def get_dashboard_summary(request):
-    """Get user dashboard summary"""
+    """Get user dashboard summary (cached, invalidated when the user's test sessions change)"""
     try:
+        summary = dashboard_summary(request.user.id)
         return Response({
             'user': request.user.username,
-            'tests_taken': 0,
-            'avg_score': 0,
-            'last_test_date': None,
-            'recommendations': [],
+            **summary,
+            'avg_score': summary['average_score'] or 0,
             'message': 'Dashboard summary retrieved successfully'
         })
     except Exception as e:
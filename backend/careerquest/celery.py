@@ -0,0 +1,19 @@
+"""
+Celery application for careerquest
+
+Workers load the Django settings and pick up the `tasks` modules of the
+installed apps (testsengine.tasks, recommendation.tasks, ...):
+
+    celery -A careerquest worker -l info -Q celery,code_execution
+    celery -A careerquest beat -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "careerquest.settings")
+
+app = Celery("careerquest")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -3,6 +3,24 @@ database_config.py — clean implementation
 
 This file intentionally small and self-contained to supply Django's
 DATABASES mapping and a helper to inspect the Postgres pool state.
+
+Pooling (DB_POOL_MODE):
+
+- ``direct`` (default): every worker thread keeps a persistent connection
+  to Postgres for CONN_MAX_AGE seconds, checked before reuse.
+- ``pgbouncer``: connect to a PgBouncer running in transaction mode
+  (DB_PORT usually 6432). PgBouncer hands a server connection to a client
+  only for the duration of a transaction, so a few dozen Postgres
+  connections serve every worker. Session state does not survive a
+  transaction there, hence DISABLE_SERVER_SIDE_CURSORS (named cursors
+  from .iterator() live across statements) and no reliance on SET or
+  session advisory locks. get_db_pool_status() reads SHOW POOLS from the
+  PgBouncer admin database (user in PGBOUNCER_STATS_USER, listed in
+  stats_users of pgbouncer.ini).
+
+Read replica: DB_REPLICA_HOST (Postgres) or DB_REPLICA_NAME (SQLite, for
+local testing) adds a ``replica`` alias that careerquest.db_router
+routes read-only work to. Tests mirror it onto ``default``.
 """
 import os
 from pathlib import Path
@@ -24,49 +42,159 @@ except Exception:
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+POOL_MODE_DIRECT = 'direct'
+POOL_MODE_PGBOUNCER = 'pgbouncer'
+
+
+def get_pool_mode():
+    return config('DB_POOL_MODE', default=POOL_MODE_DIRECT)
+
+
 def get_database_config():
     use_postgresql = config('USE_POSTGRESQL', default=False, cast=bool)
 
     if use_postgresql:
-        return {
-            'default': {
-                'ENGINE': 'django.db.backends.postgresql',
-                'NAME': config('DB_NAME', default='careerquest'),
-                'USER': config('DB_USER', default='jobgate'),
-                'PASSWORD': config('DB_PASSWORD', default='securepass'),
-                'HOST': config('DB_HOST', default='localhost'),
-                'PORT': config('DB_PORT', default='5432'),
-                'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
-                'OPTIONS': {'connect_timeout': 10},
-            }
+        database = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='careerquest'),
+            'USER': config('DB_USER', default='jobgate'),
+            'PASSWORD': config('DB_PASSWORD', default='securepass'),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+            # Ping a persistent connection before reusing it for a new request
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'connect_timeout': 10},
         }
+        if get_pool_mode() == POOL_MODE_PGBOUNCER:
+            database.update({
+                # Named cursors would span transactions, which PgBouncer reassigns
+                'DISABLE_SERVER_SIDE_CURSORS': True,
+                # Client connections to PgBouncer are cheap to keep
+                'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            })
+        databases = {'default': database}
+        replica_host = config('DB_REPLICA_HOST', default='')
+        if replica_host:
+            databases['replica'] = {
+                **database,
+                'HOST': replica_host,
+                'PORT': config('DB_REPLICA_PORT', default=database['PORT']),
+                'TEST': {'MIRROR': 'default'},
+            }
+        return databases
 
-    return {
+    databases = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    replica_name = config('DB_REPLICA_NAME', default='')
+    if replica_name:
+        # A second file to exercise routing locally; nothing replicates into it
+        databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / replica_name,
+            'TEST': {'MIRROR': 'default'},
+        }
+    return databases
 
 
 DATABASES = get_database_config()
 
 
+def _postgres_activity(cursor, db_name):
+    cursor.execute(
+        """
+        SELECT
+            count(*),
+            count(*) FILTER (WHERE state = 'active'),
+            count(*) FILTER (WHERE state = 'idle'),
+            count(*) FILTER (WHERE state LIKE 'idle in transaction%%'),
+            count(*) FILTER (WHERE wait_event_type = 'Lock'),
+            coalesce(extract(epoch FROM max(now() - xact_start)), 0),
+            current_setting('max_connections')::int
+        FROM pg_stat_activity
+        WHERE datname = %s AND backend_type = 'client backend'
+        """,
+        [db_name],
+    )
+    total, active, idle, idle_in_transaction, waiting_on_locks, oldest_xact, max_connections = cursor.fetchone()
+    return {
+        'total_connections': total,
+        'active_connections': active,
+        'idle_connections': idle,
+        'idle_in_transaction': idle_in_transaction,
+        'waiting_on_locks': waiting_on_locks,
+        'oldest_transaction_seconds': round(float(oldest_xact), 1),
+        'max_connections': max_connections,
+        # Share of the server's connection slots in use
+        'saturation': round(total / max_connections, 3) if max_connections else None,
+    }
+
+
+def _pgbouncer_pools(database):
+    """SHOW POOLS from the PgBouncer admin console, for our database"""
+    import psycopg2
+
+    admin = psycopg2.connect(
+        dbname='pgbouncer',
+        user=config('PGBOUNCER_STATS_USER', default=database['USER']),
+        password=config('PGBOUNCER_STATS_PASSWORD', default=database['PASSWORD']),
+        host=database['HOST'],
+        port=database['PORT'],
+        connect_timeout=5,
+    )
+    try:
+        # The admin console does not support transactions
+        admin.autocommit = True
+        with admin.cursor() as cursor:
+            cursor.execute('SHOW POOLS')
+            columns = [column.name for column in cursor.description]
+            pools = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        admin.close()
+
+    pools = [pool for pool in pools if pool.get('database') == database['NAME']]
+    waiting = sum(pool.get('cl_waiting', 0) for pool in pools)
+    return {
+        'client_active': sum(pool.get('cl_active', 0) for pool in pools),
+        'client_waiting': waiting,
+        'server_active': sum(pool.get('sv_active', 0) for pool in pools),
+        'server_idle': sum(pool.get('sv_idle', 0) for pool in pools),
+        'max_wait_seconds': max((pool.get('maxwait', 0) for pool in pools), default=0),
+        # Clients queueing for a server connection: the pool is too small
+        'saturated': waiting > 0,
+    }
+
+
 def get_db_pool_status():
     if not config('USE_POSTGRESQL', default=False, cast=bool):
         return {'status': 'sqlite'}
 
+    database = DATABASES['default']
+    status = {
+        'pool_mode': get_pool_mode(),
+        'conn_max_age': database.get('CONN_MAX_AGE'),
+        'health_checks': database.get('CONN_HEALTH_CHECKS', False),
+        'server_side_cursors': not database.get('DISABLE_SERVER_SIDE_CURSORS', False),
+    }
     try:
         from django.db import connection
 
         with connection.cursor() as cursor:
-            cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = %s",
-                           [config('DB_NAME', default='jobgate_career_quest')])
-            total = cursor.fetchone()[0]
-        return {'total_connections': total}
+            status.update(_postgres_activity(cursor, database['NAME']))
     except Exception as e:
-        return {'error': str(e)}
+        return {**status, 'error': str(e)}
+
+    if status['pool_mode'] == POOL_MODE_PGBOUNCER:
+        try:
+            status['pgbouncer'] = _pgbouncer_pools(database)
+        except Exception as e:
+            status['pgbouncer'] = {'error': str(e)}
+    return status
 
 
-__all__ = ['DATABASES', 'get_db_pool_status']
+__all__ = ['DATABASES', 'get_db_pool_status', 'get_pool_mode']
 
@@ -0,0 +1,170 @@
+"""
+Read-replica routing
+
+ReplicaRouter sends reads to the `replica` database only inside a
+`replica_reads` scope; everything else, and every write, uses `default`.
+Scopes wrap read-only work that tolerates a little replication lag:
+recommendation feature extraction, employability aggregation, history
+listings and QueryOptimizer statistics.
+
+    @replica_reads
+    def prepare_job_data_enhanced(self): ...
+
+    with replica_reads():
+        sessions = list(history_queryset(user))
+
+Read-your-writes: once a user writes, ReplicaPinningMiddleware pins them
+to the primary for DATABASE_REPLICA['PIN_SECONDS'] (in the default cache,
+so every worker sees it), and later reads of the writing request itself
+stay on the primary too.
+
+Without a `replica` entry in DATABASES (see database_config) the router
+is inert. Locally, DB_REPLICA_NAME=replica.sqlite3 adds a second SQLite
+database to route to; tests mirror it onto `default`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLICA_CONFIG = {
+    'ALIAS': 'replica',
+    # Longer than the replication lag you expect under load
+    'PIN_SECONDS': 10,
+}
+
+PRIMARY = 'default'
+
+_replica_scope = ContextVar('replica_scope', default=0)
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+def replica_config():
+    return {**DEFAULT_REPLICA_CONFIG, **getattr(settings, 'DATABASE_REPLICA', {})}
+
+
+def replica_alias():
+    """The replica alias, or None when no replica is configured"""
+    alias = replica_config()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(user_id):
+    return f"replica:pin:{user_id}"
+
+
+def pin_user(user_id, seconds=None):
+    """Route the user's reads to the primary for the next `seconds`"""
+    cache.set(_pin_key(user_id), 1, seconds or replica_config()['PIN_SECONDS'])
+
+
+def is_pinned(user_id):
+    try:
+        return cache.get(_pin_key(user_id)) is not None
+    except Exception:
+        logger.exception("Could not read replica pin, using the primary")
+        return True
+
+
+@contextmanager
+def _replica_scope_cm():
+    token = _replica_scope.set(_replica_scope.get() + 1)
+    try:
+        yield
+    finally:
+        _replica_scope.reset(token)
+
+
+def replica_reads(func=None):
+    """Scope whose reads may go to the replica: `@replica_reads` or `with replica_reads():`"""
+    if func is None:
+        return _replica_scope_cm()
+    return _replica_scope_cm()(func)
+
+
+class _RequestState:
+    def __init__(self, request):
+        self.request = request
+        self.wrote = False
+        self._pinned = None
+
+    def user_id(self):
+        # Resolved lazily: DRF authenticates (JWT) inside the view
+        user = getattr(self.request, 'user', None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def pinned(self):
+        if self.wrote:
+            return True
+        if self._pinned is None:
+            user_id = self.user_id()
+            self._pinned = user_id is not None and is_pinned(user_id)
+        return self._pinned
+
+
+def read_alias():
+    """Alias the current code should read from"""
+    alias = replica_alias()
+    if alias is None or not _replica_scope.get():
+        return PRIMARY
+    state = _request_state.get()
+    if state is not None and state.pinned():
+        return PRIMARY
+    return alias
+
+
+def read_connection():
+    """Connection for raw SQL reads, following the same rules as the router"""
+    return connections[read_alias()]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {PRIMARY, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives the schema through replication
+        return db == PRIMARY
+
+
+class ReplicaPinningMiddleware:
+    """Tracks writes per request and pins writers to the primary"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if replica_alias() is None:
+            return self.get_response(request)
+
+        state = _RequestState(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state.wrote:
+            user_id = state.user_id()
+            if user_id is not None:
+                pin_user(user_id)
+        return response
@@ -0,0 +1,97 @@
+"""
+Project-wide middleware
+
+QueryBudgetMiddleware counts the queries a request runs and the time
+spent in the database, on every configured connection, and flags the
+requests that go over budget (settings.QUERY_BUDGET):
+
+    QUERY_BUDGET = {
+        'ENABLED': True,
+        'MAX_QUERIES': 50,        # per request
+        'MAX_DB_TIME_MS': 500,    # per request
+        'HEADERS': DEBUG,         # X-DB-Queries / X-DB-Time-Ms on every response
+        'EXCLUDE_PATHS': ('/static/',),
+    }
+
+Over-budget requests are logged at WARNING on the `careerquest.db` logger
+and answered with an X-Query-Budget-Exceeded header.
+"""
+
+from contextlib import ExitStack
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('careerquest.db')
+
+DEFAULT_QUERY_BUDGET = {
+    'ENABLED': True,
+    'MAX_QUERIES': 50,
+    'MAX_DB_TIME_MS': 500,
+    'HEADERS': False,
+    'EXCLUDE_PATHS': ('/static/',),
+}
+
+
+def query_budget_config():
+    return {**DEFAULT_QUERY_BUDGET, **getattr(settings, 'QUERY_BUDGET', {})}
+
+
+class QueryStats:
+    """execute_wrapper counting queries and their duration"""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries += 1
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+def record_queries(stats):
+    """Context manager installing `stats` on every database connection of this thread"""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+    return stack
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = query_budget_config()
+        if not config['ENABLED'] or request.path.startswith(tuple(config['EXCLUDE_PATHS'])):
+            return self.get_response(request)
+
+        stats = QueryStats()
+        with record_queries(stats):
+            response = self.get_response(request)
+
+        over_budget = [
+            f"{stats.queries} queries > {config['MAX_QUERIES']}" if stats.queries > config['MAX_QUERIES'] else None,
+            f"{stats.duration_ms} ms > {config['MAX_DB_TIME_MS']} ms" if stats.duration_ms > config['MAX_DB_TIME_MS'] else None,
+        ]
+        over_budget = [reason for reason in over_budget if reason]
+        if over_budget:
+            logger.warning(
+                f"Query budget exceeded by {request.method} {request.path}: {', '.join(over_budget)}",
+                extra={'db_queries': stats.queries, 'db_time_ms': stats.duration_ms, 'path': request.path},
+            )
+            response['X-Query-Budget-Exceeded'] = '; '.join(over_budget)
+        if config['HEADERS']:
+            response['X-DB-Queries'] = str(stats.queries)
+            response['X-DB-Time-Ms'] = str(stats.duration_ms)
+        return response
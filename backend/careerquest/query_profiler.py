@@ -0,0 +1,259 @@
+"""
+Request-scoped SQL profiling
+
+QueryProfilerMiddleware profiles a request when it carries the
+X-Profile-Queries header (honoured with DEBUG on, or when its value is
+QUERY_PROFILER['TOKEN']) or is picked by SAMPLE_RATE. Profiling records
+every statement with its duration and the project line that issued it,
+then reports:
+
+- the slowest statements, optionally with EXPLAIN ANALYZE of the slowest
+  SELECT through QueryOptimizer.analyze_query_performance (Postgres only);
+- N+1 suspects: one normalized statement run more than
+  N_PLUS_ONE_THRESHOLD times;
+- the blocks timed with QueryOptimizer.query_timer / @monitor_query.
+
+The report is logged on `careerquest.db.profile` and kept in the default
+cache for REPORT_TTL seconds; the response names it in X-Query-Profile
+and staff can read it back from /api/status/query-profiles/<id>/.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+import random
+import re
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .middleware import QueryStats, record_queries
+
+logger = logging.getLogger('careerquest.db.profile')
+
+DEFAULT_QUERY_PROFILER = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 0.0,
+    'HEADER': 'X-Profile-Queries',
+    'TOKEN': '',
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SLOWEST': 3,
+    'EXPLAIN_SLOWEST': False,
+    'REPORT_TTL': 600,
+}
+
+# Longest statement text kept in a report
+MAX_SQL_LENGTH = 500
+
+_active_profile = ContextVar('query_profile', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def query_profiler_config():
+    return {**DEFAULT_QUERY_PROFILER, **getattr(settings, 'QUERY_PROFILER', {})}
+
+
+def normalize_sql(sql):
+    """Statement shape: literals and placeholders become ?, IN lists collapse"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+_SKIPPED_PATHS = (os.sep + 'site-packages' + os.sep, os.sep + 'dist-packages' + os.sep)
+
+
+def query_origin():
+    """`file:line in function` of the innermost project frame on the stack"""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and filename != __file__
+            and not any(part in filename for part in _SKIPPED_PATHS)
+        ):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class QueryProfile(QueryStats):
+    """QueryStats keeping every statement, its origin and the timed blocks"""
+
+    def __init__(self):
+        super().__init__()
+        self.statements = []
+        self.blocks = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.duration += duration
+            self.queries += 1
+            self.statements.append({
+                'sql': sql,
+                'params': params,
+                'alias': context['connection'].alias,
+                'duration_ms': round(duration * 1000, 2),
+                'origin': query_origin(),
+            })
+
+    def n_plus_one(self, threshold):
+        """Normalized statements run more than `threshold` times, most repeated first"""
+        groups = defaultdict(list)
+        for statement in self.statements:
+            groups[normalize_sql(statement['sql'])].append(statement)
+        suspects = [
+            {
+                'sql': fingerprint[:MAX_SQL_LENGTH],
+                'count': len(statements),
+                'duration_ms': round(sum(statement['duration_ms'] for statement in statements), 2),
+                'origins': sorted({statement['origin'] for statement in statements if statement['origin']}),
+            }
+            for fingerprint, statements in groups.items()
+            if len(statements) > threshold
+        ]
+        return sorted(suspects, key=lambda suspect: suspect['count'], reverse=True)
+
+    def slowest(self, limit):
+        return sorted(self.statements, key=lambda statement: statement['duration_ms'], reverse=True)[:limit]
+
+
+@contextmanager
+def profile_block(name):
+    """Attribute the time and queries of a block to `name` in the active profile"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    queries = profile.queries
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.blocks.append({
+            'name': name,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            'queries': profile.queries - queries,
+        })
+
+
+def should_profile(request, config):
+    if not config['ENABLED']:
+        return False
+    header = request.headers.get(config['HEADER'])
+    if header and (settings.DEBUG or (config['TOKEN'] and header == config['TOKEN'])):
+        return True
+    return config['SAMPLE_RATE'] > 0 and random.random() < config['SAMPLE_RATE']
+
+
+def explain(statement):
+    """EXPLAIN ANALYZE of a SELECT on Postgres through QueryOptimizer; None otherwise"""
+    if connections[statement['alias']].vendor != 'postgresql':
+        return None
+    if not statement['sql'].lstrip().upper().startswith('SELECT'):
+        return None
+    from testsengine.services.query_optimizer import QueryOptimizer
+
+    try:
+        analysis = QueryOptimizer().analyze_query_performance(statement['sql'], statement['params'])
+    except Exception as e:
+        return {'error': str(e)}
+    return {
+        'node_type': analysis['plan'].get('Plan', {}).get('Node Type'),
+        **{key: analysis[key] for key in ('total_cost', 'actual_time', 'rows_returned', 'buffer_hits', 'buffer_reads')},
+    }
+
+
+def _statement_summary(statement):
+    return {
+        'sql': statement['sql'][:MAX_SQL_LENGTH],
+        'alias': statement['alias'],
+        'duration_ms': statement['duration_ms'],
+        'origin': statement['origin'],
+    }
+
+
+def build_report(profile, request, response, config):
+    slowest = profile.slowest(config['SLOWEST'])
+    resolver_match = getattr(request, 'resolver_match', None)
+    report = {
+        'id': uuid.uuid4().hex,
+        'method': request.method,
+        'path': request.path,
+        'view': resolver_match.view_name if resolver_match else None,
+        'status': response.status_code,
+        'queries': profile.queries,
+        'duration_ms': profile.duration_ms,
+        'n_plus_one': profile.n_plus_one(config['N_PLUS_ONE_THRESHOLD']),
+        'slowest': [_statement_summary(statement) for statement in slowest],
+        'blocks': profile.blocks,
+        'explain': None,
+    }
+    if config['EXPLAIN_SLOWEST'] and slowest:
+        report['explain'] = explain(slowest[0])
+    return report
+
+
+def _report_key(report_id):
+    return f"query_profile:{report_id}"
+
+
+def get_report(report_id):
+    return cache.get(_report_key(report_id))
+
+
+def log_report(report):
+    message = (
+        f"Query profile {report['id']} {report['method']} {report['path']}: "
+        f"{report['queries']} queries, {report['duration_ms']} ms"
+    )
+    for suspect in report['n_plus_one']:
+        origin = suspect['origins'][0] if suspect['origins'] else 'unknown origin'
+        message += f"; N+1 {suspect['count']}x {suspect['sql'][:120]} ({origin})"
+    logger.log(logging.WARNING if report['n_plus_one'] else logging.INFO, message, extra={'query_profile': report})
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = query_profiler_config()
+        if not should_profile(request, config):
+            return self.get_response(request)
+
+        profile = QueryProfile()
+        token = _active_profile.set(profile)
+        try:
+            with record_queries(profile):
+                response = self.get_response(request)
+        finally:
+            _active_profile.reset(token)
+
+        report = build_report(profile, request, response, config)
+        log_report(report)
+        try:
+            cache.set(_report_key(report['id']), report, config['REPORT_TTL'])
+        except Exception:
+            logger.exception("Could not store query profile")
+        else:
+            response['X-Query-Profile'] = report['id']
+        return response
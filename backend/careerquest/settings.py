@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
     "skills",
     "testsengine",
     "recommendation",
+    "monitoring", # slow-query log storage and checks
 ]
 
 REST_FRAMEWORK = {
@@ -92,11 +96,15 @@ SIMPLE_JWT = {
 
 MIDDLEWARE = [
  "django.middleware.security.SecurityMiddleware",
+ "careerquest.slow_query_log.SlowQueryLogMiddleware", # persistent slow-query log (outermost: sees every statement; flushed off the request path)
+ "careerquest.middleware.QueryBudgetMiddleware", # per-request query count / DB time budget
+ "careerquest.query_profiler.QueryProfilerMiddleware", # opt-in per-request SQL profile / N+1 report
  "corsheaders.middleware.CorsMiddleware",
  "django.contrib.sessions.middleware.SessionMiddleware",
  "django.middleware.common.CommonMiddleware",
  "django.middleware.csrf.CsrfViewMiddleware",
  "django.contrib.auth.middleware.AuthenticationMiddleware",
+ "careerquest.db_router.ReplicaPinningMiddleware", # read-your-writes for the read replica
  "django.contrib.messages.middleware.MessageMiddleware",
  "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -131,7 +139,47 @@ from .database_config import DATABASES
 # DATABASES is already defined in database_config.py
 
 # PostgreSQL-specific settings for scoring system
-DATABASE_ROUTERS = [] # Add custom routers if needed for read/write splitting
+DATABASE_ROUTERS = ['careerquest.db_router.ReplicaRouter'] # replica_reads scopes -> DATABASES['replica']
+
+# Read replica (careerquest.db_router); inert without a 'replica' alias
+DATABASE_REPLICA = {
+ 'ALIAS': 'replica',
+ 'PIN_SECONDS': 10, # writers read from the primary this long after a write
+}
+
+# Per-request query budget (careerquest.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET = {
+ 'ENABLED': True,
+ 'MAX_QUERIES': 50,
+ 'MAX_DB_TIME_MS': 500,
+ 'HEADERS': DEBUG, # X-DB-Queries / X-DB-Time-Ms on every response
+ 'EXCLUDE_PATHS': ('/static/',),
+}
+
+# Statements slower than this are logged (QueryOptimizer.query_timer, slow-query log)
+SLOW_QUERY_THRESHOLD = 100 # ms
+
+# Slow-query log (careerquest.slow_query_log); `manage.py slow_queries` to read it
+SLOW_QUERY_LOG = {
+ 'ENABLED': True,
+ 'MIN_DURATION_MS': SLOW_QUERY_THRESHOLD,
+ 'FLUSH_INTERVAL': 30, # seconds between merges of a process' aggregates
+ 'RETENTION_DAYS': 14,
+ 'REGRESSION_RATIO': 1.5, # p95 or slow-execution rate growth flagged as a regression
+ 'MIN_COUNT': 5,
+}
+
+# Request query profiler (careerquest.query_profiler.QueryProfilerMiddleware)
+QUERY_PROFILER = {
+ 'ENABLED': True,
+ 'SAMPLE_RATE': 0.0, # share of requests profiled
+ 'HEADER': 'X-Profile-Queries', # profile this request (DEBUG, or value == TOKEN)
+ 'TOKEN': '', # set per deployment to allow the header without DEBUG
+ 'N_PLUS_ONE_THRESHOLD': 5, # same normalized statement more than this many times
+ 'SLOWEST': 3,
+ 'EXPLAIN_SLOWEST': DEBUG, # EXPLAIN ANALYZE the slowest SELECT (Postgres)
+ 'REPORT_TTL': 600,
+}
 
 # Atomic requests for data consistency in scoring operations
 DATABASE_ATOMIC_REQUESTS = True
@@ -153,6 +201,15 @@ LOGGING = {
  'handlers': ['console'],
  'level': 'INFO', # Set to DEBUG for SQL query logging
  },
+ 'careerquest.db': {
+ 'handlers': ['console'],
+ 'level': 'WARNING', # Requests over the query budget
+ },
+ 'careerquest.db.profile': {
+ 'handlers': ['console'],
+ 'level': 'INFO', # Query profiles of profiled requests
+ 'propagate': False,
+ },
  },
 }
 
@@ -176,6 +233,22 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # Cache Configuration
 # https://docs.djangoproject.com/en/4.2/topics/cache/
+# Codecs from auth_api.cache_codecs; values under COMPRESS_MIN_LEN bytes are stored
+# uncompressed, larger ones with lz4 when installed, zlib otherwise. msgpack is used
+# when installed unless CACHE_MSGPACK=False; without it values are stored as JSON.
+# Each format has its own key VERSION so processes with different codecs never read
+# each other's entries (1 was JSON + zlib for every value).
+CACHE_MSGPACK = config('CACHE_MSGPACK', default=True, cast=bool) and find_spec('msgpack') is not None
+CACHE_CODEC_OPTIONS = {
+ 'COMPRESSOR': 'auth_api.cache_codecs.ThresholdCompressor',
+ 'COMPRESS_MIN_LEN': 1024,
+ 'SERIALIZER': (
+ 'auth_api.cache_codecs.MsgpackSerializer' if CACHE_MSGPACK
+ else 'django_redis.serializers.json.JSONSerializer'
+ ),
+}
+CACHE_CODEC_VERSION = 2 if CACHE_MSGPACK else 3
+
 CACHES = {
  'default': {
  'BACKEND': 'django_redis.cache.RedisCache',
@@ -186,10 +259,10 @@ CACHES = {
  'max_connections': 50,
  'retry_on_timeout': True,
  },
- 'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
- 'SERIALIZER': 'django_redis.serializers.json.JSONSerializer',
+ **CACHE_CODEC_OPTIONS,
  },
  'KEY_PREFIX': 'careerquest',
+ 'VERSION': CACHE_CODEC_VERSION,
  'TIMEOUT': 300, # 5 minutes default timeout
  },
  'dashboard': {
@@ -201,10 +274,10 @@ CACHES = {
  'max_connections': 50,
  'retry_on_timeout': True,
  },
- 'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
- 'SERIALIZER': 'django_redis.serializers.json.JSONSerializer',
+ **CACHE_CODEC_OPTIONS,
  },
  'KEY_PREFIX': 'dashboard',
+ 'VERSION': CACHE_CODEC_VERSION,
  'TIMEOUT': 600, # 10 minutes for dashboard data
  },
  'achievements': {
@@ -216,14 +289,49 @@ CACHES = {
  'max_connections': 50,
  'retry_on_timeout': True,
  },
- 'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
- 'SERIALIZER': 'django_redis.serializers.json.JSONSerializer',
+ **CACHE_CODEC_OPTIONS,
  },
  'KEY_PREFIX': 'achievements',
+ 'VERSION': CACHE_CODEC_VERSION,
  'TIMEOUT': 1800, # 30 minutes for achievements (rarely change)
  }
 }
 
+# In-process L1 cache in front of the Redis caches (auth_api.local_cache)
+CACHE_L1 = {
+ 'ENABLED': True,
+ 'ALIASES': ('default', 'dashboard', 'achievements'),
+ 'TTL': 30, # seconds an entry may be served from process memory
+ 'MAX_ENTRIES': 1000, # per namespace (key prefix before the first ':')
+ 'NAMESPACE_LIMITS': {
+ 'dashboard': 5000,
+ 'achievements': 5000,
+ },
+}
+
+# Signal-driven invalidation runs after commit (auth_api.invalidation)
+CACHE_INVALIDATION = {
+ 'ASYNC': False, # True: run batches on an in-process worker instead of the committing request
+ 'LOCAL_WORKERS': 1,
+}
+
+# Celery (careerquest.celery); code execution jobs go to their own queue
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://127.0.0.1:6379/0')
+CELERY_TASK_ROUTES = {
+ 'testsengine.tasks.execute_code_job': {'queue': 'code_execution'},
+}
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_IGNORE_RESULT = True
+# `celery -A careerquest beat`; `manage.py slow_queries --compare --fail-on-regression` for cron/CI
+CELERY_BEAT_SCHEDULE = {
+ 'check-slow-query-regressions': {
+ 'task': 'monitoring.tasks.check_slow_query_regressions',
+ 'schedule': timedelta(hours=1),
+ 'kwargs': {'hours': 1},
+ },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -241,6 +349,11 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "static"
 
+# Uploaded files; background jobs read them back through default_storage,
+# so workers on other hosts need the same storage (shared volume or S3)
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,360 @@
+"""
+Persistent slow-query log
+
+SlowQueryLogMiddleware catches every statement of a request that runs
+for at least SLOW_QUERY_LOG['MIN_DURATION_MS'] and files it under its
+fingerprint (sha1 of normalize_sql), the view that issued it and its
+BUCKET_MINUTES time bucket. Requests only aggregate in memory: a daemon
+thread per process upserts the buckets that changed into SlowQueryBucket
+(monitoring app) every FLUSH_INTERVAL seconds, in one bulk statement.
+Each process writes its own running totals under its `source`, so the
+upsert never has to read a row back; queries sum the sources. Rows older
+than RETENTION_DAYS are dropped by `manage.py slow_queries --prune` or
+the monitoring.tasks.check_slow_query_regressions beat task.
+
+A bucket keeps count, total/max duration, rows and a latency histogram
+with 25% wide bins, which is what lets p50/p95/p99 be computed for any
+window. Only slow executions are logged, so the percentiles describe the
+slow tail of a statement, not all of its executions.
+
+    top_offenders(hours=24, sort='p95_ms')
+    compare_windows(current, baseline)  # 'new' and 'regressed' statements
+    find_regressions(since=deployed_at)
+
+Windows are aligned to BUCKET_MINUTES: a window starting mid-bucket
+includes that whole bucket.
+
+`manage.py slow_queries --compare --since <deploy time>` and the
+check_slow_query_regressions task flag deploys that regress a statement.
+"""
+
+import atexit
+from collections import defaultdict
+from datetime import timedelta
+import hashlib
+import logging
+import math
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from monitoring.models import SlowQueryBucket
+
+from .middleware import record_queries
+from .query_profiler import MAX_SQL_LENGTH, normalize_sql
+
+logger = logging.getLogger('careerquest.db')
+
+DEFAULT_SLOW_QUERY_LOG = {
+    'ENABLED': True,
+    'MIN_DURATION_MS': 100,
+    'FLUSH_INTERVAL': 30,
+    # Wake the flusher early past this many changed buckets
+    'MAX_PENDING': 500,
+    'RETENTION_DAYS': 14,
+    # p95 or rate growth that counts as a regression
+    'REGRESSION_RATIO': 1.5,
+    # Executions a window needs before its numbers are compared
+    'MIN_COUNT': 5,
+}
+
+BUCKET_MINUTES = 10
+
+HISTOGRAM_BASE = 1.25
+HISTOGRAM_BINS = 64
+# Upper bound of each histogram bin: 1 ms, 1.25 ms, ... ~1.6 h
+LATENCY_BOUNDS_MS = tuple(HISTOGRAM_BASE ** index for index in range(HISTOGRAM_BINS))
+
+SORT_KEYS = ('total_ms', 'count', 'p95_ms', 'p99_ms', 'max_ms')
+
+BUCKET_KEY_FIELDS = ['fingerprint', 'view', 'bucket_start', 'source']
+BUCKET_TOTAL_FIELDS = ['sql', 'count', 'total_ms', 'max_ms', 'rows', 'histogram', 'last_seen']
+
+
+def slow_query_log_config():
+    return {**DEFAULT_SLOW_QUERY_LOG, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def bucket_floor(moment):
+    return moment.replace(minute=moment.minute - moment.minute % BUCKET_MINUTES, second=0, microsecond=0)
+
+
+def histogram_bin(duration_ms):
+    if duration_ms <= 1:
+        return 0
+    return min(HISTOGRAM_BINS - 1, math.ceil(math.log(duration_ms, HISTOGRAM_BASE)))
+
+
+def quantile(histogram, q):
+    """q-quantile of a {bin: count} histogram, interpolated inside its bin"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index in sorted(histogram, key=int):
+        count = histogram[index]
+        if seen + count >= rank:
+            index = int(index)
+            lower = LATENCY_BOUNDS_MS[index - 1] if index else 0
+            upper = LATENCY_BOUNDS_MS[index]
+            return round(lower + (upper - lower) * (rank - seen) / count, 2)
+        seen += count
+    return round(LATENCY_BOUNDS_MS[int(max(histogram, key=int))], 2)
+
+
+def _merge_histogram(into, histogram):
+    for index, count in histogram.items():
+        into[str(index)] = into.get(str(index), 0) + count
+
+
+def process_source():
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+class SlowQueryLog:
+    """
+    Per-process running totals of slow statements, upserted into SlowQueryBucket
+
+    record() only touches memory. start_flusher() runs flush() on a daemon
+    thread every FLUSH_INTERVAL seconds (or when woken by request_flush());
+    a forked child starts over with empty totals and its own source.
+    """
+
+    def __init__(self, source=None):
+        self._fixed_source = source
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.source = self._fixed_source or process_source()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._totals = {}
+        self._dirty = set()
+        self._latest_bucket = None
+        self._flusher = None
+
+    def record(self, statements, view, now=None):
+        """File (sql, duration_ms, rows) tuples issued by `view`; returns the number of changed buckets"""
+        now = now or timezone.now()
+        bucket_start = bucket_floor(now)
+        with self._lock:
+            if self._latest_bucket is None or bucket_start > self._latest_bucket:
+                self._latest_bucket = bucket_start
+            for sql, duration_ms, rows in statements:
+                normalized = normalize_sql(sql)
+                key = (fingerprint(normalized), view, bucket_start)
+                entry = self._totals.get(key)
+                if entry is None:
+                    entry = self._totals[key] = {
+                        'sql': normalized[:MAX_SQL_LENGTH], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                        'rows': 0, 'histogram': {},
+                    }
+                entry['count'] += 1
+                entry['total_ms'] += duration_ms
+                entry['max_ms'] = max(entry['max_ms'], duration_ms)
+                entry['rows'] += rows
+                _merge_histogram(entry['histogram'], {histogram_bin(duration_ms): 1})
+                entry['last_seen'] = now
+                self._dirty.add(key)
+            return len(self._dirty)
+
+    def start_flusher(self, interval):
+        """Start the background flush thread of this process, if it is not running"""
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run, args=(interval,), name='slow-query-log-flusher', daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def request_flush(self):
+        self._wake.set()
+
+    def _run(self, interval):
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # The thread's own connection; reopened on the next flush
+                connection.close()
+
+    def flush(self):
+        """Upsert the buckets that changed since the last flush in one statement"""
+        with self._lock:
+            keys, self._dirty = self._dirty, set()
+            buckets = []
+            for key in keys:
+                digest, view, bucket_start = key
+                entry = self._totals[key]
+                buckets.append(SlowQueryBucket(
+                    fingerprint=digest, view=view, bucket_start=bucket_start, source=self.source,
+                    **{**entry, 'histogram': dict(entry['histogram'])},
+                ))
+            # Only the current bucket (and the one before, for requests that
+            # straddled the boundary) can still change; drop older totals
+            horizon = self._latest_bucket - timedelta(minutes=BUCKET_MINUTES) if self._latest_bucket else None
+            if horizon is not None:
+                self._totals = {key: entry for key, entry in self._totals.items() if key[2] >= horizon}
+        if not buckets:
+            return
+
+        try:
+            SlowQueryBucket.objects.bulk_create(
+                buckets,
+                update_conflicts=True,
+                unique_fields=BUCKET_KEY_FIELDS,
+                update_fields=BUCKET_TOTAL_FIELDS,
+            )
+        except Exception:
+            logger.exception(f"Could not flush {len(buckets)} slow query buckets")
+            with self._lock:
+                self._dirty.update(key for key in keys if key in self._totals)
+
+
+slow_query_log = SlowQueryLog()
+
+
+class SlowStatements:
+    """execute_wrapper keeping the statements slower than `min_duration_ms`"""
+
+    def __init__(self, min_duration_ms):
+        self.min_duration_ms = min_duration_ms
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.min_duration_ms:
+                rowcount = getattr(context['cursor'], 'rowcount', -1)
+                self.statements.append((sql, round(duration_ms, 2), max(rowcount or 0, 0)))
+
+
+class SlowQueryLogMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = slow_query_log_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        recorder = SlowStatements(config['MIN_DURATION_MS'])
+        with record_queries(recorder):
+            response = self.get_response(request)
+
+        if recorder.statements:
+            resolver_match = getattr(request, 'resolver_match', None)
+            changed = slow_query_log.record(recorder.statements, resolver_match.view_name if resolver_match else '')
+            slow_query_log.start_flusher(config['FLUSH_INTERVAL'])
+            if changed >= config['MAX_PENDING']:
+                slow_query_log.request_flush()
+        return response
+
+
+def window_stats(start, end):
+    """Per-fingerprint statistics of the slow executions between start and end, over every source"""
+    merged = {}
+    views = defaultdict(lambda: defaultdict(int))
+    buckets = SlowQueryBucket.objects.filter(bucket_start__gte=bucket_floor(start), bucket_start__lt=end)
+    for bucket in buckets.iterator():
+        entry = merged.get(bucket.fingerprint)
+        if entry is None:
+            entry = merged[bucket.fingerprint] = {
+                'fingerprint': bucket.fingerprint, 'sql': bucket.sql, 'count': 0, 'total_ms': 0.0,
+                'max_ms': 0.0, 'rows': 0, 'histogram': {}, 'last_seen': bucket.last_seen,
+            }
+        entry['count'] += bucket.count
+        entry['total_ms'] += bucket.total_ms
+        entry['max_ms'] = max(entry['max_ms'], bucket.max_ms)
+        entry['rows'] += bucket.rows
+        entry['last_seen'] = max(entry['last_seen'], bucket.last_seen)
+        _merge_histogram(entry['histogram'], bucket.histogram)
+        views[bucket.fingerprint][bucket.view] += bucket.count
+
+    for digest, entry in merged.items():
+        histogram = entry.pop('histogram')
+        entry.update({
+            'total_ms': round(entry['total_ms'], 2),
+            'mean_ms': round(entry['total_ms'] / entry['count'], 2),
+            'p50_ms': quantile(histogram, 0.50),
+            'p95_ms': quantile(histogram, 0.95),
+            'p99_ms': quantile(histogram, 0.99),
+            'views': sorted(views[digest], key=views[digest].get, reverse=True)[:3],
+        })
+    return merged
+
+
+def top_offenders(hours=24, sort='total_ms', limit=20, now=None):
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    end = now or timezone.now()
+    stats = window_stats(end - timedelta(hours=hours), end)
+    return sorted(stats.values(), key=lambda entry: entry[sort], reverse=True)[:limit]
+
+
+def compare_windows(current, baseline, ratio=None, min_count=None):
+    """
+    Statements that got slower or more frequent in `current` than in `baseline`
+
+    Both windows are (start, end). A statement is 'new' when it has at least
+    min_count slow executions now and none in the baseline, 'regressed'
+    when its p95 or its rate of slow executions per hour grew by `ratio`.
+    """
+    config = slow_query_log_config()
+    ratio = ratio or config['REGRESSION_RATIO']
+    min_count = min_count or config['MIN_COUNT']
+    current_stats, baseline_stats = window_stats(*current), window_stats(*baseline)
+    bucket = timedelta(minutes=BUCKET_MINUTES)
+    current_hours = max(current[1] - bucket_floor(current[0]), bucket) / timedelta(hours=1)
+    baseline_hours = max(baseline[1] - bucket_floor(baseline[0]), bucket) / timedelta(hours=1)
+
+    flagged = []
+    for digest, now in current_stats.items():
+        if now['count'] < min_count:
+            continue
+        before = baseline_stats.get(digest)
+        if before is None:
+            flagged.append({'status': 'new', 'fingerprint': digest, 'sql': now['sql'], 'current': now, 'baseline': None})
+            continue
+        p95_ratio = now['p95_ms'] / before['p95_ms'] if before['p95_ms'] else None
+        rate_ratio = (now['count'] / current_hours) / (before['count'] / baseline_hours)
+        if (p95_ratio or 0) >= ratio or (before['count'] >= min_count and rate_ratio >= ratio):
+            flagged.append({
+                'status': 'regressed', 'fingerprint': digest, 'sql': now['sql'], 'current': now, 'baseline': before,
+                'p95_ratio': round(p95_ratio, 2) if p95_ratio else None, 'rate_ratio': round(rate_ratio, 2),
+            })
+    return sorted(flagged, key=lambda entry: entry['current']['total_ms'], reverse=True)
+
+
+def find_regressions(since=None, hours=1, now=None, **kwargs):
+    """Compare the window since `since` (or the last `hours`) with the window of the same length before it"""
+    end = now or timezone.now()
+    start = bucket_floor(since or end - timedelta(hours=hours))
+    return compare_windows((start, end), (start - (end - start), start), **kwargs)
+
+
+def prune(now=None):
+    """Drop buckets older than RETENTION_DAYS; returns how many were deleted"""
+    cutoff = (now or timezone.now()) - timedelta(days=slow_query_log_config()['RETENTION_DAYS'])
+    deleted, _ = SlowQueryBucket.objects.filter(bucket_start__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,170 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from recommendation.enhanced_services import EnhancedRecommendationEngine
+from .db_router import ReplicaPinningMiddleware, ReplicaRouter, replica_reads
+from .middleware import QueryBudgetMiddleware
+from .query_profiler import QueryProfilerMiddleware, get_report, normalize_sql, profile_block
+
+
+def run_queries(count):
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(count):
+                cursor.execute('SELECT 1')
+        return HttpResponse('ok')
+    return view
+
+
+class QueryBudgetMiddlewareTestCase(SimpleTestCase):
+    """Requests over the query budget are logged and flagged"""
+
+    databases = {'default'}
+
+    def setUp(self):
+        self.request = RequestFactory().get('/api/tests/')
+
+    @override_settings(QUERY_BUDGET={'MAX_QUERIES': 3, 'HEADERS': True})
+    def test_within_budget(self):
+        response = QueryBudgetMiddleware(run_queries(3))(self.request)
+        self.assertEqual(response['X-DB-Queries'], '3')
+        self.assertNotIn('X-Query-Budget-Exceeded', response)
+
+    @override_settings(QUERY_BUDGET={'MAX_QUERIES': 3})
+    def test_over_budget(self):
+        with self.assertLogs('careerquest.db', 'WARNING') as logs:
+            response = QueryBudgetMiddleware(run_queries(4))(self.request)
+        self.assertIn('4 queries > 3', response['X-Query-Budget-Exceeded'])
+        self.assertIn('/api/tests/', logs.output[0])
+        self.assertNotIn('X-DB-Queries', response)
+
+    @override_settings(QUERY_BUDGET={'MAX_QUERIES': 0, 'EXCLUDE_PATHS': ('/api/',)})
+    def test_excluded_paths(self):
+        response = QueryBudgetMiddleware(run_queries(1))(self.request)
+        self.assertNotIn('X-Query-Budget-Exceeded', response)
+
+
+REPLICA_DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:', 'TEST': {'MIRROR': 'default'}},
+}
+
+
+@override_settings(
+    DATABASES=REPLICA_DATABASES,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'replica-tests'}},
+)
+class ReplicaRouterTestCase(SimpleTestCase):
+    """Reads go to the replica inside replica_reads scopes, writers stay on the primary"""
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.user = SimpleNamespace(pk=7, is_authenticated=True)
+
+    def request(self, view):
+        request = RequestFactory().get('/api/history/')
+        request.user = self.user
+        return ReplicaPinningMiddleware(view)(request)
+
+    def test_reads_use_the_replica_only_inside_a_scope(self):
+        self.assertEqual(self.router.db_for_read(None), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(None), 'replica')
+            self.assertEqual(replica_reads(lambda: self.router.db_for_read(None))(), 'replica')
+            self.assertEqual(self.router.db_for_write(None), 'default')
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_without_replica_everything_uses_the_primary(self):
+        with override_settings(DATABASES={'default': REPLICA_DATABASES['default']}):
+            with replica_reads():
+                self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_writers_read_their_writes(self):
+        def write_then_read(request):
+            with replica_reads():
+                before = self.router.db_for_read(None)
+                self.router.db_for_write(None)
+                return HttpResponse(f"{before},{self.router.db_for_read(None)}")
+
+        def read(request):
+            with replica_reads():
+                return HttpResponse(self.router.db_for_read(None))
+
+        self.assertEqual(self.request(write_then_read).content, b'replica,default')
+        self.assertEqual(self.request(read).content, b'default')
+
+        cache.clear()
+        self.assertEqual(self.request(read).content, b'replica')
+
+    def test_recommendation_job_data_reads_from_the_replica(self):
+        read_from = []
+
+        def active_jobs(**filters):
+            read_from.append(self.router.db_for_read(None))
+            return mock.Mock(prefetch_related=mock.Mock(return_value=[]))
+
+        with mock.patch.object(EnhancedRecommendationEngine, 'load_scoring_weights', return_value={}), \
+                mock.patch('recommendation.enhanced_services.JobOffer') as job_offer:
+            job_offer.objects.filter.side_effect = active_jobs
+            engine = EnhancedRecommendationEngine()
+            self.assertEqual(engine.prepare_job_data_enhanced(), ([], []))
+
+        self.assertEqual(read_from, ['replica'])
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_migrations_only_run_on_the_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'testsengine'))
+        self.assertFalse(self.router.allow_migrate('replica', 'testsengine'))
+
+
+def run_n_plus_one(request):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1, 2')
+        with profile_block('lookups'):
+            for user_id in range(6):
+                cursor.execute('SELECT %s', [user_id])
+    return HttpResponse('ok')
+
+
+@override_settings(
+    DEBUG=False,
+    QUERY_PROFILER={'TOKEN': 'secret', 'N_PLUS_ONE_THRESHOLD': 5},
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'profiler-tests'}},
+)
+class QueryProfilerMiddlewareTestCase(SimpleTestCase):
+    """Profiled requests report repeated statements, their origin and timed blocks"""
+
+    databases = {'default'}
+
+    def profile(self, **headers):
+        request = RequestFactory().get('/api/test-history/', headers=headers)
+        return QueryProfilerMiddleware(run_n_plus_one)(request)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'\n LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+    def test_reports_n_plus_one_with_origin(self):
+        with self.assertLogs('careerquest.db.profile', 'WARNING'):
+            response = self.profile(x_profile_queries='secret')
+
+        report = get_report(response['X-Query-Profile'])
+        self.assertEqual(report['queries'], 7)
+        [suspect] = report['n_plus_one']
+        self.assertEqual((suspect['sql'], suspect['count']), ('SELECT ?', 6))
+        self.assertIn('in run_n_plus_one', suspect['origins'][0])
+        self.assertEqual(report['blocks'][0]['name'], 'lookups')
+        self.assertEqual(report['blocks'][0]['queries'], 6)
+        self.assertEqual(len(report['slowest']), 3)
+
+    def test_header_needs_the_token(self):
+        self.assertNotIn('X-Query-Profile', self.profile(x_profile_queries='guess'))
+        self.assertNotIn('X-Query-Profile', self.profile())
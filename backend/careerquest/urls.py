@@ -38,6 +38,8 @@ urlpatterns = [
  path("api/auth/", include("auth_api.urls")),
  # Expose tests engine API under /api/
  path("", include("testsengine.urls")),
+ # Universal scoring system API
+ path("api/scoring/", include("testsengine.urls_scoring")),
  # Expose skills API (skills, candidates, technical tests, results) under /api/
  path("", include("skills.urls")),
  # Expose recommendation API under /api/
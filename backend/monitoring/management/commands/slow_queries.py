@@ -0,0 +1,84 @@
+"""
+List the statements of the slow-query log
+
+    python manage.py slow_queries --hours 24 --sort p95_ms
+    python manage.py slow_queries --compare --since 2026-10-19T14:00
+    python manage.py slow_queries --compare --hours 1 --fail-on-regression
+    python manage.py slow_queries --prune
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from careerquest.slow_query_log import SORT_KEYS, find_regressions, prune, top_offenders
+
+
+class Command(BaseCommand):
+    help = 'Show the top slow statements, or the ones that regressed between two windows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Window length in hours (default: 24)')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total_ms', help='Order of the top list')
+        parser.add_argument('--limit', type=int, default=20, help='Statements to show (default: 20)')
+        parser.add_argument('--compare', action='store_true',
+                            help='Compare the window with the one of the same length before it')
+        parser.add_argument('--since', help='Start of the compared window, e.g. the deploy time (ISO 8601)')
+        parser.add_argument('--ratio', type=float, help='p95 / rate growth flagged as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when a statement regressed (for deploy pipelines)')
+        parser.add_argument('--prune', action='store_true', help='Delete buckets past the retention period')
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            self.stdout.write(f"Deleted {prune()} slow query buckets")
+            return
+
+        if options['compare']:
+            self.compare(options)
+            return
+
+        offenders = top_offenders(hours=options['hours'], sort=options['sort'], limit=options['limit'])
+        if not offenders:
+            self.stdout.write(f"No slow queries in the last {options['hours']}h")
+            return
+        self.stdout.write(f"Top slow queries of the last {options['hours']}h by {options['sort']}:")
+        for entry in offenders:
+            self.write_entry(entry)
+
+    def compare(self, options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        regressions = find_regressions(since=since, hours=options['hours'], ratio=options['ratio'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No slow query regressions'))
+            return
+
+        for regression in regressions:
+            current, baseline = regression['current'], regression['baseline']
+            if baseline is None:
+                self.stdout.write(self.style.WARNING(f"NEW        {current['count']}x p95 {current['p95_ms']} ms"))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"REGRESSED  p95 {baseline['p95_ms']} -> {current['p95_ms']} ms "
+                    f"(x{regression['p95_ratio']}), rate x{regression['rate_ratio']}"
+                ))
+            self.write_entry(current)
+
+        if options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} slow query regressions")
+
+    def write_entry(self, entry):
+        self.stdout.write(
+            f"  {entry['count']:>6}x  total {entry['total_ms']:>10} ms  "
+            f"p50 {entry['p50_ms']}  p95 {entry['p95_ms']}  p99 {entry['p99_ms']}  max {entry['max_ms']} ms  "
+            f"rows {entry['rows']}  last {entry['last_seen']:%Y-%m-%d %H:%M}"
+        )
+        self.stdout.write(f"          {entry['fingerprint'][:12]} {', '.join(entry['views']) or '-'}")
+        self.stdout.write(f"          {entry['sql'][:200]}")
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQueryBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fingerprint", models.CharField(max_length=40)),
+                ("sql", models.TextField()),
+                ("view", models.CharField(blank=True, max_length=200)),
+                ("bucket_start", models.DateTimeField()),
+                ("source", models.CharField(max_length=100)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("rows", models.BigIntegerField(default=0)),
+                ("histogram", models.JSONField(default=dict)),
+                ("last_seen", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [models.Index(fields=["bucket_start"], name="slowquery_bucket_start_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="slowquerybucket",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "view", "bucket_start", "source"), name="slowquery_bucket_source_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class SlowQueryBucket(models.Model):
+    """Slow executions of one normalized statement, issued by one view, in one time bucket.
+
+    Written by careerquest.slow_query_log. Every process upserts its own
+    running totals under `source` (host:pid), so a flush is a single
+    statement and never reads the row back; readers sum the sources.
+    `histogram` maps latency bucket indexes (see LATENCY_BOUNDS_MS there)
+    to execution counts.
+    """
+
+    fingerprint = models.CharField(max_length=40)
+    sql = models.TextField()
+    view = models.CharField(max_length=200, blank=True)
+    bucket_start = models.DateTimeField()
+    source = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    rows = models.BigIntegerField(default=0)
+    histogram = models.JSONField(default=dict)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "view", "bucket_start", "source"], name="slowquery_bucket_source_uniq"
+            ),
+        ]
+        indexes = [models.Index(fields=["bucket_start"], name="slowquery_bucket_start_idx")]
+
+    def __str__(self):
+        return f"{self.fingerprint[:8]} {self.view or '-'} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.source})"
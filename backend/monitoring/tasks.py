@@ -0,0 +1,31 @@
+"""
+Celery tasks for the monitoring app
+
+Scheduled by celery beat, see CELERY_BEAT_SCHEDULE in settings.
+"""
+
+import logging
+
+from celery import shared_task
+
+from careerquest.slow_query_log import find_regressions, prune
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def check_slow_query_regressions(hours: int = 1):
+    """
+    Flag statements of the slow-query log that are new or regressed in the
+    last `hours` against the window before, and prune expired buckets.
+    """
+    regressions = find_regressions(hours=hours)
+    for regression in regressions:
+        current, baseline = regression['current'], regression['baseline']
+        change = 'new' if baseline is None else f"p95 {baseline['p95_ms']} -> {current['p95_ms']} ms, rate x{regression['rate_ratio']}"
+        logger.warning(
+            f"Slow query regression ({change}) in {', '.join(current['views']) or 'unknown view'}: {current['sql'][:200]}",
+            extra={'fingerprint': regression['fingerprint']},
+        )
+    prune()
+    return len(regressions)
@@ -0,0 +1,122 @@
+"""
+Tests for the persistent slow-query log
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from careerquest.slow_query_log import (
+    SlowQueryLog, SlowQueryLogMiddleware, compare_windows, histogram_bin, quantile, top_offenders
+)
+
+from .models import SlowQueryBucket
+
+NOW = datetime(2026, 10, 19, 15, 0, tzinfo=dt_timezone.utc)
+
+
+class HistogramTestCase(SimpleTestCase):
+    """Latency percentiles from the 25% bins stay within a bin of the truth"""
+
+    def test_quantiles(self):
+        histogram = {}
+        for duration_ms in range(100, 1100):
+            index = str(histogram_bin(duration_ms))
+            histogram[index] = histogram.get(index, 0) + 1
+
+        for q, exact in ((0.5, 600), (0.95, 1050), (0.99, 1090)):
+            self.assertAlmostEqual(quantile(histogram, q), exact, delta=exact * 0.25)
+        self.assertIsNone(quantile({}, 0.5))
+
+
+class SlowQueryLogTestCase(TestCase):
+    """Aggregated slow statements are merged into buckets and compared across windows"""
+
+    def record(self, log, sql, durations, view='test-history', now=NOW):
+        log.record([(sql, duration_ms, 1) for duration_ms in durations], view, now=now)
+
+    def test_flushes_merge_into_one_bucket(self):
+        log = SlowQueryLog()
+        self.record(log, 'SELECT * FROM t WHERE id = %s', [120, 150])
+        log.flush()
+        self.record(log, 'SELECT * FROM t WHERE id = %s', [400], now=NOW + timedelta(minutes=5))
+        log.flush()
+
+        bucket = SlowQueryBucket.objects.get()
+        self.assertEqual((bucket.count, bucket.max_ms, bucket.rows), (3, 400, 3))
+        self.assertEqual(bucket.sql, 'SELECT * FROM t WHERE id = ?')
+        self.assertEqual(sum(bucket.histogram.values()), 3)
+
+        [entry] = top_offenders(hours=1, now=NOW + timedelta(minutes=10))
+        self.assertEqual(entry['count'], 3)
+        self.assertEqual(entry['views'], ['test-history'])
+
+    def test_flush_is_one_upsert_of_the_changed_buckets(self):
+        log = SlowQueryLog()
+        self.record(log, 'SELECT a', [120])
+        self.record(log, 'SELECT b', [130])
+        with self.assertNumQueries(1):
+            log.flush()
+        with self.assertNumQueries(0):
+            log.flush()
+
+        self.record(log, 'SELECT b', [500])
+        with self.assertNumQueries(1):
+            log.flush()
+        self.assertEqual(
+            dict(SlowQueryBucket.objects.values_list('sql', 'count')), {'SELECT a': 1, 'SELECT b': 2}
+        )
+
+    def test_sources_are_summed(self):
+        for source, durations in (('web-1:10', [120, 130]), ('web-2:11', [900])):
+            log = SlowQueryLog(source=source)
+            self.record(log, 'SELECT shared', durations)
+            log.flush()
+
+        self.assertEqual(SlowQueryBucket.objects.count(), 2)
+        [entry] = top_offenders(hours=1, now=NOW + timedelta(minutes=10))
+        self.assertEqual((entry['count'], entry['max_ms']), (3, 900))
+
+    def test_compare_flags_new_and_regressed_statements(self):
+        log = SlowQueryLog()
+        baseline_start = NOW - timedelta(hours=1)
+        self.record(log, 'SELECT steady', [110] * 10, now=baseline_start)
+        self.record(log, 'SELECT slower', [110] * 10, now=baseline_start)
+        self.record(log, 'SELECT steady', [115] * 10)
+        self.record(log, 'SELECT slower', [400] * 10)
+        self.record(log, 'SELECT fresh', [200] * 10)
+        self.record(log, 'SELECT rare', [900] * 2)
+        log.flush()
+
+        flagged = compare_windows((NOW, NOW + timedelta(hours=1)), (baseline_start, NOW))
+        self.assertEqual(
+            {(entry['sql'], entry['status']) for entry in flagged},
+            {('SELECT slower', 'regressed'), ('SELECT fresh', 'new')},
+        )
+
+
+class SlowQueryLogMiddlewareTestCase(SimpleTestCase):
+    """Requests record slow statements in memory and leave the writes to the flusher"""
+
+    databases = {'default'}
+
+    def slow_view(self, request):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return HttpResponse('ok')
+
+    @override_settings(SLOW_QUERY_LOG={'MIN_DURATION_MS': 0, 'MAX_PENDING': 1})
+    def test_request_does_not_flush(self):
+        log = SlowQueryLog()
+        request = RequestFactory().get('/api/tests/')
+        with mock.patch('careerquest.slow_query_log.slow_query_log', log), \
+                mock.patch.object(log, 'start_flusher') as start_flusher, \
+                mock.patch.object(log, 'flush') as flush:
+            SlowQueryLogMiddleware(self.slow_view)(request)
+
+        flush.assert_not_called()
+        start_flusher.assert_called_once_with(30)
+        self.assertTrue(log._wake.is_set())
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class TestsengineConfig(AppConfig):
  default_auto_field = "django.db.models.BigAutoField"
  name = "testsengine"
+
+ def ready(self):
+  # Import signals to connect them when the app is ready
+  import testsengine.signals
@@ -0,0 +1,88 @@
+import logging
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .services.execution_queue import FINISHED_STATES, QueueFull, get_job, submit_job
+
+logger = logging.getLogger(__name__)
+
+MAX_CODE_LENGTH = 64 * 1024
+MAX_TEST_CASES = 100
+
+# Seconds a client should wait before polling an unfinished job again
+POLL_RETRY_AFTER = 1
+
+
+def _user_job(request, job_id):
+    job = get_job(job_id)
+    if job is None or job['user_id'] != request.user.id:
+        return None
+    return job
+
+
+def _job_response(job, status_code=status.HTTP_200_OK):
+    """Job payload; unfinished jobs carry a Retry-After hint for the next poll"""
+    data = {**job, 'poll_url': reverse('code-execution-detail', args=[job['job_id']])}
+    finished = job['status'] in FINISHED_STATES
+    if not finished:
+        data['retry_after'] = POLL_RETRY_AFTER
+    response = Response(data, status=status_code)
+    if not finished:
+        response['Retry-After'] = str(POLL_RETRY_AFTER)
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_code_execution(request):
+    """Queue code for execution and return its job id immediately"""
+    code = request.data.get('code')
+    language = request.data.get('language', 'python')
+    test_cases = request.data.get('test_cases')
+
+    if not isinstance(code, str) or not code.strip():
+        return Response({'error': 'code is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(code) > MAX_CODE_LENGTH:
+        return Response({'error': f'code exceeds {MAX_CODE_LENGTH} characters'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(test_cases, list) or not test_cases:
+        return Response({'error': 'test_cases must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(test_cases) > MAX_TEST_CASES:
+        return Response({'error': f'At most {MAX_TEST_CASES} test cases per submission'}, status=status.HTTP_400_BAD_REQUEST)
+    if any(not isinstance(case, dict) or 'input' not in case or 'expected_output' not in case for case in test_cases):
+        return Response({'error': 'Each test case needs input and expected_output'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        job = submit_job(
+            request.user.id, code, language, test_cases,
+            problem_spec=request.data.get('problem_spec'),
+            grading_mode=request.data.get('grading_mode'),
+        )
+    except QueueFull as e:
+        response = Response({'error': str(e), 'retry_after': e.retry_after}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except Exception as e:
+        logger.error(f"Error queueing code execution: {e}")
+        return Response({'error': 'Failed to queue code execution'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return _job_response(job, status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_code_execution(request, job_id):
+    """
+    Poll a code execution job; results holds every case finished so far.
+
+    The request returns immediately. Until the job finishes the response
+    carries Retry-After, the number of seconds to wait before polling again.
+    """
+    job = _user_job(request, job_id)
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return _job_response(job)
+
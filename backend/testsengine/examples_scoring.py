@@ -10,7 +10,7 @@ from decimal import Decimal
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-from .models_scoring import ScoringConfig, Question, TestSession
+from .models_scoring import ScoringConfig, UniversalQuestion, UniversalTestSession
 from .scoring_system import (
  UniversalScoringSystem, GlobalScoringConfig, Question as ScoringQuestion,
  ScoreWeight, ScoringPresets, QuestionType
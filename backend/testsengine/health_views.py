@@ -4,8 +4,14 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import connection
 
+from careerquest.query_profiler import get_report
+from careerquest.slow_query_log import SORT_KEYS, find_regressions, top_offenders
+
+from .services.result_cache import get_result_cache
+
 try:
     from .models import Test, Question
 except ImportError:
@@ -68,6 +74,7 @@ def testsengine_status(request):
     Detailed status endpoint for authenticated users
     """
     try:
+        result_cache = get_result_cache()
         return Response({
             'status': 'operational',
             'service': 'testsengine',
@@ -77,7 +84,8 @@ def testsengine_status(request):
                 'test_taking': True,
                 'history_tracking': True,
                 'scoring': True
-            }
+            },
+            'code_result_cache': result_cache.stats() if result_cache else None
         })
     
     except Exception as e:
@@ -86,4 +94,59 @@ def testsengine_status(request):
             'status': 'error',
             'service': 'testsengine',
             'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def query_profile_detail(request, profile_id):
+    """
+    Query profile of a profiled request (id from its X-Query-Profile header)
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'error': 'Permission denied. Admin access required.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    report = get_report(profile_id)
+    if report is None:
+        return Response({'error': 'Query profile not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(report)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def slow_query_report(request):
+    """
+    Top slow statements: ?hours=24&sort=p95_ms&limit=20
+
+    With ?compare=1 (and optionally &since=<ISO datetime>, e.g. a deploy),
+    the statements that are new or regressed against the window before.
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'error': 'Permission denied. Admin access required.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        hours = int(request.query_params.get('hours', 24))
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'hours and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    sort = request.query_params.get('sort', 'total_ms')
+    if sort not in SORT_KEYS:
+        return Response({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.query_params.get('compare'):
+        since = request.query_params.get('since')
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                return Response({'error': 'since must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        return Response({'regressions': find_regressions(since=since, hours=hours)})
+
+    return Response({'hours': hours, 'sort': sort, 'queries': top_offenders(hours=hours, sort=sort, limit=limit)})
@@ -0,0 +1,114 @@
+"""
+Rescore stored test submissions in bulk.
+
+Usage:
+    python manage.py rescore_submissions
+    python manage.py rescore_submissions --batch-size 1000 --test-id 12
+    python manage.py rescore_submissions --plan-workers 4
+    python manage.py rescore_submissions --start-id 1 --end-id 250000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from testsengine.models import TestSubmission
+from testsengine.services.rescoring import BatchRescorer
+
+
+class Command(BaseCommand):
+    help = 'Rescore test submissions in keyset-paginated batches using bulk updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of submissions processed per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--start-id',
+            type=int,
+            help='Only rescore submissions with id >= start-id',
+        )
+        parser.add_argument(
+            '--end-id',
+            type=int,
+            help='Only rescore submissions with id <= end-id',
+        )
+        parser.add_argument(
+            '--test-id',
+            type=int,
+            action='append',
+            dest='test_ids',
+            help='Restrict to a test id (repeatable)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute changes without writing them',
+        )
+        parser.add_argument(
+            '--plan-workers',
+            type=int,
+            help='Print id ranges for N parallel processes and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['plan_workers']:
+            self.plan_workers(options['plan_workers'])
+            return
+
+        rescorer = BatchRescorer(
+            batch_size=options['batch_size'],
+            start_id=options.get('start_id'),
+            end_id=options.get('end_id'),
+            test_ids=options.get('test_ids'),
+            dry_run=options['dry_run'],
+        )
+
+        stats = rescorer.run(progress_callback=self.report_progress)
+        summary = stats.as_dict()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {summary['submissions']} submission(s) in {summary['elapsed_seconds']}s "
+            f"({summary['throughput_per_second']}/s)"
+        ))
+        self.stdout.write(f"  Scores changed: {summary['scores_changed']}")
+        self.stdout.write(f"  Scores created: {summary['scores_created']}")
+        self.stdout.write(f"  Answers changed: {summary['answers_changed']}")
+        self.stdout.write(f"  Rebuilt from answers_data: {summary['rebuilt_from_answers_data']}")
+        self.stdout.write(f"  Unchanged (not written): {summary['unchanged']}")
+        if summary['answers_outside_test']:
+            self.stdout.write(self.style.WARNING(
+                f"  Answers to questions moved to another test: {summary['answers_outside_test']}"
+            ))
+        if summary['errors']:
+            self.stdout.write(self.style.WARNING(f"  Errors: {summary['errors']}"))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no changes were written'))
+
+    def report_progress(self, stats):
+        self.stdout.write(
+            f"Batch {stats.batches}: {stats.submissions} rescored, "
+            f"{stats.scores_changed} changed, last id {stats.last_id} "
+            f"({stats.throughput:.1f}/s)"
+        )
+
+    def plan_workers(self, workers):
+        if workers <= 0:
+            raise CommandError('--plan-workers must be positive')
+
+        bounds = TestSubmission.objects.aggregate(low=Min('id'), high=Max('id'))
+        low, high = bounds['low'], bounds['high']
+        if low is None:
+            self.stdout.write(self.style.WARNING('No submissions found'))
+            return
+
+        span = high - low + 1
+        step = -(-span // workers)  # ceiling division
+        for index in range(workers):
+            start = low + index * step
+            if start > high:
+                break
+            end = min(high, start + step - 1)
+            self.stdout.write(f"python manage.py rescore_submissions --start-id {start} --end-id {end}")
@@ -8,7 +8,9 @@ class Migration(migrations.Migration):
 
     dependencies = [
         migrations.swappable_dependency(settings.AUTH_USER_MODEL),
-        ("testsengine", "0013_delete_testhistory"),
+        # 0002-0013 are not in this tree; 0001_initial plus the operations below
+        # give the schema that models.py describes
+        ("testsengine", "0001_initial"),
     ]
 
     operations = [
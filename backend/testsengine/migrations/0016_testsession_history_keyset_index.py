@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Composite index for the keyset-paginated test history: a page is an
+    index range scan on (user, start_time DESC, id DESC). It also serves
+    every query the (user, -start_time) index did, which it replaces.
+    """
+
+    dependencies = [
+        ("testsengine", "0015_remove_unique_constraint_from_testsubmission"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="testsession",
+            index=models.Index(
+                fields=["user", "-start_time", "-id"],
+                name="testsengine_user_start_id_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="testsession",
+            name="testsengine_user_id_25733c_idx",
+        ),
+    ]
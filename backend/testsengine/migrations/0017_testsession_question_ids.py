@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("testsengine", "0016_testsession_history_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testsession",
+            name="question_ids",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Questions drawn for this session, in delivery order (empty: the whole test)",
+            ),
+        ),
+    ]
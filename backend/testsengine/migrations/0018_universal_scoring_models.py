@@ -0,0 +1,125 @@
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('testsengine', '0017_testsession_question_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringConfig',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('time_weight', models.DecimalField(decimal_places=2, default=0.3, max_digits=3, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('difficulty_weight', models.DecimalField(decimal_places=2, default=0.5, max_digits=3, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('accuracy_weight', models.DecimalField(decimal_places=2, default=0.2, max_digits=3, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Scoring Configuration',
+                'verbose_name_plural': 'Scoring Configurations',
+                'db_table': 'scoring_configs',
+            },
+        ),
+        migrations.CreateModel(
+            name='UniversalQuestion',
+            fields=[
+                ('id', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('question_type', models.CharField(choices=[('multiple_choice', 'Multiple Choice'), ('numerical', 'Numerical'), ('verbal', 'Verbal'), ('abstract', 'Abstract'), ('spatial', 'Spatial'), ('situational', 'Situational Judgment'), ('diagrammatic', 'Diagrammatic'), ('technical', 'Technical'), ('logical', 'Logical'), ('open_ended', 'Open Ended')], default='multiple_choice', max_length=20)),
+                ('question_text', models.TextField()),
+                ('correct_answer', models.TextField()),
+                ('difficulty', models.IntegerField(default=1, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('section', models.IntegerField(default=1)),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('options', models.JSONField(blank=True, default=list)),
+                ('base_score', models.IntegerField(default=5)),
+                ('difficulty_bonus', models.DecimalField(decimal_places=1, default=2.0, max_digits=3)),
+                ('time_factor', models.DecimalField(decimal_places=1, default=1.0, max_digits=3)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Universal Question',
+                'verbose_name_plural': 'Universal Questions',
+                'db_table': 'questions',
+                'ordering': ['section', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UniversalTestSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_id', models.CharField(max_length=100)),
+                ('test_type', models.CharField(max_length=50)),
+                ('started_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('completed', 'Completed'), ('abandoned', 'Abandoned'), ('time_expired', 'Time Expired')], default='in_progress', max_length=20)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('scoring_config', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='testsengine.scoringconfig')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Universal Test Session',
+                'verbose_name_plural': 'Universal Test Sessions',
+                'db_table': 'test_sessions',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_score', models.IntegerField(default=0)),
+                ('max_possible_score', models.IntegerField(default=0)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('total_questions', models.IntegerField(default=0)),
+                ('answered_questions', models.IntegerField(default=0)),
+                ('correct_answers', models.IntegerField(default=0)),
+                ('total_time_seconds', models.IntegerField(default=0)),
+                ('average_time_per_question', models.DecimalField(decimal_places=2, default=0.0, max_digits=8)),
+                ('difficulty_breakdown', models.JSONField(blank=True, default=dict)),
+                ('performance_level', models.CharField(blank=True, max_length=50)),
+                ('grade', models.CharField(blank=True, max_length=2)),
+                ('recommendations', models.JSONField(blank=True, default=list)),
+                ('calculated_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='testsengine.universaltestsession')),
+            ],
+            options={
+                'verbose_name': 'Test Result',
+                'verbose_name_plural': 'Test Results',
+                'db_table': 'test_results',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_answer', models.TextField()),
+                ('time_taken', models.DecimalField(decimal_places=2, help_text='Time taken in seconds', max_digits=8)),
+                ('answered_at', models.DateTimeField(auto_now_add=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('calculated_score', models.IntegerField(default=0)),
+                ('score_breakdown', models.JSONField(blank=True, default=dict)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='testsengine.universalquestion')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='testsengine.universaltestsession')),
+            ],
+            options={
+                'verbose_name': 'Question Response',
+                'verbose_name_plural': 'Question Responses',
+                'db_table': 'question_responses',
+                'ordering': ['answered_at'],
+                'unique_together': {('session', 'question')},
+            },
+        ),
+    ]
@@ -1,44 +1,325 @@
-"""Minimal, stable models for the testsengine app.
+"""Models for the testsengine app.
 
-This module intentionally contains a small, well-formed set of models so
-Django can import the app during development. Expand these carefully once
-the environment is stable.
+The schema is the one built by the migrations in this app (0001_initial
+and the TestSession/TestSubmission changes after it). Scoring uses the
+difficulty coefficients of ScoringConfig: Easy=1.0, Medium=1.5, Hard=2.0.
 """
 
+from decimal import Decimal
+
 from django.conf import settings
 from django.db import models
 
 
+DIFFICULTY_COEFFICIENTS = {
+    'easy': Decimal('1.0'),
+    'medium': Decimal('1.5'),
+    'hard': Decimal('2.0'),
+}
+
+GRADE_THRESHOLDS = ((90, 'A'), (80, 'B'), (70, 'C'), (60, 'D'), (0, 'F'))
+
+
 class Test(models.Model):
-    """A minimal Test model."""
+    TEST_TYPES = [
+        ('verbal_reasoning', 'Verbal Reasoning'),
+        ('numerical_reasoning', 'Numerical Reasoning'),
+        ('logical_reasoning', 'Logical Reasoning'),
+        ('abstract_reasoning', 'Abstract Reasoning'),
+        ('spatial_reasoning', 'Spatial Reasoning'),
+        ('situational_judgment', 'Situational Judgment'),
+        ('technical', 'Technical'),
+    ]
 
-    title = models.CharField(max_length=200)
-    test_type = models.CharField(max_length=50)
+    title = models.CharField(max_length=200, db_index=True)
+    test_type = models.CharField(max_length=50, choices=TEST_TYPES, db_index=True)
+    description = models.TextField()
+    duration_minutes = models.PositiveIntegerField(
+        default=20, help_text='Fixed duration in minutes (20 minutes for all tests)'
+    )
+    total_questions = models.PositiveIntegerField(help_text='Total number of questions in this test')
+    passing_score = models.PositiveIntegerField(default=70, help_text='Minimum percentage score to pass')
+    max_possible_score = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True,
+        help_text='Maximum possible score using difficulty coefficients'
+    )
+    is_active = models.BooleanField(default=True, db_index=True)
+    version = models.CharField(max_length=10, default='1.0', help_text='Test version for tracking changes')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["test_type", "title"]
+        ordering = ['test_type', 'title']
+        indexes = [
+            models.Index(fields=['test_type', 'is_active'], name='testsengine_test_ty_8cd7c7_idx'),
+            models.Index(fields=['is_active', 'created_at'], name='testsengine_is_acti_cac403_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(check=models.Q(total_questions__gt=0), name='positive_total_questions'),
+            models.CheckConstraint(check=models.Q(duration_minutes__gt=0), name='positive_duration'),
+            models.CheckConstraint(
+                check=models.Q(passing_score__gte=0, passing_score__lte=100), name='valid_passing_score'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.test_type})"
 
+    def calculate_max_score(self):
+        """Maximum score of the test: the sum of its questions' coefficients"""
+        return sum(
+            (DIFFICULTY_COEFFICIENTS.get(level, Decimal('1.0'))
+             for level in self.questions.values_list('difficulty_level', flat=True)),
+            Decimal('0.0')
+        )
+
 
 class Question(models.Model):
-    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name="questions")
+    QUESTION_TYPES = [
+        ('reading_comprehension', 'Reading Comprehension'),
+        ('vocabulary', 'Vocabulary in Context'),
+        ('logical_deduction', 'Logical Deduction from Text'),
+        ('critical_reasoning', 'Critical Reasoning'),
+        ('analogies', 'Analogies and Relationships'),
+        ('mental_rotation', 'Mental Rotation'),
+        ('paper_folding', 'Paper Folding/Unfolding'),
+        ('cross_sections', 'Cross-sections Identification'),
+        ('spatial_transformation', 'Spatial Transformation'),
+        ('perspective_changes', 'Perspective Changes'),
+        ('multiple_choice', 'Multiple Choice'),
+        ('situational_judgment', 'Situational Judgment'),
+    ]
+
+    DIFFICULTY_LEVELS = [
+        ('easy', 'Easy (Coefficient: 1.0)'),
+        ('medium', 'Medium (Coefficient: 1.5)'),
+        ('hard', 'Hard (Coefficient: 2.0)'),
+    ]
+
+    VISUAL_STYLES = [
+        ('technical_3d', 'Technical 3D Render'),
+        ('diagram', 'Technical Diagram'),
+        ('wireframe', 'Wireframe'),
+        ('isometric', 'Isometric View'),
+        ('orthographic', 'Orthographic Projection'),
+    ]
+
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='questions')
+    question_type = models.CharField(max_length=50, choices=QUESTION_TYPES, db_index=True)
     question_text = models.TextField()
-    order = models.PositiveIntegerField()
+    passage = models.TextField(blank=True, null=True)
+    context = models.TextField(blank=True, null=True)
+    options = models.JSONField(help_text='Store options as JSON array')
+    correct_answer = models.CharField(max_length=10, db_index=True, help_text='Correct answer (A, B, C, D, etc.)')
+    explanation = models.TextField(blank=True, null=True)
+    difficulty_level = models.CharField(
+        max_length=20, choices=DIFFICULTY_LEVELS, default='medium', db_index=True,
+        help_text='Determines scoring coefficient: Easy=1.0, Medium=1.5, Hard=2.0'
+    )
+    order = models.PositiveIntegerField(help_text='Order of question within the test')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Spatial reasoning assets
+    main_image = models.URLField(blank=True, null=True)
+    option_images = models.JSONField(default=list, blank=True)
+    sequence_images = models.JSONField(default=list, blank=True)
+    base_image_id = models.CharField(max_length=100, blank=True, null=True)
+    overlay_ids = models.JSONField(default=list, blank=True)
+    transforms = models.JSONField(default=dict, blank=True)
+    option_remap = models.JSONField(default=dict, blank=True)
+    visual_style = models.CharField(max_length=50, choices=VISUAL_STYLES, default='technical_3d', blank=True)
+    complexity_score = models.PositiveIntegerField(default=1, help_text='1-5 visual complexity rating')
 
     class Meta:
-        ordering = ["test", "order"]
+        ordering = ['test', 'order']
+        indexes = [
+            models.Index(fields=['test', 'order'], name='testsengine_test_id_2bd618_idx'),
+            models.Index(fields=['test', 'difficulty_level'], name='testsengine_test_id_846e7c_idx'),
+            models.Index(fields=['question_type', 'difficulty_level'], name='testsengine_questio_58944f_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['test', 'order'], name='unique_test_question_order'),
+            models.CheckConstraint(check=models.Q(order__gt=0), name='positive_question_order'),
+            models.CheckConstraint(
+                check=models.Q(complexity_score__gte=1, complexity_score__lte=5), name='valid_complexity_score'
+            ),
+        ]
 
     def __str__(self):
         return f"Q{self.order}: {self.question_text[:50]}..."
 
+    @property
+    def scoring_coefficient(self):
+        return DIFFICULTY_COEFFICIENTS.get(self.difficulty_level, Decimal('1.0'))
+
+    def check_answer(self, selected_answer):
+        """Case- and whitespace-insensitive comparison with correct_answer"""
+        if selected_answer is None:
+            return False
+        return str(selected_answer).strip().upper() == str(self.correct_answer).strip().upper()
+
+
+class QuestionOption(models.Model):
+    """Question options with scoring for SJT tests"""
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='question_options')
+    option_text = models.TextField()
+    score_value = models.IntegerField(help_text="Score: +2 (Best), +1 (Acceptable), 0 (Unacceptable), -1 (Must Not Choose)")
+    option_letter = models.CharField(max_length=1, help_text="A, B, C, D")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['question', 'option_letter']
+        verbose_name = "Question Option"
+        verbose_name_plural = "Question Options"
+        db_table = 'testsengine_questionoption'
+
+    def __str__(self):
+        return f"Q{self.question.id} {self.option_letter}: {self.option_text[:50]}... (Score: {self.score_value})"
+
+
+class TestSubmission(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='test_submissions'
+    )
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='submissions')
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    time_taken_seconds = models.PositiveIntegerField(help_text='Total time taken to complete the test')
+    is_complete = models.BooleanField(default=True, help_text='Whether all questions were answered')
+    answers_data = models.JSONField(default=dict, help_text='Raw answers from frontend for backup/debugging')
+    scored_at = models.DateTimeField(null=True, blank=True, help_text='When the submission was scored')
+    scoring_version = models.CharField(max_length=10, default='1.0', help_text='Version of scoring algorithm used')
+
+    class Meta:
+        ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['user', 'test'], name='testsengine_user_id_b8214b_idx'),
+            models.Index(fields=['submitted_at'], name='testsengine_submitt_18eba9_idx'),
+            models.Index(fields=['test', 'submitted_at'], name='testsengine_test_id_4d9b3c_idx'),
+            models.Index(fields=['user', 'test', '-submitted_at'], name='testsengine_user_id_ba58e6_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.test.title} ({self.submitted_at:%Y-%m-%d})"
+
+
+class Answer(models.Model):
+    submission = models.ForeignKey(TestSubmission, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='user_answers')
+    selected_answer = models.CharField(max_length=10, help_text="User's selected answer (A, B, C, D, etc.)")
+    is_correct = models.BooleanField(help_text='Whether the answer is correct')
+    time_taken_seconds = models.PositiveIntegerField(default=0, help_text='Time taken to answer this specific question')
+    answered_at = models.DateTimeField(auto_now_add=True)
+    points_awarded = models.DecimalField(
+        max_digits=5, decimal_places=2, default=0.0, help_text='Points awarded based on difficulty coefficient'
+    )
+
+    class Meta:
+        ordering = ['question__order']
+        indexes = [
+            models.Index(fields=['submission', 'is_correct'], name='testsengine_submiss_ead3a7_idx'),
+            models.Index(fields=['question', 'is_correct'], name='testsengine_questio_d45953_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['submission', 'question'], name='unique_submission_question_answer'),
+        ]
+
+    def __str__(self):
+        return f"{self.submission} - Q{self.question.order}: {self.selected_answer}"
+
+
+class Score(models.Model):
+    submission = models.OneToOneField(TestSubmission, on_delete=models.CASCADE, related_name='score')
+    raw_score = models.DecimalField(
+        max_digits=8, decimal_places=2, help_text='Total points earned using difficulty coefficients'
+    )
+    max_possible_score = models.DecimalField(
+        max_digits=8, decimal_places=2, help_text='Maximum possible points for this test'
+    )
+    percentage_score = models.DecimalField(max_digits=5, decimal_places=2, help_text='Percentage score (0-100)')
+    correct_answers = models.PositiveIntegerField(help_text='Number of correct answers')
+    total_questions = models.PositiveIntegerField(help_text='Total number of questions')
+
+    # Difficulty breakdown
+    easy_correct = models.PositiveIntegerField(default=0)
+    medium_correct = models.PositiveIntegerField(default=0)
+    hard_correct = models.PositiveIntegerField(default=0)
+    easy_score = models.DecimalField(
+        max_digits=6, decimal_places=2, default=0.0, help_text='Score from easy questions (coefficient 1.0)'
+    )
+    medium_score = models.DecimalField(
+        max_digits=6, decimal_places=2, default=0.0, help_text='Score from medium questions (coefficient 1.5)'
+    )
+    hard_score = models.DecimalField(
+        max_digits=6, decimal_places=2, default=0.0, help_text='Score from hard questions (coefficient 2.0)'
+    )
+
+    # Performance metrics
+    average_time_per_question = models.DecimalField(
+        max_digits=6, decimal_places=2, help_text='Average time per question in seconds'
+    )
+    fastest_question_time = models.PositiveIntegerField(help_text='Fastest question time in seconds')
+    slowest_question_time = models.PositiveIntegerField(help_text='Slowest question time in seconds')
+
+    scoring_algorithm = models.CharField(
+        max_length=50, default='difficulty_weighted', help_text='Algorithm used for scoring'
+    )
+    calculated_at = models.DateTimeField(auto_now_add=True)
+    metadata = models.JSONField(default=dict, blank=True, help_text='Additional scoring data and metrics')
+
+    class Meta:
+        ordering = ['-calculated_at']
+        indexes = [
+            models.Index(fields=['submission', 'percentage_score'], name='testsengine_submiss_21152d_idx'),
+            models.Index(fields=['calculated_at'], name='testsengine_calcula_c59061_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.submission} - {self.percentage_score}%"
+
+    @property
+    def grade_letter(self):
+        for threshold, letter in GRADE_THRESHOLDS:
+            if self.percentage_score >= threshold:
+                return letter
+        return 'F'
+
+    @property
+    def passed(self):
+        return self.percentage_score >= self.submission.test.passing_score
+
 
 class TestSession(models.Model):
+    STATUS_CHOICES = [
+        ('not_started', 'Not Started'),
+        ('in_progress', 'In Progress'),
+        ('completed', 'Completed'),
+        ('abandoned', 'Abandoned'),
+    ]
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     test = models.ForeignKey(Test, on_delete=models.CASCADE)
-    started_at = models.DateTimeField(auto_now_add=True)
+    attempt_number = models.PositiveIntegerField(default=1, help_text='Attempt number for this test')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='not_started')
+    start_time = models.DateTimeField(auto_now_add=True)
+    end_time = models.DateTimeField(null=True, blank=True)
+    current_question = models.IntegerField(default=1)
+    score = models.IntegerField(null=True, blank=True)
+    answers = models.JSONField(default=dict)
+    time_spent = models.IntegerField(default=0)
+    question_ids = models.JSONField(
+        default=list, blank=True,
+        help_text='Questions drawn for this session, in delivery order (empty: the whole test)'
+    )
+
+    class Meta:
+        ordering = ['-start_time']
+        unique_together = [('user', 'test', 'attempt_number')]
+        indexes = [
+            models.Index(fields=['user', 'test', '-start_time'], name='testsengine_user_id_c2a1d9_idx'),
+            # Keyset-paginated history: (user, start_time DESC, id DESC)
+            models.Index(fields=['user', '-start_time', '-id'], name='testsengine_user_start_id_idx'),
+        ]
 
     def __str__(self):
         # username may not exist for some user models in tests; use str(user)
@@ -50,13 +331,178 @@ class TestSession(models.Model):
 
 
 class TestAnswer(models.Model):
-    session = models.ForeignKey(TestSession, on_delete=models.CASCADE, related_name="answers")
+    session = models.ForeignKey(TestSession, on_delete=models.CASCADE, related_name='test_answers')
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
-    selected_answer = models.CharField(max_length=255)
+    selected_answer = models.CharField(max_length=10)
+    is_correct = models.BooleanField()
+    time_taken = models.IntegerField(default=0)
+    answered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['question__order']
+        unique_together = [('session', 'question')]
 
     def __str__(self):
         try:
             uname = self.session.user.username
         except Exception:
             uname = str(self.session.user)
-        return f"{uname} - Q{self.question.order}: {self.selected_answer}"
\ No newline at end of file
+        return f"{uname} - Q{self.question.order}: {self.selected_answer}"
+
+
+class TestAttempt(models.Model):
+    RESULT_CHOICES = [
+        ('completed', 'completed'),
+        ('aborted', 'aborted'),
+        ('timeout', 'timeout'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='test_attempts')
+    test_id = models.CharField(max_length=64, db_index=True)
+    test_version = models.CharField(max_length=32, null=True, blank=True)
+    language = models.CharField(max_length=8, default='en')
+    total_questions = models.PositiveIntegerField()
+    correct = models.PositiveIntegerField()
+    percentage = models.PositiveIntegerField()
+    raw_score = models.FloatField(default=0.0)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_seconds = models.PositiveIntegerField()
+    result = models.CharField(max_length=16, choices=RESULT_CHOICES, default='completed')
+    result_label = models.CharField(max_length=32, null=True, blank=True)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'test_id', 'created_at'], name='testsengine_user_id_5dc22b_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.test_id} ({self.percentage}%)"
+
+
+class CodingChallenge(models.Model):
+    DIFFICULTY_CHOICES = [
+        ('beginner', 'Beginner'),
+        ('intermediate', 'Intermediate'),
+        ('advanced', 'Advanced'),
+        ('expert', 'Expert'),
+    ]
+
+    CATEGORY_CHOICES = [
+        ('algorithms', 'Algorithms'),
+        ('data_structures', 'Data Structures'),
+        ('string_manipulation', 'String Manipulation'),
+        ('mathematics', 'Mathematics'),
+        ('dynamic_programming', 'Dynamic Programming'),
+        ('recursion', 'Recursion'),
+        ('sorting_searching', 'Sorting & Searching'),
+        ('graph_theory', 'Graph Theory'),
+        ('web_development', 'Web Development'),
+        ('database', 'Database'),
+    ]
+
+    LANGUAGE_CHOICES = [
+        ('python', 'Python'),
+        ('javascript', 'JavaScript'),
+        ('java', 'Java'),
+        ('cpp', 'C++'),
+        ('csharp', 'C#'),
+        ('go', 'Go'),
+        ('rust', 'Rust'),
+    ]
+
+    title = models.CharField(max_length=200)
+    slug = models.SlugField(unique=True)
+    description = models.TextField()
+    difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES)
+    category = models.CharField(max_length=30, choices=CATEGORY_CHOICES)
+    language = models.CharField(max_length=20, choices=LANGUAGE_CHOICES)
+    problem_statement = models.TextField()
+    input_format = models.TextField(blank=True, null=True)
+    output_format = models.TextField(blank=True, null=True)
+    constraints = models.TextField(blank=True, null=True)
+    starter_code = models.TextField(blank=True, null=True)
+    solution_code = models.TextField(blank=True, null=True)
+    test_cases = models.JSONField(default=list)
+    max_points = models.IntegerField(default=100)
+    time_limit_seconds = models.IntegerField(default=2)
+    memory_limit_mb = models.IntegerField(default=128)
+    tags = models.JSONField(default=list)
+    estimated_time_minutes = models.IntegerField(default=30)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['difficulty', 'title']
+
+    def __str__(self):
+        return f"{self.title} ({self.difficulty})"
+
+
+class CodingSubmission(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('accepted', 'Accepted'),
+        ('wrong_answer', 'Wrong Answer'),
+        ('compilation_error', 'Compilation Error'),
+        ('runtime_error', 'Runtime Error'),
+        ('time_limit_exceeded', 'Time Limit Exceeded'),
+        ('memory_limit_exceeded', 'Memory Limit Exceeded'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    challenge = models.ForeignKey(CodingChallenge, on_delete=models.CASCADE)
+    code = models.TextField()
+    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending')
+    score = models.IntegerField(default=0)
+    tests_passed = models.IntegerField(default=0)
+    total_tests = models.IntegerField(default=0)
+    execution_time_ms = models.IntegerField(default=0)
+    memory_used_mb = models.FloatField(default=0.0)
+    test_results = models.JSONField(default=list)
+    error_message = models.TextField(blank=True, null=True)
+    compilation_output = models.TextField(blank=True, null=True)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-submitted_at']
+
+    def __str__(self):
+        return f"{self.user} - {self.challenge.title} ({self.status})"
+
+
+class CodingSession(models.Model):
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+        ('abandoned', 'Abandoned'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    challenge = models.ForeignKey(CodingChallenge, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    current_code = models.TextField(blank=True, null=True)
+    best_submission = models.ForeignKey(
+        CodingSubmission, on_delete=models.SET_NULL, null=True, blank=True, related_name='best_for_session'
+    )
+    start_time = models.DateTimeField(auto_now_add=True)
+    last_activity = models.DateTimeField(auto_now=True)
+    completion_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-last_activity']
+        unique_together = [('user', 'challenge')]
+
+    def __str__(self):
+        return f"{self.user} - {self.challenge.title} ({self.status})"
+
+
+# The universal scoring system's models are part of this app as well
+from .models_scoring import (  # noqa: E402,F401
+    ScoringConfig, UniversalQuestion, UniversalTestSession, QuestionResponse, TestResult
+)
@@ -0,0 +1,409 @@
+"""
+Streaming Question Importer
+
+Imports the questions of one Test from JSON or JSON Lines without
+loading the whole file into memory and without one INSERT per question.
+
+Records are read incrementally (line by line for JSONL, through `ijson`
+for JSON documents when it is installed), normalized into
+`testsengine.models.Question` fields (logical and numerical reasoning
+tests accept the record shapes `TestDataImporter` reads), validated, and
+written with `bulk_create(update_conflicts=True)` in configurable chunks,
+keyed on the test and the question order. Invalid records, including
+JSONL lines that are not JSON, are skipped and reported rather than
+aborting the import. Progress is published to the default cache so a
+background job can be polled from the API.
+
+bulk_create sends no post_save signals, so the importer invalidates the
+question catalogue itself once the import ends.
+
+Files imported in the background are kept in `default_storage` under
+IMPORT_STORAGE_DIR, which the web process and the workers share.
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Union
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from auth_api.invalidation import schedule_namespace_invalidation
+
+from .models import Question, Test
+from .services.catalogue_cache import CATALOGUE_NAMESPACE
+
+try:
+    import ijson
+except ImportError:  # optional: fall back to json.load for JSON documents
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+PROGRESS_CACHE_PREFIX = 'question_import'
+PROGRESS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Keep only the first errors in the progress payload
+MAX_REPORTED_ERRORS = 50
+
+IMPORT_STORAGE_DIR = 'question_imports'
+
+UPDATE_FIELDS = [
+    'question_type', 'question_text', 'passage', 'context', 'options', 'correct_answer',
+    'explanation', 'difficulty_level', 'complexity_score',
+]
+
+# Test types whose files use a dedicated record shape; other tests use the generic one
+RECORD_FORMATS = {
+    'logical_reasoning': 'logical',
+    'numerical_reasoning': 'numerical',
+}
+
+VALID_QUESTION_TYPES = {value for value, _ in Question.QUESTION_TYPES}
+
+# Record difficulty (1-5) -> Question.difficulty_level; the number is kept as complexity_score
+DIFFICULTY_LEVELS = {1: 'easy', 2: 'easy', 3: 'medium', 4: 'hard', 5: 'hard'}
+
+CORRECT_ANSWER_MAX_LENGTH = Question._meta.get_field('correct_answer').max_length
+
+
+@dataclass
+class ImportProgress:
+    """Progress of an import job, stored in the cache under its job id"""
+    job_id: str
+    test_id: int
+    status: str = 'pending'
+    processed: int = 0
+    imported: int = 0
+    skipped: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def progress_cache_key(job_id: str) -> str:
+    return f"{PROGRESS_CACHE_PREFIX}:{job_id}"
+
+
+def get_import_progress(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the last published progress for an import job, if any"""
+    return cache.get(progress_cache_key(job_id))
+
+
+def publish_import_progress(progress: ImportProgress) -> None:
+    """Store the current state of an import job for get_import_progress"""
+    try:
+        cache.set(progress_cache_key(progress.job_id), progress.to_dict(), PROGRESS_CACHE_TIMEOUT)
+    except Exception:
+        logger.exception("Failed to publish question import progress")
+
+
+def new_import_job(test_id: int) -> ImportProgress:
+    """Register a pending import job and return its progress record"""
+    progress = ImportProgress(job_id=uuid.uuid4().hex, test_id=test_id)
+    publish_import_progress(progress)
+    return progress
+
+
+@dataclass
+class MalformedRecord:
+    """Stands in for a JSONL line that could not be decoded"""
+    line_number: int
+    error: str
+
+
+def iter_jsonl_records(stream: IO) -> Iterator[Union[Dict[str, Any], MalformedRecord]]:
+    """
+    Yield one record per non-empty line of a JSON Lines stream.
+
+    A line that is not valid JSON yields a MalformedRecord, so one bad line
+    is counted as skipped instead of ending the import.
+    """
+    for line_number, line in enumerate(stream, 1):
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            yield MalformedRecord(line_number, f"Invalid JSON on line {line_number}: {e}")
+
+
+def _extract_questions(document: Union[Dict[str, Any], List[Any]]) -> Iterator[Dict[str, Any]]:
+    """Same structures TestDataImporter.import_questions_from_json accepts"""
+    if isinstance(document, list):
+        yield from document
+    elif 'sections' in document:
+        for section in document['sections']:
+            yield from section.get('questions', [])
+    elif 'questions' in document:
+        yield from document['questions']
+
+
+def _detect_json_prefix(stream: IO) -> Optional[str]:
+    """Find which ijson prefix holds the question records"""
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == '' and event == 'start_array':
+            return 'item'
+        if prefix == '' and event == 'map_key' and value in ('sections', 'questions'):
+            return 'sections.item.questions.item' if value == 'sections' else 'questions.item'
+    return None
+
+
+def iter_json_records(stream: IO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield question records from a JSON document.
+
+    Streams with ijson when available; otherwise the document is parsed
+    with json.load (the records are still written in chunks).
+    """
+    if ijson is None or not stream.seekable():
+        yield from _extract_questions(json.load(stream))
+        return
+
+    prefix = _detect_json_prefix(stream)
+    if prefix is None:
+        return
+    stream.seek(0)
+    # use_float keeps numbers as float instead of Decimal, matching json.load
+    yield from ijson.items(stream, prefix, use_float=True)
+
+
+def iter_file_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records from a JSON or JSONL file.
+
+    Args:
+        path: File path
+        fmt: 'json' or 'jsonl'; inferred from the extension when omitted
+    """
+    if fmt is None:
+        fmt = 'jsonl' if str(path).endswith(('.jsonl', '.ndjson')) else 'json'
+
+    if fmt not in ('json', 'jsonl'):
+        raise ValueError(f"Unsupported import format: {fmt}")
+    with open(path, 'rb') as stream:
+        yield from _iter_stream_records(stream, fmt)
+
+
+def iter_stored_records(name: str, fmt: str, storage=None) -> Iterator[Dict[str, Any]]:
+    """Yield records from a file kept in `storage` (default_storage)"""
+    if fmt not in ('json', 'jsonl'):
+        raise ValueError(f"Unsupported import format: {fmt}")
+    with (storage or default_storage).open(name, 'rb') as stream:
+        yield from _iter_stream_records(stream, fmt)
+
+
+def _iter_stream_records(stream: IO, fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == 'jsonl':
+        yield from iter_jsonl_records(stream)
+    else:
+        yield from iter_json_records(stream)
+
+
+def store_import_file(content, fmt: str, storage=None) -> str:
+    """
+    Save an upload (a File) or raw bytes for a background import.
+
+    Returns:
+        The storage name to pass to the import task
+    """
+    storage = storage or default_storage
+    if isinstance(content, bytes):
+        content = ContentFile(content)
+    return storage.save(f"{IMPORT_STORAGE_DIR}/{uuid.uuid4().hex}.{fmt}", content)
+
+
+class StreamingQuestionImporter:
+    """
+    Import the questions of one test in validated, upserted chunks.
+
+    Args:
+        test: Test the questions belong to; its test_type selects the record shape
+        batch_size: Number of records written per bulk_create
+        progress: Optional ImportProgress to publish to the cache
+        collect_orders: Keep the orders of imported questions (small imports only)
+    """
+
+    def __init__(self, test: Test, batch_size: int = DEFAULT_BATCH_SIZE,
+                 progress: Optional[ImportProgress] = None, collect_orders: bool = False):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.test = test
+        self.record_format = RECORD_FORMATS.get(test.test_type, 'generic')
+        self.batch_size = batch_size
+        self.progress = progress or ImportProgress(job_id=uuid.uuid4().hex, test_id=test.id)
+        self.imported_orders: Optional[List[int]] = [] if collect_orders else None
+
+    # Logical and numerical records use the TestDataImporter shapes; a record
+    # without an explicit order takes its position in the file
+
+    def normalize(self, data: Dict[str, Any], index: int) -> Dict[str, Any]:
+        if self.record_format == 'logical':
+            return self._normalize_logical(data, index)
+        if self.record_format == 'numerical':
+            return self._normalize_numerical(data, index)
+        return self._normalize_generic(data, index)
+
+    @staticmethod
+    def _normalize_logical(data: Dict[str, Any], index: int) -> Dict[str, Any]:
+        return {
+            'order': data.get('order', index),
+            'question_type': 'logical_deduction',
+            'question_text': data['question'],
+            'correct_answer': data['correct_answer'],
+            'difficulty': data.get('difficulty', 1),
+            'options': data.get('options', []),
+            'explanation': data.get('explanation'),
+        }
+
+    @staticmethod
+    def _normalize_numerical(data: Dict[str, Any], index: int) -> Dict[str, Any]:
+        options = [
+            opt['text'] if isinstance(opt, dict) else str(opt)
+            for opt in data.get('options', [])
+        ]
+        return {
+            'order': data.get('order', index),
+            'question_type': 'multiple_choice',
+            'question_text': data['question'],
+            'correct_answer': data['correct_answer'],
+            'difficulty': data.get('complexity_score', data.get('difficulty', 1)),
+            'options': options,
+            'explanation': data.get('explanation'),
+        }
+
+    @staticmethod
+    def _normalize_generic(data: Dict[str, Any], index: int) -> Dict[str, Any]:
+        return {
+            'order': data.get('order', index),
+            'question_type': data.get('question_type', 'multiple_choice'),
+            'question_text': data.get('question', data.get('question_text', '')),
+            'correct_answer': data.get('correct_answer', data.get('correctAnswer', '')),
+            'difficulty': data.get('difficulty', data.get('complexity_score', 1)),
+            'options': data.get('options', []),
+            'explanation': data.get('explanation'),
+            'passage': data.get('passage'),
+            'context': data.get('context'),
+        }
+
+    @staticmethod
+    def validate(fields: Dict[str, Any]) -> None:
+        """Raise ValueError if a normalized record cannot be stored"""
+        order = int(fields['order'])
+        if order < 1:
+            raise ValueError(f"Order must be positive, got {order}")
+        if fields['question_type'] not in VALID_QUESTION_TYPES:
+            raise ValueError(f"Unknown question type: {fields['question_type']}")
+        if not str(fields['question_text']).strip():
+            raise ValueError("Missing question text")
+        if fields['correct_answer'] in (None, ''):
+            raise ValueError("Missing correct answer")
+        if len(str(fields['correct_answer'])) > CORRECT_ANSWER_MAX_LENGTH:
+            raise ValueError(f"Correct answer longer than {CORRECT_ANSWER_MAX_LENGTH} characters")
+        if not isinstance(fields['options'], list):
+            raise ValueError("Options must be a list")
+
+        difficulty = int(fields.pop('difficulty'))
+        if not 1 <= difficulty <= 5:
+            raise ValueError(f"Difficulty must be between 1 and 5, got {difficulty}")
+        fields['order'] = order
+        fields['difficulty_level'] = DIFFICULTY_LEVELS[difficulty]
+        fields['complexity_score'] = difficulty
+        fields['correct_answer'] = str(fields['correct_answer'])
+
+    def import_records(self, records: Iterable[Dict[str, Any]]) -> ImportProgress:
+        """
+        Validate and upsert records in chunks.
+
+        Returns:
+            Final ImportProgress
+        """
+        progress = self.progress
+        progress.status = 'running'
+        progress.started_at = timezone.now().isoformat()
+        self._publish()
+
+        batch: Dict[int, Question] = {}
+        try:
+            for index, data in enumerate(records, 1):
+                progress.processed += 1
+                if isinstance(data, MalformedRecord):
+                    self._record_error(index, None, ValueError(data.error))
+                    continue
+                try:
+                    fields = self.normalize(data, index)
+                    self.validate(fields)
+                except (KeyError, TypeError, ValueError) as e:
+                    self._record_error(index, data, e)
+                    continue
+
+                # Last occurrence wins; one upsert cannot touch the same row twice
+                batch[fields['order']] = Question(test=self.test, **fields)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = {}
+
+            if batch:
+                self._flush(batch)
+        except Exception as e:
+            logger.exception(f"Question import {progress.job_id} failed")
+            progress.status = 'failed'
+            progress.errors.append({'record': None, 'error': str(e)})
+            progress.finished_at = timezone.now().isoformat()
+            self._publish()
+            self._invalidate_catalogue()
+            raise
+
+        progress.status = 'completed'
+        progress.finished_at = timezone.now().isoformat()
+        self._publish()
+        self._invalidate_catalogue()
+        logger.info(
+            f"Question import {progress.job_id}: {progress.imported} imported, "
+            f"{progress.skipped} skipped of {progress.processed}"
+        )
+        return progress
+
+    def import_file(self, path: str, fmt: Optional[str] = None) -> ImportProgress:
+        return self.import_records(iter_file_records(path, fmt))
+
+    def import_stored_file(self, name: str, fmt: str, storage=None) -> ImportProgress:
+        return self.import_records(iter_stored_records(name, fmt, storage))
+
+    def _flush(self, batch: Dict[int, Question]) -> None:
+        Question.objects.bulk_create(
+            list(batch.values()),
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['test', 'order'],
+            update_fields=UPDATE_FIELDS,
+        )
+        self.progress.imported += len(batch)
+        if self.imported_orders is not None:
+            self.imported_orders.extend(batch.keys())
+        self._publish()
+
+    def _invalidate_catalogue(self) -> None:
+        if self.progress.imported:
+            schedule_namespace_invalidation(CATALOGUE_NAMESPACE)
+
+    def _record_error(self, index: int, data: Any, error: Exception) -> None:
+        self.progress.skipped += 1
+        if len(self.progress.errors) < MAX_REPORTED_ERRORS:
+            record_id = data.get('id', data.get('question_id')) if isinstance(data, dict) else None
+            self.progress.errors.append({'record': index, 'id': record_id, 'error': str(error)})
+
+    def _publish(self) -> None:
+        publish_import_progress(self.progress)
@@ -0,0 +1,213 @@
+"""
+Vectorized Batch Scoring
+
+NumPy implementation of `UniversalScoringSystem.calculate_score` for many
+questions at once. Time efficiency bands are found with `np.searchsorted`
+against a precomputed (question_type x difficulty x band) threshold table
+instead of rebuilding the adjusted threshold dict for every question.
+
+Scores are bit-for-bit identical to the scalar path: the float arithmetic
+is performed in the same order, and values that land within rounding
+distance of a .5 boundary are re-rounded through the scalar
+`Decimal(str(x)).quantize(ROUND_HALF_UP)` call.
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .scoring_system import (
+    AnswerValidator, GlobalScoringConfig, Question, QuestionType, TimeEfficiencyCalculator
+)
+
+logger = logging.getLogger(__name__)
+
+# Efficiency factor per band: excellent, good, average, slow, beyond slow
+EFFICIENCY_BANDS = np.array(TimeEfficiencyCalculator.BAND_EFFICIENCIES)
+
+THRESHOLD_KEYS = TimeEfficiencyCalculator.BAND_KEYS
+
+QUESTION_TYPES = list(QuestionType)
+QUESTION_TYPE_INDEX = {question_type: index for index, question_type in enumerate(QUESTION_TYPES)}
+
+DIFFICULTY_LEVELS = (1, 2, 3, 4, 5)
+
+# Values this close to a .5 boundary are rounded through the scalar Decimal path
+_ROUNDING_TOLERANCE = 1e-9
+
+
+def threshold_array_from_table(adjusted_thresholds: Dict) -> np.ndarray:
+    """
+    Convert a TimeEfficiencyCalculator threshold table to a NumPy array.
+
+    Args:
+        adjusted_thresholds: (QuestionType, difficulty) -> thresholds tuple
+
+    Returns:
+        Array of shape (len(QuestionType), 5, 4)
+    """
+    table = np.empty((len(QUESTION_TYPES), len(DIFFICULTY_LEVELS), len(THRESHOLD_KEYS)), dtype=np.float64)
+    for type_index, question_type in enumerate(QUESTION_TYPES):
+        for difficulty_index, difficulty in enumerate(DIFFICULTY_LEVELS):
+            table[type_index, difficulty_index] = adjusted_thresholds[(question_type, difficulty)]
+    return table
+
+
+def build_threshold_table(time_thresholds: Optional[Dict] = None,
+                          difficulty_multipliers: Optional[Dict[int, float]] = None) -> np.ndarray:
+    """
+    Build the adjusted threshold array used for band lookups.
+
+    Args:
+        time_thresholds: Optional per-type threshold overrides
+        difficulty_multipliers: Optional difficulty (1-5) -> time multiplier overrides
+
+    Returns:
+        Array of shape (len(QuestionType), 5, 4)
+    """
+    if time_thresholds is None and difficulty_multipliers is None:
+        return threshold_array_from_table(TimeEfficiencyCalculator.ADJUSTED_THRESHOLDS)
+    return threshold_array_from_table(
+        TimeEfficiencyCalculator.build_threshold_table(time_thresholds, difficulty_multipliers)
+    )
+
+
+DEFAULT_THRESHOLD_TABLE = build_threshold_table()
+
+
+def round_half_up(values: np.ndarray) -> np.ndarray:
+    """Round to the nearest integer with the scalar path's ROUND_HALF_UP semantics"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.floor(values + 0.5)
+
+    fractional = values - np.floor(values)
+    ambiguous = np.flatnonzero(np.abs(fractional - 0.5) < _ROUNDING_TOLERANCE)
+    for index in ambiguous:
+        rounded[index] = int(Decimal(str(float(values[index]))).quantize(
+            Decimal('1'), rounding=ROUND_HALF_UP
+        ))
+    return rounded.astype(np.int64)
+
+
+class VectorizedBatchScorer:
+    """Score many questions at once with NumPy"""
+
+    def __init__(self,
+                 global_config: Optional[GlobalScoringConfig] = None,
+                 threshold_table: Optional[np.ndarray] = None):
+        self.global_config = global_config or GlobalScoringConfig()
+        self.threshold_table = threshold_table if threshold_table is not None else DEFAULT_THRESHOLD_TABLE
+
+    @staticmethod
+    def type_indices(question_types: Sequence[Union[QuestionType, str, int]]) -> np.ndarray:
+        """Convert QuestionType members, their values or raw indices to table indices"""
+        indices = np.empty(len(question_types), dtype=np.intp)
+        fallback = QUESTION_TYPE_INDEX[QuestionType.MULTIPLE_CHOICE]
+        for position, question_type in enumerate(question_types):
+            if isinstance(question_type, (int, np.integer)):
+                indices[position] = question_type
+                continue
+            if isinstance(question_type, str):
+                try:
+                    question_type = QuestionType(question_type)
+                except ValueError:
+                    question_type = QuestionType.MULTIPLE_CHOICE
+            indices[position] = QUESTION_TYPE_INDEX.get(question_type, fallback)
+        return indices
+
+    def efficiency(self,
+                   times: np.ndarray,
+                   difficulties: np.ndarray,
+                   type_indices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized TimeEfficiencyCalculator.calculate_efficiency.
+
+        Returns:
+            Array of efficiency factors (0.0 to 2.0)
+        """
+        times = np.asarray(times, dtype=np.float64)
+        difficulty_indices = np.clip(np.asarray(difficulties, dtype=np.intp), 1, 5) - 1
+        type_indices = np.asarray(type_indices, dtype=np.intp)
+
+        bands = np.empty(times.shape, dtype=np.intp)
+        cells = type_indices * len(DIFFICULTY_LEVELS) + difficulty_indices
+        flat_table = self.threshold_table.reshape(-1, len(THRESHOLD_KEYS))
+
+        # One searchsorted per (type, difficulty) cell present in the batch;
+        # side='left' counts thresholds strictly below the time, matching `time <= threshold`
+        for cell in np.unique(cells):
+            mask = cells == cell
+            bands[mask] = np.searchsorted(flat_table[cell], times[mask], side='left')
+
+        result = EFFICIENCY_BANDS[bands]
+        return np.where(times < 0, 0.0, result)
+
+    def score_arrays(self,
+                     difficulties: Sequence[int],
+                     question_types: Sequence[Union[QuestionType, str, int]],
+                     correct: Sequence[bool],
+                     times: Sequence[float],
+                     base_scores: Optional[Sequence[float]] = None,
+                     difficulty_bonuses: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        Score questions from parallel arrays.
+
+        Args:
+            difficulties: Difficulty level (1-5) per question
+            question_types: QuestionType (or value / table index) per question
+            correct: Correctness flag per question
+            times: Time taken in seconds per question
+            base_scores: ScoreWeight.base per question (default 5)
+            difficulty_bonuses: ScoreWeight.difficulty_bonus per question (default 2.0)
+
+        Returns:
+            Integer scores, identical to calculate_score for each question
+        """
+        count = len(difficulties)
+        difficulties = np.asarray(difficulties, dtype=np.float64)
+        correct = np.asarray(correct, dtype=bool)
+        times = np.asarray(times, dtype=np.float64)
+        base_scores = np.full(count, 5.0) if base_scores is None else np.asarray(base_scores, dtype=np.float64)
+        difficulty_bonuses = (
+            np.full(count, 2.0) if difficulty_bonuses is None
+            else np.asarray(difficulty_bonuses, dtype=np.float64)
+        )
+
+        config = self.global_config
+        efficiency = self.efficiency(times, difficulties, self.type_indices(question_types))
+
+        # Keep the scalar evaluation order so float results are identical
+        difficulty_bonus = difficulties * difficulty_bonuses * config.difficulty_weight
+        time_bonus = efficiency * config.time_weight
+        preliminary = base_scores + difficulty_bonus + time_bonus
+        final = preliminary * config.accuracy_weight
+
+        scores = np.maximum(round_half_up(final), 0)
+        return np.where(correct, scores, 0)
+
+    def score_questions(self,
+                        questions: List[Question],
+                        user_answers: Dict[str, Union[str, int, float]],
+                        time_data: Dict[str, float],
+                        answer_validator: Optional[AnswerValidator] = None) -> Dict[str, int]:
+        """Drop-in replacement for UniversalScoringSystem.calculate_batch_scores"""
+        if not questions:
+            return {}
+
+        validator = answer_validator or AnswerValidator()
+        correct = [
+            validator.is_answer_correct(user_answers.get(q.id, ""), q.correct_answer, q.type)
+            for q in questions
+        ]
+
+        scores = self.score_arrays(
+            difficulties=[q.difficulty for q in questions],
+            question_types=[q.type for q in questions],
+            correct=correct,
+            times=[time_data.get(q.id, 0.0) for q in questions],
+            base_scores=[q.score_weight.base for q in questions],
+            difficulty_bonuses=[q.score_weight.difficulty_bonus for q in questions],
+        )
+        return {q.id: int(score) for q, score in zip(questions, scores)}
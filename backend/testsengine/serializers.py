@@ -1,25 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
-try:
-    from .models import Test, Question, UserTest, TestResult, TestSession
-except ImportError:
-    # Create minimal fallback classes if models don't exist
-    class Test:
-        class _meta:
-            fields = '__all__'
-    class Question:
-        class _meta:
-            fields = '__all__'
-    class UserTest:
-        class _meta:
-            fields = '__all__'
-    class TestResult:
-        class _meta:
-            fields = '__all__'
-    class TestSession:
-        class _meta:
-            fields = '__all__'
+from .models import Test, Question, TestSession
 
 User = get_user_model()
 
@@ -31,14 +13,14 @@ class QuestionSerializer(serializers.ModelSerializer):
 class TestListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Test
-        fields = ['id', 'title', 'description', 'duration', 'is_active']
+        fields = ['id', 'title', 'description', 'duration_minutes', 'is_active']
 
 class TestDetailSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
     
     class Meta:
         model = Test
-        fields = ['id', 'title', 'description', 'duration', 'is_active', 'questions']
+        fields = ['id', 'title', 'description', 'duration_minutes', 'is_active', 'questions']
 
 class TestSessionHistorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -49,13 +31,3 @@ class TestSessionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = TestSession
         fields = ['test', 'answers']
-
-class UserTestSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UserTest
-        fields = '__all__'
-
-class TestResultSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = TestResult
-        fields = '__all__'
\ No newline at end of file
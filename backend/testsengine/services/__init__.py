@@ -1,8 +1,27 @@
 """
 Services package for testsengine app
 Contains the scoring service and other business logic
+
+The exports below are resolved on first access, so importing one service
+module (e.g. `from .services.catalogue_cache import ...` in the URLconf)
+does not load the scoring and rescoring stack with it.
 """
 
-from .scoring_service import ScoringService, ScoringConfig, ScoringUtils
+from importlib import import_module
+
+_EXPORTS = {
+    'ScoringService': '.scoring_service',
+    'ScoringConfig': '.scoring_service',
+    'ScoringUtils': '.scoring_service',
+    'BatchRescorer': '.rescoring',
+    'RescoreStats': '.rescoring',
+    'rescore_submissions': '.rescoring',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = ['ScoringService', 'ScoringConfig', 'ScoringUtils']
\ No newline at end of file
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
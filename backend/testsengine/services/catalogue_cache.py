@@ -0,0 +1,128 @@
+"""
+Pre-serialized test catalogue and question payloads
+
+Test content only changes when it is edited or imported, yet every
+catalogue or question request queried and serialized it again. Payloads
+are now rendered to JSON once per content version and kept in the
+default cache (two-tier when CACHE_L1 is enabled) together with a strong
+ETag and a Last-Modified time, so a request is a cache read, or a 304
+when the client already holds that version.
+
+The content version is the `catalogue` generation counter of
+auth_api.cache_utils. Saving or deleting a Test or Question bumps it once
+the transaction commits (see testsengine.signals); bump_content_version()
+does it by hand, e.g. after raw SQL or queryset.update() changes.
+"""
+
+import hashlib
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from auth_api.cache_utils import cache_manager
+
+CATALOGUE_NAMESPACE = 'catalogue'
+
+# Entries of an old content version are never read again; let them age out
+CATALOGUE_TIMEOUT = 24 * 60 * 60
+
+CACHE_CONTROL = 'no-cache'
+
+
+@dataclass
+class Payload:
+    """A rendered JSON body with its validators"""
+    body: bytes
+    etag: str
+    last_modified: float
+
+    @classmethod
+    def render(cls, data: Any) -> 'Payload':
+        body = JSONRenderer().render(data)
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', last_modified=time.time())
+
+
+def content_version() -> int:
+    return cache_manager.generations([CATALOGUE_NAMESPACE])[0]
+
+
+def bump_content_version() -> None:
+    """Invalidate every cached catalogue and question payload"""
+    cache_manager.invalidate_namespace(CATALOGUE_NAMESPACE)
+
+
+def _key(version: int, name: str) -> str:
+    return f"{CATALOGUE_NAMESPACE}:{version}:{name}"
+
+
+def _load(entry: Any):
+    try:
+        return Payload(**entry)
+    except TypeError:
+        return None
+
+
+def get_payload(name: str, build: Callable[[], Any]) -> Payload:
+    """The cached payload `name` of the current content version, built on a miss"""
+    cache = cache_manager.default_cache
+    key = _key(content_version(), name)
+    payload = _load(cache.get(key))
+    if payload is None:
+        payload = Payload.render(build())
+        cache.set(key, asdict(payload), CATALOGUE_TIMEOUT)
+    return payload
+
+
+def get_payloads(names: Iterable[str], build_missing: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Payload]:
+    """
+    Several payloads in one cache round trip.
+
+    `build_missing` receives the names that were not cached and returns
+    their data by name (in one query); names it leaves out are skipped.
+    """
+    cache = cache_manager.default_cache
+    version = content_version()
+    keys = {name: _key(version, name) for name in names}
+    found = cache.get_many(list(keys.values()))
+
+    payloads = {}
+    missing = []
+    for name, key in keys.items():
+        payload = _load(found.get(key))
+        if payload is None:
+            missing.append(name)
+        else:
+            payloads[name] = payload
+
+    if missing:
+        for name, data in build_missing(missing).items():
+            payloads[name] = Payload.render(data)
+            cache.set(keys[name], asdict(payloads[name]), CATALOGUE_TIMEOUT)
+    return {name: payloads[name] for name in keys if name in payloads}
+
+
+def combine(payloads: Dict[str, Payload]) -> Payload:
+    """One body for several payloads, with an ETag derived from theirs"""
+    body = b'{' + b','.join(
+        JSONRenderer().render(name) + b':' + payload.body for name, payload in payloads.items()
+    ) + b'}'
+    etag = hashlib.sha256(''.join(name + payload.etag for name, payload in payloads.items()).encode()).hexdigest()[:32]
+    last_modified = max((payload.last_modified for payload in payloads.values()), default=time.time())
+    return Payload(body=body, etag=f'"{etag}"', last_modified=last_modified)
+
+
+def payload_response(request, payload: Payload) -> HttpResponse:
+    """200 with the payload, or 304 when the client's validators still match"""
+    last_modified = int(payload.last_modified)
+    response = get_conditional_response(request, etag=payload.etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(payload.body, content_type='application/json')
+    response['ETag'] = payload.etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
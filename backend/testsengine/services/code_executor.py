@@ -1,226 +1,358 @@
-import subprocess
-import tempfile
-import os
-import json
+import threading
 import time
-from typing import Dict, List, Tuple, Any
-from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-class CodeExecutionResult:
- """Container for code execution results"""
+from .problem_spec import ProblemSpec, ProblemSpecError, grade_output, infer_problem_spec
+from .result_cache import ResultCache, get_result_cache, case_set_version
+from .sandbox_pool import SandboxError, SandboxPool, SandboxWorker, get_sandbox_pool
 
- def __init__(self):
- self.status = 'pending'
- self.output = ''
- self.error = ''
- self.execution_time_ms = 0
- self.memory_used_mb = 0.0
- self.test_results = []
- self.compilation_output = ''
+class CodeExecutionResult:
+    """Container for code execution results"""
+
+    def __init__(self):
+        self.status = 'pending'
+        self.output = ''
+        self.error = ''
+        self.execution_time_ms = 0
+        self.memory_used_mb = 0.0
+        self.cpu_time_ms = 0
+        self.wall_time_ms = 0
+        self.test_results = []
+        self.compilation_output = ''
+        self.cached = False
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CodeExecutionResult':
+        result = cls()
+        result.__dict__.update(data)
+        return result
 
 class CodeExecutor:
- """Simple code execution service for Python"""
-
- # Timeout settings (in seconds)
- EXECUTE_TIMEOUT = 5
-
- def __init__(self):
- pass
-
- def execute_code(self, code: str, language: str, test_cases: List[Dict]) -> CodeExecutionResult:
- """
- Execute code against test cases - simplified version for Python only
- """
- result = CodeExecutionResult()
-
- if language != 'python':
- result.status = 'compilation_error'
- result.error = f"Seul Python est supporté pour le moment. Language demandé: {language}"
- return result
-
- # Create temporary directory for execution
- with tempfile.TemporaryDirectory() as temp_dir:
- try:
- # Write code to file
- file_path = os.path.join(temp_dir, 'solution.py')
- with open(file_path, 'w', encoding='utf-8') as f:
- f.write(code)
-
- # Run test cases
- result.test_results = []
- total_time = 0
-
- for i, test_case in enumerate(test_cases):
- test_result = self._run_single_test(file_path, test_case, temp_dir)
- result.test_results.append(test_result)
- total_time += test_result.get('execution_time_ms', 0)
-
- # Calculate overall results
- passed_tests = sum(1 for t in result.test_results if t['passed'])
- total_tests = len(result.test_results)
-
- if passed_tests == total_tests:
- result.status = 'accepted'
- else:
- result.status = 'wrong_answer'
-
- result.execution_time_ms = total_time
- result.memory_used_mb = 10.0 # Default estimate
-
- except Exception as e:
- result.status = 'runtime_error'
- result.error = str(e)
-
- return result
-
- def _run_single_test(self, file_path: str, test_case: Dict, temp_dir: str) -> Dict:
- """Run a single test case - simplified version for specific problems"""
-
- test_result = {
- 'input': test_case['input'],
- 'expected_output': str(test_case['expected_output']).strip(),
- 'actual_output': '',
- 'passed': False,
- 'execution_time_ms': 0,
- 'memory_used_mb': 5.0,
- 'error': ''
- }
-
- try:
- start_time = time.time()
-
- # Parse input based on the format
- input_data = test_case['input']
-
- if 'nums = [' in input_data and 'target = ' in input_data:
- # Two Sum problem
- test_script = f'''
-import sys
-sys.path.insert(0, "{temp_dir}")
-
-try:
- import solution
-
- # Parse Two Sum input
- input_line = """{input_data}"""
-
- # Extract nums and target
- if ", target = " in input_line:
- nums_part = input_line.split(", target = ")[0].replace("nums = ", "")
- target_part = input_line.split(", target = ")[1]
-
- nums = eval(nums_part)
- target = int(target_part)
-
- result = solution.two_sum(nums, target)
- print(result)
- else:
- print("Erreur de format")
-
-except Exception as e:
- print(f"Erreur: {{e}}")
-'''
- elif 's = "' in input_data:
- # Palindrome problem
- test_script = f'''
-import sys
-sys.path.insert(0, "{temp_dir}")
-
-try:
- import solution
-
- # Parse Palindrome input
- input_line = """{input_data}"""
- s = input_line.split('s = "')[1].split('"')[0]
-
- result = solution.is_palindrome(s)
- print(result)
-
-except Exception as e:
- print(f"Erreur: {{e}}")
-'''
- elif 'n = ' in input_data:
- # Fibonacci problem
- test_script = f'''
-import sys
-sys.path.insert(0, "{temp_dir}")
-
-try:
- import solution
-
- # Parse Fibonacci input
- input_line = """{input_data}"""
- n = int(input_line.split('n = ')[1])
-
- result = solution.fibonacci(n)
- print(result)
-
-except Exception as e:
- print(f"Erreur: {{e}}")
-'''
- elif 'nums = [' in input_data and 'k = ' in input_data:
- # Array rotation problem
- test_script = f'''
-import sys
-sys.path.insert(0, "{temp_dir}")
-
-try:
- import solution
-
- # Parse Array Rotation input
- input_line = """{input_data}"""
-
- nums_part = input_line.split(", k = ")[0].replace("nums = ", "")
- k_part = input_line.split(", k = ")[1]
-
- nums = eval(nums_part)
- k = int(k_part)
-
- result = solution.rotate(nums, k)
- print(result)
-
-except Exception as e:
- print(f"Erreur: {{e}}")
-'''
- else:
- test_script = f'''
-print("Format d'entrée non supporté: {input_data}")
-'''
-
- # Write and execute test script
- test_file = os.path.join(temp_dir, 'test_runner.py')
- with open(test_file, 'w', encoding='utf-8') as f:
- f.write(test_script)
-
- # Execute test
- process = subprocess.run(
- ['python', test_file],
- cwd=temp_dir,
- capture_output=True,
- text=True,
- timeout=self.EXECUTE_TIMEOUT
- )
-
- end_time = time.time()
- execution_time = int((end_time - start_time) * 1000)
-
- if process.returncode != 0:
- test_result['error'] = process.stderr
- return test_result
-
- # Clean and compare output
- actual_output = process.stdout.strip()
- expected_output = test_result['expected_output']
-
- test_result.update({
- 'actual_output': actual_output,
- 'passed': actual_output == expected_output,
- 'execution_time_ms': execution_time
- })
-
- except subprocess.TimeoutExpired:
- test_result['error'] = 'Time limit exceeded'
- except Exception as e:
- test_result['error'] = f"Execution error: {str(e)}"
-
- return test_result
+    """Simple code execution service for Python"""
+
+    # Timeout settings (in seconds)
+    EXECUTE_TIMEOUT = 5
+
+    # Wall-clock budget for all test cases of one submission (seconds)
+    SUBMISSION_BUDGET = 20
+
+    # Test cases of one submission run on at most this many workers
+    MAX_PARALLEL_CASES = 4
+
+    # partial: every case runs and is graded on its own
+    # all_or_nothing: the first timeout fails the submission, remaining cases are skipped
+    GRADING_PARTIAL = 'partial'
+    GRADING_ALL_OR_NOTHING = 'all_or_nothing'
+
+    # Fields of a sandbox frame kept as the case's outcome (and in the result cache)
+    OUTCOME_FIELDS = ('ok', 'result', 'output', 'error', 'time_ms', 'cpu_ms', 'peak_rss_kb')
+
+    TIME_LIMIT_ERROR = 'Time limit exceeded'
+    MEMORY_LIMIT_ERROR = 'Memory limit exceeded'
+    SKIPPED_ERROR = 'Not executed'
+    BUDGET_ERROR = 'Submission time budget exceeded'
+
+    def __init__(self, pool: Optional[SandboxPool] = None,
+                 max_parallel: Optional[int] = None,
+                 submission_budget: Optional[float] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 use_result_cache: bool = True):
+        # Pre-started sandbox workers shared by every executor in this process
+        self.pool = pool or get_sandbox_pool()
+        self.max_parallel = max_parallel or self.MAX_PARALLEL_CASES
+        self.submission_budget = submission_budget or self.SUBMISSION_BUDGET
+        self.result_cache = (result_cache or get_result_cache()) if use_result_cache else None
+
+    def execute_code(self, code: str, language: str, test_cases: List[Dict],
+                     grading_mode: str = GRADING_PARTIAL,
+                     problem_spec: Optional[Union[ProblemSpec, Dict]] = None,
+                     on_result: Optional[Callable[[int, Dict], None]] = None) -> CodeExecutionResult:
+        """
+        Execute code against test cases - simplified version for Python only
+
+        Test case inputs are converted to argument lists with the problem spec
+        (or the legacy spec matching each input when none is given). The
+        submission is loaded into up to max_parallel pooled sandbox workers
+        and each worker receives its share of the cases as one batch. The
+        sandbox only reports return values; they are graded here with the
+        spec's comparator, so expected outputs never reach candidate code.
+        Every case gets its own wall time, CPU time and peak RSS; all cases
+        share the submission budget.
+
+        on_result(index, test_result) is called as soon as each case is
+        final, from the thread that ran it.
+
+        The result cache stores what the sandbox reported for each case,
+        never verdicts. An identical resubmission (same normalized code,
+        language and test inputs) skips the sandbox and its cached outputs
+        are graded here against the current expected outputs.
+        """
+        result = CodeExecutionResult()
+
+        if language != 'python':
+            result.status = 'compilation_error'
+            result.error = f"Seul Python est supporté pour le moment. Language demandé: {language}"
+            return result
+
+        try:
+            if isinstance(problem_spec, dict):
+                problem_spec = ProblemSpec.from_dict(problem_spec)
+            case_results, runnable = self._prepare_cases(test_cases, problem_spec)
+        except ProblemSpecError as e:
+            result.status = 'runtime_error'
+            result.error = str(e)
+            return result
+
+        report = on_result or (lambda index, test_result: None)
+        comparator = problem_spec.comparator if problem_spec else 'text'
+        started = time.monotonic()
+
+        runnable_indices = {index for index, _, _ in runnable}
+        for index, test_result in enumerate(case_results):
+            if index not in runnable_indices:
+                report(index, test_result)
+
+        cache_key = None
+        if self.result_cache is not None:
+            version = case_set_version(test_cases, problem_spec, grading_mode)
+            cache_key = self.result_cache.key_for(code, language, version)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None and len(cached.get('outcomes', ())) == len(runnable):
+                for (index, _, expected), outcome in zip(runnable, cached['outcomes']):
+                    self._apply_outcome(case_results[index], outcome, comparator, expected)
+                    report(index, case_results[index])
+                self._summarize(result, case_results, started)
+                result.cached = True
+                return result
+
+        outcomes = {}
+        workers = []
+        try:
+            if runnable:
+                workers = self._acquire_workers(len(runnable))
+                self._run_batches(workers, code, runnable, case_results, comparator, grading_mode,
+                                  started + self.submission_budget, report, outcomes)
+            self._summarize(result, case_results, started)
+
+        except Exception as e:
+            result.status = 'runtime_error'
+            result.error = str(e)
+        finally:
+            for worker in workers:
+                self.pool.release(worker)
+
+        if cache_key is not None and self._cacheable(runnable, outcomes):
+            self.result_cache.set(cache_key, {'outcomes': [outcomes[index] for index, _, _ in runnable]})
+        return result
+
+    def _summarize(self, result: CodeExecutionResult, case_results: List[Dict], started: float) -> None:
+        """Overall status and resource totals from the graded cases"""
+        result.test_results = case_results
+
+        passed_tests = sum(1 for t in result.test_results if t['passed'])
+        total_tests = len(result.test_results)
+        errors = {t['error'] for t in result.test_results}
+
+        if passed_tests == total_tests:
+            result.status = 'accepted'
+        elif self.TIME_LIMIT_ERROR in errors or self.BUDGET_ERROR in errors:
+            result.status = 'time_limit_exceeded'
+        elif self.MEMORY_LIMIT_ERROR in errors:
+            result.status = 'memory_limit_exceeded'
+        else:
+            result.status = 'wrong_answer'
+
+        result.execution_time_ms = sum(t['execution_time_ms'] for t in result.test_results)
+        result.cpu_time_ms = sum(t['cpu_time_ms'] for t in result.test_results)
+        result.memory_used_mb = max((t['memory_used_mb'] for t in result.test_results), default=0.0)
+        result.wall_time_ms = int((time.monotonic() - started) * 1000)
+
+    def _cacheable(self, runnable: List[Tuple[int, Dict, Any]], outcomes: Dict[int, Dict]) -> bool:
+        """
+        Only outcomes that depend on the code alone are cached: every case
+        ran, none timed out, was skipped or took the worker down.
+        """
+        if len(outcomes) != len(runnable):
+            return False
+        return all(
+            'skipped' not in outcome and not outcome.get('crashed')
+            and outcome.get('error') != self.TIME_LIMIT_ERROR
+            for outcome in outcomes.values()
+        )
+
+    def _prepare_cases(self, test_cases: List[Dict],
+                       problem_spec: Optional[ProblemSpec]) -> Tuple[List[Dict], List[Tuple[int, Dict, Any]]]:
+        """
+        Parse every case once, in this process
+
+        Returns the result list (already filled for cases whose input does
+        not parse) and the (index, payload, expected) triples of the cases to
+        run; only the payload is sent to the sandbox.
+        """
+        case_results = []
+        runnable = []
+        for index, test_case in enumerate(test_cases):
+            test_result = self._new_test_result(test_case)
+            case_results.append(test_result)
+
+            spec = problem_spec or infer_problem_spec(test_case['input'])
+            if spec is None:
+                test_result['actual_output'] = f"Format d'entrée non supporté: {test_case['input']}"
+                continue
+            try:
+                args = spec.parse_args(test_case['input'])
+            except ProblemSpecError as e:
+                test_result['actual_output'] = f"Erreur: {e}"
+                continue
+
+            runnable.append((
+                index,
+                {'entry': spec.entry, 'args': args},
+                spec.parse_expected(test_case['expected_output']),
+            ))
+        return case_results, runnable
+
+    def _run_batches(self, workers: List[SandboxWorker], code: str, runnable: List[Tuple[int, Dict, Any]],
+                     case_results: List[Dict], comparator: str, grading_mode: str, deadline: float,
+                     report: Callable[[int, Dict], None], outcomes: Dict[int, Dict]) -> None:
+        """
+        Split the cases round-robin over the workers and run one batch per worker
+
+        What happened to each case is kept in outcomes, by case index.
+        """
+        stop_on_timeout = grading_mode == self.GRADING_ALL_OR_NOTHING
+        stop = threading.Event()
+
+        def record(index: int, expected: Any, outcome: Dict) -> None:
+            outcomes[index] = outcome
+            self._apply_outcome(case_results[index], outcome, comparator, expected)
+            report(index, case_results[index])
+
+        def run_chunk(slot: int):
+            chunk = runnable[slot::len(workers)]
+            load_error = self._load(workers[slot], code)
+
+            while chunk:
+                if stop.is_set():
+                    for index, _, expected in chunk:
+                        record(index, expected, {'skipped': self.SKIPPED_ERROR})
+                    return
+                if load_error is not None:
+                    for index, _, expected in chunk:
+                        record(index, expected, load_error)
+                    return
+                budget = deadline - time.monotonic()
+                if budget <= 0:
+                    for index, _, expected in chunk:
+                        record(index, expected, {'skipped': self.BUDGET_ERROR})
+                    return
+
+                done = 0
+                try:
+                    for frame in workers[slot].run_batch(
+                        chunk[0][1]['entry'], [payload for _, payload, _ in chunk],
+                        self.pool.case_timeout, budget, stop_on_timeout
+                    ):
+                        index, _, expected = chunk[frame['case']]
+                        record(index, expected, {
+                            field: frame[field] for field in self.OUTCOME_FIELDS if field in frame
+                        })
+                        done = frame['case'] + 1
+                        if frame.get('error') == self.TIME_LIMIT_ERROR and stop_on_timeout:
+                            stop.set()
+                        if stop.is_set():
+                            break
+                    chunk = chunk[done:]
+                except SandboxError as e:
+                    # The case after the last reported one took the worker down
+                    index, _, expected = chunk[done]
+                    record(index, expected, {
+                        'crashed': True,
+                        'error': str(e),
+                        'cpu_ms': e.cpu_ms or 0,
+                        'peak_rss_kb': e.peak_rss_kb or 0,
+                    })
+                    chunk = chunk[done + 1:]
+                    workers[slot] = self.pool.replace(workers[slot])
+                    load_error = self._load(workers[slot], code)
+
+        if len(workers) == 1:
+            run_chunk(0)
+            return
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            for future in [executor.submit(run_chunk, slot) for slot in range(len(workers))]:
+                future.result()
+
+    def _apply_outcome(self, test_result: Dict, outcome: Dict, comparator: str, expected: Any) -> None:
+        """Fill a case result from its outcome, grading sandbox output here"""
+        if 'skipped' in outcome:
+            test_result['error'] = outcome['skipped']
+        elif 'load_error' in outcome:
+            test_result['actual_output'] = f"Erreur: {outcome['load_error']}"
+        elif outcome.get('crashed'):
+            test_result.update({
+                'error': outcome['error'],
+                'cpu_time_ms': outcome['cpu_ms'],
+                'memory_used_mb': round(outcome['peak_rss_kb'] / 1024, 2)
+            })
+        else:
+            self._apply_frame(test_result, outcome, comparator, expected)
+
+    def _apply_frame(self, test_result: Dict, frame: Dict, comparator: str, expected: Any) -> None:
+        """Record what the sandbox reported for a case and grade it here"""
+        passed = False
+        if frame.get('ok'):
+            output = str(frame.get('output', ''))
+            test_result['actual_output'] = output.strip()
+            try:
+                passed = grade_output(comparator, frame.get('result'), output, expected)
+            except Exception as e:
+                test_result['error'] = f"Comparison failed: {e}"
+        elif frame.get('error') in (self.TIME_LIMIT_ERROR, self.MEMORY_LIMIT_ERROR):
+            test_result['error'] = frame['error']
+        else:
+            test_result['actual_output'] = f"Erreur: {frame.get('error', '')}"
+
+        test_result.update({
+            'passed': passed,
+            'execution_time_ms': frame.get('time_ms', 0),
+            'cpu_time_ms': frame.get('cpu_ms', 0),
+            'memory_used_mb': round(frame.get('peak_rss_kb', 0) / 1024, 2)
+        })
+
+    def _acquire_workers(self, case_count: int) -> List[SandboxWorker]:
+        """Wait for one worker, then borrow idle ones up to max_parallel"""
+        workers = [self.pool.acquire()]
+        while len(workers) < min(self.max_parallel, case_count):
+            worker = self.pool.acquire(blocking=False)
+            if worker is None:
+                break
+            workers.append(worker)
+        return workers
+
+    def _load(self, worker: SandboxWorker, code: str) -> Optional[Dict]:
+        """Load the submission into the worker; returns the load error outcome, if any"""
+        try:
+            response = worker.load(code, self.pool.case_timeout)
+        except SandboxError as e:
+            # Module-level code hung or crashed; release() replaces the dead worker
+            return {'load_error': str(e), 'crashed': True}
+        if not response.get('ok'):
+            return {'load_error': response.get('error', '')}
+        return None
+
+    def _new_test_result(self, test_case: Dict) -> Dict:
+        return {
+            'input': test_case['input'],
+            'expected_output': str(test_case['expected_output']).strip(),
+            'actual_output': '',
+            'passed': False,
+            'execution_time_ms': 0,
+            'cpu_time_ms': 0,
+            'memory_used_mb': 0.0,
+            'error': ''
+        }
@@ -0,0 +1,260 @@
+"""
+Code Execution Queue
+
+Moves code execution out of the request path. A submission is stored
+under a job id and dispatched to the `code_execution` Celery queue; when
+the broker cannot be reached the submission is refused rather than run in
+the web process. The sandbox reports each test case as soon as it
+finishes; results are kept in the cache for the polling endpoint.
+
+Admission is bounded per user and globally with cache counters, so a
+burst of slow submissions is refused with a retry hint instead of
+pinning every web worker.
+
+Tasks are acknowledged late, so a job whose worker died is redelivered.
+A running job holds a lease of RUNNING_LEASE seconds from its start:
+the redelivered task waits for the lease to expire and then fails the
+job, which frees its slots. Re-running the code could kill the next
+worker the same way.
+"""
+
+import logging
+import math
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CELERY_QUEUE = 'code_execution'
+
+DEFAULT_QUEUE_CONFIG = {
+    'MAX_ACTIVE_PER_USER': 2,
+    'MAX_ACTIVE_GLOBAL': 100,
+    'JOB_TTL': 60 * 60,
+    # Longer than CodeExecutor.SUBMISSION_BUDGET plus sandbox start-up
+    'RUNNING_LEASE': 60,
+}
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED)
+
+
+class QueueFull(Exception):
+    """Admission refused; retry_after is a hint in seconds"""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobRunning(Exception):
+    """The job's lease is still held by a worker; retry_after is when it expires"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def queue_config() -> Dict[str, Any]:
+    return {**DEFAULT_QUEUE_CONFIG, **getattr(settings, 'CODE_EXECUTION_QUEUE', {})}
+
+
+def _job_key(job_id: str) -> str:
+    return f"code_job:{job_id}"
+
+
+def _case_key(job_id: str, index: int) -> str:
+    return f"code_job:{job_id}:case:{index}"
+
+
+def _active_key(user_id: Optional[int] = None) -> str:
+    if user_id is None:
+        return 'code_jobs:active:global'
+    return f"code_jobs:active:user:{user_id}"
+
+
+def _acquire_slot(key: str, limit: int, ttl: int) -> bool:
+    """
+    Increment an active-job counter unless it is already at the limit
+
+    The TTL is only set when the counter is created, so slots leaked by a
+    crashed worker are reclaimed at most ttl seconds later.
+    """
+    cache.add(key, 0, ttl)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Counter expired between add and incr
+        cache.set(key, 1, ttl)
+        count = 1
+    if count > limit:
+        _release_slot(key)
+        return False
+    return True
+
+
+def _release_slot(key: str) -> None:
+    try:
+        if cache.decr(key) < 0:
+            cache.set(key, 0)
+    except ValueError:
+        pass
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Job status plus the case results finished so far.
+
+    Cases finish out of order when they run on several workers, so each
+    result carries its `index`.
+    """
+    job = cache.get(_job_key(job_id))
+    if job is None:
+        return None
+
+    keys = [_case_key(job_id, index) for index in range(job['total_cases'])]
+    found = cache.get_many(keys) if keys else {}
+    results = [
+        {'index': index, **found[key]}
+        for index, key in enumerate(keys)
+        if key in found
+    ]
+
+    job = {key: value for key, value in job.items() if key != 'payload'}
+    job['results'] = results
+    job['completed_cases'] = len(results)
+    return job
+
+
+def submit_job(user_id: int, code: str, language: str, test_cases: List[Dict],
+               problem_spec: Optional[Dict] = None, grading_mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Admit and dispatch a code execution job.
+
+    Raises:
+        QueueFull: The user or the whole service is at its active-job limit
+    """
+    config = queue_config()
+    ttl = config['JOB_TTL']
+
+    if not _acquire_slot(_active_key(user_id), config['MAX_ACTIVE_PER_USER'], ttl):
+        raise QueueFull('Too many running submissions for this user', retry_after=2)
+    if not _acquire_slot(_active_key(), config['MAX_ACTIVE_GLOBAL'], ttl):
+        _release_slot(_active_key(user_id))
+        raise QueueFull('Code execution is at capacity, please retry shortly', retry_after=5)
+
+    job_id = uuid.uuid4().hex
+    job = {
+        'job_id': job_id,
+        'user_id': user_id,
+        'status': JOB_QUEUED,
+        'language': language,
+        'total_cases': len(test_cases),
+        'created_at': time.time(),
+        'started_at': None,
+        'finished_at': None,
+        'result': None,
+        'error': '',
+        'payload': {
+            'code': code,
+            'test_cases': test_cases,
+            'problem_spec': problem_spec,
+            'grading_mode': grading_mode,
+        },
+    }
+    cache.set(_job_key(job_id), job, ttl)
+
+    try:
+        _dispatch(job_id)
+    except Exception:
+        _finish_job(job, JOB_FAILED, error='Could not schedule execution')
+        raise
+    return get_job(job_id)
+
+
+def _dispatch(job_id: str) -> None:
+    from ..tasks import execute_code_job
+    execute_code_job.apply_async(args=[job_id], queue=CELERY_QUEUE)
+
+
+def run_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Execute a queued job, publishing each case result as it finishes.
+
+    Returns None when the job is gone or already finished. A running job
+    whose lease expired was abandoned by its worker and is failed.
+
+    Raises:
+        JobRunning: Another worker may still be running the job
+    """
+    from .code_executor import CodeExecutor
+
+    job = cache.get(_job_key(job_id))
+    if job is None or job['status'] in FINISHED_STATES:
+        return None
+
+    config = queue_config()
+    if job['status'] == JOB_RUNNING:
+        remaining = job['started_at'] + config['RUNNING_LEASE'] - time.time()
+        if remaining > 0:
+            raise JobRunning(f"Code job {job_id} is running", retry_after=math.ceil(remaining))
+        logger.warning(f"Code job {job_id} lease expired, its worker was lost")
+        _finish_job(job, JOB_FAILED, error='Execution was interrupted, please resubmit')
+        return job
+
+    ttl = config['JOB_TTL']
+    job.update({'status': JOB_RUNNING, 'started_at': time.time()})
+    cache.set(_job_key(job_id), job, ttl)
+
+    def publish(index: int, test_result: Dict) -> None:
+        cache.set(_case_key(job_id, index), test_result, ttl)
+
+    payload = job['payload']
+    try:
+        kwargs = {'problem_spec': payload.get('problem_spec'), 'on_result': publish}
+        if payload.get('grading_mode'):
+            kwargs['grading_mode'] = payload['grading_mode']
+        result = CodeExecutor().execute_code(payload['code'], job['language'], payload['test_cases'], **kwargs)
+    except Exception as e:
+        logger.exception(f"Code job {job_id} failed")
+        _finish_job(job, JOB_FAILED, error=str(e))
+        return job
+
+    _finish_job(job, JOB_COMPLETED, result={
+        'status': result.status,
+        'error': result.error,
+        'tests_passed': sum(1 for t in result.test_results if t['passed']),
+        'total_tests': len(result.test_results),
+        'execution_time_ms': result.execution_time_ms,
+        'cpu_time_ms': result.cpu_time_ms,
+        'wall_time_ms': result.wall_time_ms,
+        'memory_used_mb': result.memory_used_mb,
+        'cached': result.cached,
+    })
+    return job
+
+
+def _finish_job(job: Dict[str, Any], status: str, result: Optional[Dict] = None, error: str = '') -> None:
+    current = cache.get(_job_key(job['job_id']))
+    if current is not None and current['status'] in FINISHED_STATES:
+        # Failed by a redelivery after its lease expired; the slots are already free
+        logger.warning(f"Code job {job['job_id']} finished after its lease expired")
+        return
+    job.update({
+        'status': status,
+        'finished_at': time.time(),
+        'result': result,
+        'error': error,
+        # The code is no longer needed once the job is done
+        'payload': None,
+    })
+    cache.set(_job_key(job['job_id']), job, queue_config()['JOB_TTL'])
+    _release_slot(_active_key(job['user_id']))
+    _release_slot(_active_key())
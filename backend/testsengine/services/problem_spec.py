@@ -0,0 +1,239 @@
+"""
+Coding Problem Specs
+
+Describes how to call and grade a coding problem: the entry function, a
+typed argument schema and the comparator used on its return value. Test
+cases are converted to plain JSON argument lists once, in this process,
+and the whole set is handed to the sandbox harness in a single payload.
+The sandbox only reports what the code returned; expected values never
+leave this process and grade_output compares them here, out of reach of
+the submission.
+
+A spec is a small JSON document meant to be stored with the problem's
+test cases:
+
+    {
+        "entry": "two_sum",
+        "args": [{"name": "nums", "type": "list[int]"}, {"name": "target", "type": "int"}],
+        "comparator": "unordered"
+    }
+
+Test case inputs may be an argument list, a {name: value} mapping, or the
+legacy "nums = [2, 7], target = 9" string; expected outputs are JSON
+values (or strings for the "text" comparator).
+"""
+
+import ast
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+SCALAR_TYPES = {
+    'int': int,
+    'float': float,
+    'str': str,
+    'bool': bool,
+}
+
+_LIST_TYPE = re.compile(r'^list\[(.+)\]$')
+
+
+class ProblemSpecError(ValueError):
+    """A spec is invalid or a test case does not match it"""
+
+
+def to_json_value(value):
+    """Normalize a result the way a JSON round trip would (tuples become lists)"""
+    return json.loads(json.dumps(value, default=str))
+
+
+def compare_exact(actual, expected):
+    return to_json_value(actual) == expected
+
+
+def compare_unordered(actual, expected):
+    actual = to_json_value(actual)
+    if not isinstance(actual, list) or not isinstance(expected, list):
+        return actual == expected
+    return sorted(actual, key=json.dumps) == sorted(expected, key=json.dumps)
+
+
+def compare_float(actual, expected, tolerance=1e-6):
+    actual = to_json_value(actual)
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(
+            compare_float(a, e, tolerance) for a, e in zip(actual, expected)
+        )
+    if isinstance(actual, (int, float)) and isinstance(expected, (int, float)):
+        return math.isclose(actual, expected, rel_tol=tolerance, abs_tol=tolerance)
+    return actual == expected
+
+
+def compare_text(actual, expected):
+    """Legacy comparison: printed result against the expected output string"""
+    return str(actual).strip() == str(expected).strip()
+
+
+COMPARATORS = {
+    'exact': compare_exact,
+    'unordered': compare_unordered,
+    'float': compare_float,
+    'text': compare_text,
+}
+
+
+def grade_output(comparator: str, result: Any, output: str, expected: Any) -> bool:
+    """
+    Grade one case from what the sandbox reported.
+
+    Args:
+        result: JSON form of the entry function's return value
+        output: str() of the return value, used by the 'text' comparator
+    """
+    actual = output if comparator == 'text' else result
+    return bool(COMPARATORS[comparator](actual, expected))
+
+
+def coerce_value(value: Any, type_name: str) -> Any:
+    """
+    Check and convert a value against a schema type.
+
+    Supported types: int, float, str, bool, any and nested list[...].
+    """
+    type_name = type_name.replace(' ', '')
+    if type_name == 'any':
+        return value
+
+    match = _LIST_TYPE.match(type_name)
+    if match:
+        if not isinstance(value, (list, tuple)):
+            raise ProblemSpecError(f"Expected {type_name}, got {type(value).__name__}")
+        return [coerce_value(item, match.group(1)) for item in value]
+
+    if type_name not in SCALAR_TYPES:
+        raise ProblemSpecError(f"Unknown argument type: {type_name}")
+    if type_name == 'float' and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    # bool is an int subclass; do not let True pass as an int argument
+    if isinstance(value, bool) != (type_name == 'bool') or not isinstance(value, SCALAR_TYPES[type_name]):
+        raise ProblemSpecError(f"Expected {type_name}, got {type(value).__name__}")
+    return value
+
+
+@dataclass(frozen=True)
+class ArgSpec:
+    name: str
+    type: str = 'any'
+
+
+@dataclass(frozen=True)
+class ProblemSpec:
+    entry: str
+    args: List[ArgSpec] = field(default_factory=list)
+    comparator: str = 'exact'
+
+    def __post_init__(self):
+        if not self.entry.isidentifier():
+            raise ProblemSpecError(f"Invalid entry function name: {self.entry!r}")
+        if self.comparator not in COMPARATORS:
+            raise ProblemSpecError(f"Unknown comparator: {self.comparator}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProblemSpec':
+        try:
+            return cls(
+                entry=data['entry'],
+                args=[ArgSpec(**arg) for arg in data.get('args', [])],
+                comparator=data.get('comparator', 'exact'),
+            )
+        except (KeyError, TypeError) as e:
+            raise ProblemSpecError(f"Invalid problem spec: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'entry': self.entry,
+            'args': [{'name': arg.name, 'type': arg.type} for arg in self.args],
+            'comparator': self.comparator,
+        }
+
+    def parse_args(self, case_input: Any) -> List[Any]:
+        """Convert one test case input to the entry function's argument list"""
+        if isinstance(case_input, dict):
+            missing = [arg.name for arg in self.args if arg.name not in case_input]
+            if missing:
+                raise ProblemSpecError(f"Missing arguments: {', '.join(missing)}")
+            values = [case_input[arg.name] for arg in self.args]
+        elif isinstance(case_input, (list, tuple)):
+            values = list(case_input)
+        elif isinstance(case_input, str):
+            values = self._parse_assignments(case_input)
+        else:
+            values = [case_input]
+
+        if len(values) != len(self.args):
+            raise ProblemSpecError(f"Expected {len(self.args)} argument(s), got {len(values)}")
+        return [coerce_value(value, arg.type) for value, arg in zip(values, self.args)]
+
+    def parse_expected(self, expected: Any) -> Any:
+        """Expected outputs stay strings for the text comparator, JSON values otherwise"""
+        if self.comparator == 'text' or not isinstance(expected, str):
+            return expected
+        try:
+            return ast.literal_eval(expected.strip())
+        except (ValueError, SyntaxError):
+            return expected
+
+    def _parse_assignments(self, text: str) -> List[Any]:
+        """Parse 'a = 1, b = [2, 3]' (or a bare literal for one argument)"""
+        text = text.strip()
+        names = [arg.name for arg in self.args]
+        if len(names) == 1 and not text.startswith(f"{names[0]} ="):
+            return [self._literal(text)]
+
+        values = []
+        for position, name in enumerate(names):
+            prefix = f"{name} = "
+            if not text.startswith(prefix):
+                raise ProblemSpecError(f"Expected '{prefix.strip()}' in input")
+            text = text[len(prefix):]
+            if position + 1 < len(names):
+                separator = f", {names[position + 1]} = "
+                cut = text.find(separator)
+                if cut < 0:
+                    raise ProblemSpecError(f"Expected '{separator.strip(', ')}' in input")
+                values.append(self._literal(text[:cut]))
+                text = text[cut + 2:]
+            else:
+                values.append(self._literal(text))
+        return values
+
+    @staticmethod
+    def _literal(text: str) -> Any:
+        try:
+            return ast.literal_eval(text.strip())
+        except (ValueError, SyntaxError) as e:
+            raise ProblemSpecError(f"Invalid literal {text.strip()!r}: {e}")
+
+
+# Problems that predate specs; their inputs are recognised by the same
+# substrings the old per-problem runner scripts matched on
+LEGACY_SPECS = [
+    (('nums = [', 'target = '), ProblemSpec(
+        'two_sum', [ArgSpec('nums', 'list[int]'), ArgSpec('target', 'int')], 'text')),
+    (('s = "',), ProblemSpec('is_palindrome', [ArgSpec('s', 'str')], 'text')),
+    (('n = ',), ProblemSpec('fibonacci', [ArgSpec('n', 'int')], 'text')),
+    (('nums = [', 'k = '), ProblemSpec(
+        'rotate', [ArgSpec('nums', 'list[int]'), ArgSpec('k', 'int')], 'text')),
+]
+
+
+def infer_problem_spec(case_input: Any) -> Optional[ProblemSpec]:
+    """Find the legacy spec whose input format matches a test case"""
+    if not isinstance(case_input, str):
+        return None
+    for markers, spec in LEGACY_SPECS:
+        if all(marker in case_input for marker in markers):
+            return spec
+    return None
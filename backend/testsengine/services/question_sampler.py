@@ -0,0 +1,171 @@
+"""
+Server-side question sampling
+
+Tests keep large question pools (e.g. the VRT pools) but a session only
+asks `total_questions` of them. The frontend used to download whole pools
+and pick locally; now the backend draws the subset when a session starts,
+records the drawn ids on the TestSession, serves only those questions and
+scores against that set.
+
+Draws are stratified by difficulty: each difficulty gets its share of the
+questions in proportion to its share of the pool, so every session has
+the same difficulty mix (and maximum score) as the pool. The per-test,
+per-difficulty id arrays are built with one query and kept in process
+memory until the catalogue content version changes; when the cache that
+holds that version is unreachable, pools are read from the database.
+"""
+
+import logging
+import random
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from ..models import Question, TestSession
+from .catalogue_cache import content_version
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuestionPool:
+    """Question ids of one test grouped by difficulty, each array in question order"""
+    by_difficulty: Dict[str, array] = field(default_factory=dict)
+    # Position of every id in the test's question order
+    position: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.position)
+
+
+class QuestionPoolIndex:
+    """Per-process cache of QuestionPools, rebuilt when the catalogue version moves"""
+
+    def __init__(self):
+        self._pools: Dict[int, QuestionPool] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def pool(self, test_id: int) -> QuestionPool:
+        try:
+            version = content_version()
+        except Exception:
+            logger.warning("Catalogue version unavailable, loading question pool from the database", exc_info=True)
+            return self._load(test_id)
+        with self._lock:
+            if version != self._version:
+                self._pools.clear()
+                self._version = version
+            pool = self._pools.get(test_id)
+        if pool is None:
+            pool = self._load(test_id)
+            with self._lock:
+                if version == self._version:
+                    self._pools[test_id] = pool
+        return pool
+
+    def _load(self, test_id: int) -> QuestionPool:
+        pool = QuestionPool()
+        rows = Question.objects.filter(test_id=test_id).order_by('order', 'id').values_list('id', 'difficulty_level')
+        for position, (question_id, difficulty) in enumerate(rows):
+            pool.by_difficulty.setdefault(difficulty, array('q')).append(question_id)
+            pool.position[question_id] = position
+        return pool
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pools.clear()
+            self._version = None
+
+
+pool_index = QuestionPoolIndex()
+
+
+def allocate(sizes: Dict[str, int], count: int) -> Dict[str, int]:
+    """Split `count` across strata proportionally to their sizes (largest remainder)"""
+    total = sum(sizes.values())
+    if count >= total:
+        return dict(sizes)
+    quotas = {name: size * count / total for name, size in sizes.items()}
+    allocation = {name: int(quota) for name, quota in quotas.items()}
+    remaining = count - sum(allocation.values())
+    by_remainder = sorted(quotas, key=lambda name: (quotas[name] - allocation[name], sizes[name]), reverse=True)
+    for name in by_remainder[:remaining]:
+        allocation[name] += 1
+    return allocation
+
+
+class QuestionSampler:
+    """Draws a stratified-by-difficulty subset of a test's question pool"""
+
+    # Attempts at claiming the next attempt_number when concurrent starts collide
+    START_RETRIES = 3
+
+    def __init__(self, index: Optional[QuestionPoolIndex] = None, rng: Optional[random.Random] = None):
+        self.index = index or pool_index
+        self.rng = rng or random.SystemRandom()
+
+    def draw(self, test, count: Optional[int] = None) -> List[int]:
+        """
+        Question ids for one session, in the test's question order.
+
+        Args:
+            test: Test instance
+            count: Questions to draw; defaults to test.total_questions
+
+        Returns:
+            The drawn ids; the whole pool when it is not larger than `count`
+        """
+        pool = self.index.pool(test.id)
+        count = count or test.total_questions or pool.size
+        sizes = {difficulty: len(ids) for difficulty, ids in pool.by_difficulty.items()}
+        drawn = []
+        for difficulty, quota in allocate(sizes, count).items():
+            drawn.extend(self.rng.sample(pool.by_difficulty[difficulty], quota))
+        return sorted(drawn, key=pool.position.__getitem__)
+
+    def start_session(self, user, test, count: Optional[int] = None) -> TestSession:
+        """
+        Create an in-progress TestSession holding a freshly drawn question set.
+
+        Two starts racing for the same user and test (a double click) both
+        read the same last attempt; the loser hits the unique
+        (user, test, attempt_number) constraint and retries with the next number.
+        """
+        question_ids = self.draw(test, count)
+        for retry in range(self.START_RETRIES):
+            try:
+                with transaction.atomic():
+                    session = TestSession.objects.create(
+                        user=user,
+                        test=test,
+                        status='in_progress',
+                        attempt_number=self._next_attempt(user, test),
+                        question_ids=question_ids,
+                    )
+                break
+            except IntegrityError:
+                if retry == self.START_RETRIES - 1:
+                    raise
+                logger.info(f"Attempt number taken for user {user.id} on test {test.id}, retrying")
+        logger.info(f"Started session {session.id} for test {test.id} with {len(session.question_ids)} questions")
+        return session
+
+    @staticmethod
+    def _next_attempt(user, test) -> int:
+        last_attempt = TestSession.objects.filter(user=user, test=test).aggregate(last=Max('attempt_number'))['last']
+        return (last_attempt or 0) + 1
+
+
+def session_questions(session: TestSession) -> List[Question]:
+    """The session's drawn questions in delivery order (all of the test's when none were drawn)"""
+    ids = session.question_ids
+    if not ids:
+        return list(Question.objects.filter(test_id=session.test_id))
+    questions = Question.objects.in_bulk(ids)
+    return [questions[question_id] for question_id in ids if question_id in questions]
@@ -0,0 +1,446 @@
+"""
+Batch Rescoring Engine
+======================
+
+Rescores stored test submissions in bulk after a change to the scoring
+rules (e.g. new SJT option weights).
+
+`ScoringService.recalculate_score` handles one submission at a time and
+saves every answer individually; this module streams submissions in
+keyset-paginated chunks instead, keeps one answer key per test in memory
+and writes results back with `bulk_update` / `bulk_create`.
+
+Only rows whose values change are written: a submission whose answers and
+score come out the same, and that is already on the current scoring
+version, is left untouched.
+
+Large backfills can be split across several processes by giving each one
+its own submission id range (`start_id` / `end_id`).
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Answer, Question, QuestionOption, Score, TestSubmission
+from .scoring_service import ScoringService
+
+logger = logging.getLogger(__name__)
+
+ANSWER_UPDATE_FIELDS = ['is_correct', 'points_awarded']
+
+SCORE_UPDATE_FIELDS = [
+    'raw_score', 'max_possible_score', 'percentage_score',
+    'correct_answers', 'total_questions',
+    'easy_correct', 'medium_correct', 'hard_correct',
+    'easy_score', 'medium_score', 'hard_score',
+    'average_time_per_question', 'fastest_question_time', 'slowest_question_time',
+    'scoring_algorithm', 'calculated_at', 'metadata',
+]
+
+# A score is only rewritten when one of these differs
+SCORE_COMPARED_FIELDS = [name for name in SCORE_UPDATE_FIELDS if name != 'calculated_at']
+
+
+@dataclass
+class RescoreStats:
+    """Counters reported by a rescoring run"""
+    submissions: int = 0
+    answers_changed: int = 0
+    scores_changed: int = 0
+    scores_created: int = 0
+    rebuilt_from_answers_data: int = 0
+    unchanged: int = 0
+    # Answers to questions that have since moved to another test; scored
+    # against their question like recalculate_score does
+    answers_outside_test: int = 0
+    errors: int = 0
+    batches: int = 0
+    last_id: Optional[int] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Submissions rescored per second"""
+        elapsed = self.elapsed_seconds
+        return self.submissions / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'submissions': self.submissions,
+            'answers_changed': self.answers_changed,
+            'scores_changed': self.scores_changed,
+            'scores_created': self.scores_created,
+            'rebuilt_from_answers_data': self.rebuilt_from_answers_data,
+            'unchanged': self.unchanged,
+            'answers_outside_test': self.answers_outside_test,
+            'errors': self.errors,
+            'batches': self.batches,
+            'last_id': self.last_id,
+            'elapsed_seconds': round(self.elapsed_seconds, 2),
+            'throughput_per_second': round(self.throughput, 2),
+        }
+
+
+class AnswerKeyCache:
+    """
+    Per-test answer keys loaded once and reused for every submission.
+
+    For each test we keep the Question instances (so `check_answer` keeps
+    its exact semantics) and, for situational judgment tests, the set of
+    option letters carrying the highest `score_value`.
+
+    Answers can point at a question that has since moved to another test;
+    those questions are loaded by id with load_moved().
+    """
+
+    def __init__(self):
+        self._questions: Dict[int, Dict[int, Any]] = {}
+        self._sjt_best: Dict[int, Dict[int, Set[str]]] = {}
+        self._moved: Dict[int, Any] = {}
+        self._moved_sjt_best: Dict[int, Set[str]] = {}
+
+    def questions_for(self, test) -> Dict[int, Any]:
+        if test.id not in self._questions:
+            questions = {q.id: q for q in test.questions.all()}
+            self._questions[test.id] = questions
+            self._sjt_best[test.id] = (
+                self._load_sjt_best_options(questions.keys())
+                if test.test_type == 'situational_judgment' else {}
+            )
+        return self._questions[test.id]
+
+    def load_moved(self, question_ids) -> None:
+        """Load questions answered in a test they no longer belong to"""
+        missing = set(question_ids) - self._moved.keys()
+        if not missing:
+            return
+        for question in Question.objects.filter(id__in=missing):
+            self._moved[question.id] = question
+        self._moved_sjt_best.update(self._load_sjt_best_options(missing))
+
+    def question(self, test, question_id):
+        """The answered question, whether or not it is still part of `test`"""
+        return self.questions_for(test).get(question_id) or self._moved.get(question_id)
+
+    @staticmethod
+    def _load_sjt_best_options(question_ids) -> Dict[int, Set[str]]:
+        """Return question_id -> letters of the highest-scoring options"""
+        max_scores: Dict[int, int] = {}
+        letters: Dict[int, Dict[str, int]] = {}
+
+        options = QuestionOption.objects.filter(
+            question_id__in=list(question_ids)
+        ).values_list('question_id', 'option_letter', 'score_value')
+
+        for question_id, letter, score_value in options:
+            value = int(score_value or 0)
+            letters.setdefault(question_id, {})[str(letter).strip().upper()] = value
+            max_scores[question_id] = max(max_scores.get(question_id, value), value)
+
+        return {
+            question_id: {letter for letter, value in by_letter.items() if value == max_scores[question_id]}
+            for question_id, by_letter in letters.items()
+        }
+
+    def is_correct(self, test, question, selected_answer: str) -> bool:
+        self.questions_for(test)
+        best_letters = self._sjt_best[test.id].get(question.id)
+        if best_letters is None and test.test_type == 'situational_judgment':
+            best_letters = self._moved_sjt_best.get(question.id)
+        if best_letters is not None:
+            return selected_answer in best_letters
+        return bool(question.check_answer(selected_answer))
+
+
+class BatchRescorer:
+    """
+    Rescore TestSubmissions in keyset-paginated batches.
+
+    Args:
+        batch_size: Number of submissions loaded and written per batch
+        start_id: Only rescore submissions with id >= start_id
+        end_id: Only rescore submissions with id <= end_id
+        test_ids: Optional list of test ids to restrict the run to
+        dry_run: Compute changes without writing them
+    """
+
+    def __init__(self,
+                 batch_size: int = 500,
+                 start_id: Optional[int] = None,
+                 end_id: Optional[int] = None,
+                 test_ids: Optional[List[int]] = None,
+                 dry_run: bool = False):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+
+        self.batch_size = batch_size
+        self.start_id = start_id
+        self.end_id = end_id
+        self.test_ids = test_ids
+        self.dry_run = dry_run
+        self.service = ScoringService()
+        self.config = self.service.config
+        self.answer_keys = AnswerKeyCache()
+        self.stats = RescoreStats()
+
+    def _base_queryset(self):
+        queryset = TestSubmission.objects.select_related('test').order_by('id')
+        if self.start_id is not None:
+            queryset = queryset.filter(id__gte=self.start_id)
+        if self.end_id is not None:
+            queryset = queryset.filter(id__lte=self.end_id)
+        if self.test_ids:
+            queryset = queryset.filter(test_id__in=self.test_ids)
+        return queryset
+
+    def iter_batches(self) -> Iterator[List[TestSubmission]]:
+        """Yield submissions in id order using keyset pagination"""
+        queryset = self._base_queryset()
+        last_id = None
+
+        while True:
+            page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+            batch = list(page[:self.batch_size])
+            if not batch:
+                return
+            last_id = batch[-1].id
+            yield batch
+
+    def run(self, progress_callback=None) -> RescoreStats:
+        """
+        Rescore every submission in range.
+
+        Args:
+            progress_callback: Optional callable receiving the running
+                RescoreStats after each batch
+
+        Returns:
+            Final RescoreStats for the run
+        """
+        logger.info(
+            f"Starting batch rescoring (batch_size={self.batch_size}, "
+            f"start_id={self.start_id}, end_id={self.end_id}, dry_run={self.dry_run})"
+        )
+
+        for batch in self.iter_batches():
+            self._rescore_batch(batch)
+            self.stats.batches += 1
+            self.stats.last_id = batch[-1].id
+            if progress_callback:
+                progress_callback(self.stats)
+
+        logger.info(f"Batch rescoring complete: {self.stats.as_dict()}")
+        return self.stats
+
+    def _rescore_batch(self, submissions: List[TestSubmission]) -> None:
+        submission_ids = [s.id for s in submissions]
+
+        answers_by_submission: Dict[int, List[Answer]] = {}
+        answers = Answer.objects.filter(submission_id__in=submission_ids).only(
+            'id', 'submission_id', 'question_id', 'selected_answer', 'is_correct', 'points_awarded'
+        )
+        for answer in answers:
+            answers_by_submission.setdefault(answer.submission_id, []).append(answer)
+
+        moved_question_ids = set()
+        for submission in submissions:
+            current = self.answer_keys.questions_for(submission.test)
+            moved_question_ids.update(
+                answer.question_id for answer in answers_by_submission.get(submission.id, ())
+                if answer.question_id not in current
+            )
+        if moved_question_ids:
+            self.answer_keys.load_moved(moved_question_ids)
+
+        scores_by_submission = {
+            score.submission_id: score
+            for score in Score.objects.filter(submission_id__in=submission_ids)
+        }
+
+        changed_answers: List[Answer] = []
+        changed_scores: List[Score] = []
+        new_scores: List[Score] = []
+        rescored_submissions: List[TestSubmission] = []
+        now = timezone.now()
+
+        for submission in submissions:
+            submission_answers = answers_by_submission.get(submission.id)
+
+            if not submission_answers:
+                # No Answer rows to rescore in bulk; fall back to the scalar path
+                self._rebuild_single(submission)
+                continue
+
+            try:
+                answer_results, answers_to_update = self._rescore_answers(submission, submission_answers)
+            except Exception:
+                logger.exception(f"Failed to rescore submission {submission.id}")
+                self.stats.errors += 1
+                continue
+
+            changed_answers.extend(answers_to_update)
+
+            existing = scores_by_submission.get(submission.id)
+            score = existing or Score(submission=submission)
+            previous = {name: getattr(existing, name) for name in SCORE_COMPARED_FIELDS} if existing else None
+            self._apply_score_fields(score, submission, answer_results, now)
+            self.stats.submissions += 1
+
+            if existing is None:
+                new_scores.append(score)
+            elif any(getattr(score, name) != value for name, value in previous.items()):
+                changed_scores.append(score)
+                if previous['percentage_score'] != score.percentage_score:
+                    self.stats.scores_changed += 1
+            elif not answers_to_update and submission.scoring_version == self.config.SCORING_VERSION:
+                self.stats.unchanged += 1
+                continue
+
+            submission.scored_at = now
+            submission.scoring_version = self.config.SCORING_VERSION
+            rescored_submissions.append(submission)
+
+        self.stats.answers_changed += len(changed_answers)
+        self.stats.scores_created += len(new_scores)
+
+        if self.dry_run or not (changed_answers or changed_scores or new_scores or rescored_submissions):
+            return
+
+        with transaction.atomic():
+            if changed_answers:
+                Answer.objects.bulk_update(changed_answers, ANSWER_UPDATE_FIELDS, batch_size=self.batch_size)
+            if changed_scores:
+                Score.objects.bulk_update(changed_scores, SCORE_UPDATE_FIELDS, batch_size=self.batch_size)
+            if new_scores:
+                Score.objects.bulk_create(new_scores, batch_size=self.batch_size)
+            if rescored_submissions:
+                TestSubmission.objects.bulk_update(
+                    rescored_submissions, ['scored_at', 'scoring_version'], batch_size=self.batch_size
+                )
+
+    def _rescore_answers(self, submission: TestSubmission, answers: List[Answer]):
+        """Recompute correctness for a submission's answers using the cached key"""
+        current = self.answer_keys.questions_for(submission.test)
+        answer_results = []
+        answers_to_update = []
+
+        for answer in answers:
+            question = self.answer_keys.question(submission.test, answer.question_id)
+            if question is None:
+                # Deleted while the batch ran (answers cascade with their question)
+                raise Question.DoesNotExist(f"Question {answer.question_id} of answer {answer.id} no longer exists")
+            if answer.question_id not in current:
+                self.stats.answers_outside_test += 1
+
+            selected = str(answer.selected_answer or '').strip().upper()
+            try:
+                is_correct = self.answer_keys.is_correct(submission.test, question, selected)
+            except Exception:
+                is_correct = bool(question.check_answer(selected))
+
+            coefficient = self.config.DIFFICULTY_COEFFICIENTS[question.difficulty_level]
+            points_awarded = coefficient if is_correct else Decimal('0.0')
+
+            if answer.is_correct != is_correct or Decimal(answer.points_awarded or 0) != points_awarded:
+                answer.is_correct = is_correct
+                answer.points_awarded = points_awarded
+                answers_to_update.append(answer)
+
+            answer_results.append({
+                'answer': answer,
+                'question': question,
+                'is_correct': is_correct,
+                'points_awarded': points_awarded,
+                'difficulty': question.difficulty_level
+            })
+
+        return answer_results, answers_to_update
+
+    def _apply_score_fields(self, score: Score, submission: TestSubmission,
+                            answer_results: List[Dict[str, Any]], now) -> None:
+        """Fill a Score instance the same way ScoringService._calculate_comprehensive_score does"""
+        raw_score = sum((r['points_awarded'] for r in answer_results), Decimal('0.0'))
+        max_possible_score = sum(
+            (self.config.DIFFICULTY_COEFFICIENTS[r['difficulty']] for r in answer_results), Decimal('0.0')
+        )
+
+        if max_possible_score > 0:
+            percentage_score = (raw_score / max_possible_score * 100).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            )
+        else:
+            percentage_score = Decimal('0.00')
+
+        breakdown = self.service._calculate_difficulty_breakdown(answer_results)
+        time_metrics = self.service._calculate_time_metrics(submission, answer_results)
+
+        score.raw_score = raw_score
+        score.max_possible_score = max_possible_score
+        score.percentage_score = percentage_score
+        score.correct_answers = sum(1 for r in answer_results if r['is_correct'])
+        score.total_questions = len(answer_results)
+        score.easy_correct = breakdown['easy']['correct']
+        score.medium_correct = breakdown['medium']['correct']
+        score.hard_correct = breakdown['hard']['correct']
+        score.easy_score = breakdown['easy']['score']
+        score.medium_score = breakdown['medium']['score']
+        score.hard_score = breakdown['hard']['score']
+        score.average_time_per_question = time_metrics['average']
+        score.fastest_question_time = time_metrics['fastest']
+        score.slowest_question_time = time_metrics['slowest']
+        score.scoring_algorithm = "difficulty_weighted"
+        score.calculated_at = now
+        score.metadata = {
+            'scoring_version': self.config.SCORING_VERSION,
+            'difficulty_coefficients': {k: float(v) for k, v in self.config.DIFFICULTY_COEFFICIENTS.items()},
+            'test_duration_minutes': self.config.TEST_DURATION_MINUTES,
+            'submission_time_seconds': submission.time_taken_seconds,
+            'rescored': True,
+        }
+
+    def _rebuild_single(self, submission: TestSubmission) -> None:
+        """Rescore a submission that has no Answer rows via the scalar service"""
+        if self.dry_run:
+            self.stats.submissions += 1
+            return
+
+        try:
+            with transaction.atomic():
+                self.service.recalculate_score(submission)
+            self.stats.submissions += 1
+            self.stats.rebuilt_from_answers_data += 1
+        except Exception:
+            logger.exception(f"Failed to rebuild score for submission {submission.id}")
+            self.stats.errors += 1
+
+
+def rescore_submissions(batch_size: int = 500,
+                        start_id: Optional[int] = None,
+                        end_id: Optional[int] = None,
+                        test_ids: Optional[List[int]] = None,
+                        dry_run: bool = False,
+                        progress_callback=None) -> RescoreStats:
+    """
+    Convenience function to rescore submissions in bulk.
+
+    Returns:
+        RescoreStats with throughput and changed-score counts
+    """
+    rescorer = BatchRescorer(
+        batch_size=batch_size,
+        start_id=start_id,
+        end_id=end_id,
+        test_ids=test_ids,
+        dry_run=dry_run,
+    )
+    return rescorer.run(progress_callback=progress_callback)
@@ -0,0 +1,183 @@
+"""
+Code Execution Result Cache
+
+Content-addressed cache of what the sandbox reported for a submission:
+one raw outcome per case (return value, output, timings), never a
+verdict. CodeExecutor grades cached outcomes against the current expected
+outputs on every hit. The key is a SHA-256 of the normalized code, the
+language and a version digest of the test inputs, problem spec and
+grading mode, so a byte-identical resubmission is answered without
+touching the sandbox, while any change to the inputs produces new keys.
+
+Entries expire after TIMEOUT seconds. With django_redis the number of
+entries is bounded by MAX_ENTRIES through a sorted-set index evicting
+the oldest writes; other backends fall back to their own culling.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Bump when the harness or outcome format changes to orphan old entries
+HARNESS_VERSION = 3
+
+KEY_PREFIX = 'code_result'
+INDEX_KEY = 'code_result:index'
+HITS_KEY = 'code_result:hits'
+MISSES_KEY = 'code_result:misses'
+
+DEFAULT_RESULT_CACHE_CONFIG = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 6,
+    'MAX_ENTRIES': 10000,
+    'MAX_ENTRY_BYTES': 256 * 1024,
+}
+
+
+def normalize_code(code: str) -> str:
+    """Ignore line endings, trailing whitespace and trailing blank lines"""
+    lines = code.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+
+def case_set_version(test_cases: List[Dict], problem_spec: Optional[Any] = None,
+                     grading_mode: Optional[str] = None) -> str:
+    """
+    Digest of everything besides the code that determines what the sandbox reports
+
+    Expected outputs are left out: they only matter for grading, which is
+    never cached.
+    """
+    if problem_spec is not None and not isinstance(problem_spec, dict):
+        problem_spec = problem_spec.to_dict()
+    inputs = [case['input'] for case in test_cases]
+    payload = json.dumps(
+        {'inputs': inputs, 'spec': problem_spec, 'mode': grading_mode, 'harness': HARNESS_VERSION},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Args:
+        alias: Django cache alias holding the entries
+        timeout: Entry TTL in seconds
+        max_entries: Upper bound on stored results (django_redis only)
+        max_entry_bytes: Results larger than this are not stored
+    """
+
+    def __init__(self, alias: str = 'default', timeout: int = 60 * 60 * 6,
+                 max_entries: int = 10000, max_entry_bytes: int = 256 * 1024):
+        self.alias = alias
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key_for(self, code: str, language: str, version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (language, normalize_code(code), version):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return f"{KEY_PREFIX}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.cache.get(key)
+        except Exception:
+            logger.exception("Code result cache read failed")
+            return None
+        self._count(HITS_KEY if value is not None else MISSES_KEY)
+        return value
+
+    def set(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Store {'outcomes': [...]}; the caller decides what is cacheable"""
+        if len(json.dumps(entry, default=str)) > self.max_entry_bytes:
+            return False
+        try:
+            self.cache.set(key, entry, self.timeout)
+            self._index(key)
+            return True
+        except Exception:
+            logger.exception("Code result cache write failed")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits = counts.get(HITS_KEY, 0)
+        misses = counts.get(MISSES_KEY, 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': self._size(),
+            'max_entries': self.max_entries,
+        }
+
+    def _count(self, key: str) -> None:
+        try:
+            self.cache.add(key, 0, None)
+            self.cache.incr(key)
+        except Exception:
+            pass
+
+    def _redis(self):
+        """Raw client for django_redis caches, None for other backends"""
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection(self.alias)
+        except Exception:
+            return None
+
+    def _index(self, key: str) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        index_key = self.cache.make_key(INDEX_KEY)
+        client.zadd(index_key, {key: time.time()})
+        excess = client.zcard(index_key) - self.max_entries
+        if excess > 0:
+            evicted = [member.decode() if isinstance(member, bytes) else member
+                       for member, _ in client.zpopmin(index_key, excess)]
+            self.cache.delete_many(evicted)
+
+    def _size(self) -> Optional[int]:
+        client = self._redis()
+        if client is None:
+            return None
+        return client.zcard(self.cache.make_key(INDEX_KEY))
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Process-wide result cache from settings.CODE_RESULT_CACHE, None when disabled"""
+    global _result_cache
+    config = {**DEFAULT_RESULT_CACHE_CONFIG, **getattr(settings, 'CODE_RESULT_CACHE', {})}
+    if not config['ENABLED']:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                alias=config['ALIAS'],
+                timeout=config['TIMEOUT'],
+                max_entries=config['MAX_ENTRIES'],
+                max_entry_bytes=config['MAX_ENTRY_BYTES'],
+            )
+        return _result_cache
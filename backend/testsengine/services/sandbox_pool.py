@@ -0,0 +1,365 @@
+"""
+Sandbox Worker Pool
+
+Keeps a small pool of pre-started `sandbox_worker.py` interpreters so a
+coding submission is loaded once and all of its test cases run over a
+pipe, instead of paying one interpreter startup and one module import per
+case.
+
+Each worker runs with RLIMIT_AS / RLIMIT_CPU applied inside the sandbox
+process and is killed and replaced when a case exceeds its wall-clock
+timeout or crashes. A worker serves a single submission: candidate code
+can patch anything in its interpreter, so it is retired on release and a
+fresh one takes its place. Frames coming back are treated as untrusted.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+
+from .sandbox_worker import HEADER
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+# Variables passed to the sandbox; nothing else from the web/worker
+# environment (database URL, secret key, broker credentials) reaches it
+SANDBOX_ENV_PASSTHROUGH = ('SYSTEMROOT',)  # required by the interpreter on Windows
+
+DEFAULT_POOL_CONFIG = {
+    'SIZE': 2,
+    'CASE_TIMEOUT': 5,
+    'CPU_SECONDS': 5,
+    'MEMORY_MB': 256,
+    'START_TIMEOUT': 10,
+}
+
+
+def sandbox_env() -> Dict[str, str]:
+    """Minimal environment for a sandbox interpreter"""
+    env = {'PATH': os.defpath, 'LANG': 'C.UTF-8'}
+    env.update({name: os.environ[name] for name in SANDBOX_ENV_PASSTHROUGH if name in os.environ})
+    return env
+
+
+class SandboxError(Exception):
+    """
+    The sandbox worker died, timed out or broke the protocol.
+
+    cpu_ms and peak_rss_kb come from wait4() on the dead worker when known.
+    """
+
+    def __init__(self, message: str, cpu_ms: Optional[int] = None, peak_rss_kb: Optional[int] = None):
+        super().__init__(message)
+        self.cpu_ms = cpu_ms
+        self.peak_rss_kb = peak_rss_kb
+
+
+class SandboxTimeout(SandboxError):
+    """A request exceeded its wall-clock timeout"""
+
+
+class SandboxWorker:
+    """One warm sandbox interpreter and its pipe channel"""
+
+    def __init__(self, cpu_seconds: float, memory_mb: int, start_timeout: float = 10):
+        # Cumulative CPU time last reported by the worker, used to attribute
+        # the CPU of a call that killed it
+        self.cpu_total_ms = 0.0
+        self.exit_usage = None
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', WORKER_SCRIPT, str(cpu_seconds), str(memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd='/' if os.name == 'posix' else None,
+            env=sandbox_env(),
+            close_fds=True,
+        )
+        try:
+            self._receive(start_timeout)
+        except SandboxError:
+            self.kill()
+            raise
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return not self._reap(os.WNOHANG)
+
+    def load(self, code: str, timeout: float) -> Dict[str, Any]:
+        """Compile the submission as module `solution` inside the worker"""
+        return self.request({'op': 'load', 'code': code}, timeout)
+
+    def call(self, entry: str, args: List[Any], timeout: float) -> Dict[str, Any]:
+        """Call solution.<entry>(*args) and return the worker's response"""
+        return self.request({'op': 'run', 'entry': entry, 'args': args}, timeout)
+
+    def run_batch(self, entry: str, cases: List[Dict[str, Any]], case_timeout: float,
+                  timeout: float, stop_on_timeout: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Run a batch of cases in one request, yielding each case's frame as it finishes.
+
+        Frames only report what the code returned; grading happens in the caller.
+
+        Args:
+            cases: [{'args': [...]}], optionally with their own 'entry'
+            case_timeout: Wall-clock seconds per case, enforced inside the worker
+            timeout: Wall-clock seconds for the whole batch, enforced here
+
+        Raises:
+            SandboxError: The worker died, the batch overran or a frame was out
+                of sequence; frames already yielded are valid, the next case is
+                the one that failed
+        """
+        deadline = time.monotonic() + timeout
+        self.request({
+            'op': 'run_batch', 'entry': entry, 'cases': cases,
+            'case_timeout': case_timeout, 'stop_on_timeout': stop_on_timeout,
+        }, timeout=None)
+        finished = False
+        next_case = 0
+        try:
+            while True:
+                frame = self._receive(max(0.0, deadline - time.monotonic()))
+                if frame.get('done'):
+                    finished = True
+                    if not frame.get('ok'):
+                        raise SandboxError(frame.get('error', 'Batch failed'))
+                    return
+                # Candidate code can write to the channel; anything but the
+                # next case in order ends the batch
+                if frame.get('case') != next_case or next_case >= len(cases):
+                    raise SandboxError('Sandbox protocol error')
+                next_case += 1
+                yield frame
+        finally:
+            # Abandoned mid-batch: the remaining frames would desync the channel
+            if not finished:
+                self.kill()
+
+    def request(self, message: Dict[str, Any], timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Send a request and wait for its response (timeout=None only sends)"""
+        payload = json.dumps(message).encode('utf-8')
+        try:
+            self.process.stdin.write(HEADER.pack(len(payload)) + payload)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.kill()
+            raise SandboxError(f"Sandbox worker unavailable: {e}")
+        if timeout is None:
+            return None
+        return self._receive(timeout)
+
+    def kill(self) -> None:
+        if self.alive:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+            self._reap(0)
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def _receive(self, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        header = self._read_exact(HEADER.size, deadline)
+        (size,) = HEADER.unpack(header)
+        response = json.loads(self._read_exact(size, deadline).decode('utf-8'))
+        self.cpu_total_ms = response.get('cpu_total_ms', self.cpu_total_ms)
+        return response
+
+    def _reap(self, options: int) -> bool:
+        """
+        Collect the worker's exit status with wait4() to keep its rusage.
+
+        Returns:
+            True once the process has exited
+        """
+        if self.process.returncode is not None:
+            return True
+        try:
+            pid, status, usage = os.wait4(self.pid, options)
+        except ChildProcessError:
+            self.process.poll()
+            return True
+        if pid == 0:
+            return False
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+        self.exit_usage = usage
+        return True
+
+    def _failure(self, error_class, message: str) -> SandboxError:
+        """Kill the worker and build an error carrying the call's resource usage"""
+        self.kill()
+        if self.exit_usage is None:
+            return error_class(message)
+        cpu_ms = (self.exit_usage.ru_utime + self.exit_usage.ru_stime) * 1000 - self.cpu_total_ms
+        return error_class(message, cpu_ms=max(0, int(cpu_ms)), peak_rss_kb=self.exit_usage.ru_maxrss)
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        fd = self.process.stdout.fileno()
+        chunks = []
+        remaining = size
+        while remaining:
+            wait = deadline - time.monotonic()
+            if wait <= 0 or not select.select([fd], [], [], wait)[0]:
+                raise self._failure(SandboxTimeout, 'Time limit exceeded')
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                self._reap(0)
+                raise self._failure(SandboxError, self._describe_exit(self.process.returncode))
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    @staticmethod
+    def _describe_exit(returncode: int) -> str:
+        if returncode in (-getattr(signal, 'SIGXCPU', 24), -signal.SIGKILL):
+            return 'Time limit exceeded'
+        if returncode < 0:
+            return f"Sandbox terminated by signal {-returncode}"
+        return f"Sandbox exited with code {returncode}"
+
+
+class SandboxPool:
+    """
+    Bounded pool of pre-started, single-use sandbox workers.
+
+    Args:
+        size: Number of workers kept ready
+        case_timeout: Wall-clock seconds allowed per request
+        cpu_seconds: CPU seconds allowed per request (RLIMIT_CPU)
+        memory_mb: Address space limit per worker (RLIMIT_AS)
+    """
+
+    def __init__(self, size: int = 2, case_timeout: float = 5,
+                 cpu_seconds: float = 5, memory_mb: int = 256, start_timeout: float = 10):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.case_timeout = case_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.start_timeout = start_timeout
+        self._idle: "queue.Queue[SandboxWorker]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+
+    def start(self) -> None:
+        """Pre-fork the workers (done lazily on first acquire otherwise)"""
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+
+    @contextmanager
+    def worker(self):
+        """Borrow a worker; it is retired and replaced on return"""
+        worker = self.acquire()
+        try:
+            yield worker
+        finally:
+            self.release(worker)
+
+    def acquire(self, blocking: bool = True) -> Optional[SandboxWorker]:
+        """
+        Take a worker out of the pool.
+
+        With blocking=False, returns None when every worker is busy; a
+        submission that already holds one worker uses this to borrow more
+        without deadlocking against other submissions.
+        """
+        if self._closed:
+            raise SandboxError("Sandbox pool is closed")
+        self.start()
+        if not self._slots.acquire(blocking=blocking):
+            return None
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = None
+        if worker is None or not worker.alive:
+            if worker is not None:
+                worker.kill()
+            try:
+                worker = self._spawn()
+            except Exception:
+                self._slots.release()
+                raise
+        return worker
+
+    def release(self, worker: SandboxWorker) -> None:
+        """Retire a worker after its submission and start its replacement"""
+        try:
+            worker.kill()
+            if self._closed:
+                return
+            try:
+                self._idle.put(self._spawn())
+            except SandboxError as e:
+                # The next acquire spawns a replacement
+                logger.error(f"Could not replace sandbox worker: {e}")
+        finally:
+            self._slots.release()
+
+    def replace(self, worker: SandboxWorker) -> SandboxWorker:
+        """Swap a dead or timed-out worker for a fresh one without releasing the slot"""
+        worker.kill()
+        return self._spawn()
+
+    def shutdown(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.kill()
+
+    def _spawn(self) -> SandboxWorker:
+        return SandboxWorker(self.cpu_seconds, self.memory_mb, self.start_timeout)
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Process-wide pool configured from settings.CODE_EXECUTOR_POOL"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = {**DEFAULT_POOL_CONFIG, **getattr(settings, 'CODE_EXECUTOR_POOL', {})}
+            _pool = SandboxPool(
+                size=config['SIZE'],
+                case_timeout=config['CASE_TIMEOUT'],
+                cpu_seconds=config['CPU_SECONDS'],
+                memory_mb=config['MEMORY_MB'],
+                start_timeout=config['START_TIMEOUT'],
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,262 @@
+"""
+Sandbox worker process for CodeExecutor
+
+Started by SandboxPool with `python -I sandbox_worker.py <cpu_seconds> <memory_mb>`
+ahead of time, serves a single submission and is then killed. It must not
+import Django or anything from the project: it only ever runs candidate
+code, and nothing it reports is trusted. It never sees expected outputs;
+it returns what the code produced and CodeExecutor grades that.
+
+Protocol: length-prefixed JSON frames (4-byte big-endian size) on stdin
+and on a private duplicate of the original stdout. File descriptors 1 and
+2 are pointed at /dev/null so candidate code cannot corrupt the channel;
+print() output is captured per case instead.
+
+Requests:
+    {"op": "load", "code": "..."}            compile code as module `solution`
+    {"op": "run", "entry": "f", "args": []}  call solution.f(*args)
+    {"op": "run_batch", "entry": "f", "case_timeout": 5, "cases": [{"args": []}]}
+                                             run a batch of cases, one frame each
+
+Responses carry the return value (`result`, as JSON, and `output`, its
+str()) with the call's wall time, CPU time and peak RSS (VmHWM, reset
+before each call through /proc/self/clear_refs where available).
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import struct
+import sys
+import time
+import types
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+HEADER = struct.Struct('>I')
+
+TIME_LIMIT_ERROR = 'Time limit exceeded'
+
+
+class CaseTimeout(BaseException):
+    """Raised by SIGALRM when one case exceeds its wall-clock limit"""
+
+
+def _on_alarm(signum, frame):
+    raise CaseTimeout(TIME_LIMIT_ERROR)
+
+
+def to_json_value(value):
+    """Normalize a result the way a JSON round trip would (tuples become lists)"""
+    return json.loads(json.dumps(value, default=str))
+
+
+def set_memory_limit(memory_mb):
+    if resource is None or memory_mb <= 0:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def arm_cpu_limit(cpu_seconds):
+    """Allow cpu_seconds more CPU time; the kernel sends SIGXCPU past it"""
+    if resource is None or cpu_seconds <= 0:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def cpu_total_ms():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return (usage.ru_utime + usage.ru_stime) * 1000
+
+
+def reset_peak_rss():
+    """Reset VmHWM so the next reading is the peak of one case (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+
+def describe_error(error):
+    if isinstance(error, MemoryError):
+        return 'Memory limit exceeded'
+    return str(error)
+
+
+def read_frame(stream):
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (size,) = HEADER.unpack(header)
+    return json.loads(stream.read(size).decode('utf-8'))
+
+
+def write_frame(stream, message):
+    payload = json.dumps(message, default=str).encode('utf-8')
+    stream.write(HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+class Worker:
+    def __init__(self, cpu_seconds):
+        self.cpu_seconds = cpu_seconds
+        self.module = None
+        self.load_error = None
+
+    def handle(self, request, emit):
+        op = request.get('op')
+        if op == 'load':
+            return self.load(request['code'])
+        if op == 'run':
+            return self.run(request['entry'], request.get('args', []))
+        if op == 'run_batch':
+            return self.run_batch(request, emit)
+        return {'ok': False, 'error': f'Unknown op: {op}'}
+
+    def load(self, code):
+        if self.module is not None or self.load_error is not None:
+            return {'ok': False, 'error': 'A submission is already loaded'}
+        module = types.ModuleType('solution')
+        module.__file__ = 'solution.py'
+        stdout = io.StringIO()
+        arm_cpu_limit(self.cpu_seconds)
+        try:
+            with contextlib.redirect_stdout(stdout):
+                exec(compile(code, 'solution.py', 'exec'), module.__dict__)
+        except BaseException as e:  # candidate code may raise anything, even SystemExit
+            self.load_error = describe_error(e)
+            return {'ok': False, 'error': self.load_error}
+        self.module = module
+        sys.modules['solution'] = module
+        return {'ok': True}
+
+    def run(self, entry, args):
+        if self.module is None:
+            return {'ok': False, 'error': self.load_error or 'No submission loaded', 'time_ms': 0}
+        response = self.call(getattr(self.module, entry, None), entry, args)
+        if response['ok']:
+            response['output'] = str(response.pop('result'))
+        return response
+
+    def run_batch(self, request, emit):
+        """
+        Run every case of a batch.
+
+        Emits one frame per case as it finishes ({"case": i, "result": ...})
+        and returns a final {"done": true} frame.
+        """
+        if self.module is None:
+            return {'ok': False, 'done': True, 'error': self.load_error or 'No submission loaded'}
+
+        case_timeout = request.get('case_timeout', 0)
+
+        for index, case in enumerate(request['cases']):
+            # A case may name its own entry function (legacy mixed problem sets)
+            entry = case.get('entry', request['entry'])
+            response = self.call(getattr(self.module, entry, None), entry, case['args'], case_timeout)
+            if response['ok']:
+                result = response.pop('result')
+                response['output'] = str(result)
+                try:
+                    response['result'] = to_json_value(result)
+                except (TypeError, ValueError) as e:
+                    response.update({'ok': False, 'error': f"Result is not serializable: {e}"})
+            response['case'] = index
+            emit(response)
+            if request.get('stop_on_timeout') and response.get('error') == TIME_LIMIT_ERROR:
+                break
+
+        return {'ok': True, 'done': True}
+
+    def call(self, func, entry, args, timeout=0):
+        """Call func(*args) under the CPU limit and an optional SIGALRM timeout"""
+        if func is None:
+            return {'ok': False, 'error': f"module 'solution' has no attribute '{entry}'", 'time_ms': 0}
+
+        stdout = io.StringIO()
+        reset_peak_rss()
+        arm_cpu_limit(self.cpu_seconds)
+        cpu_start = cpu_total_ms()
+        start = time.perf_counter()
+        if timeout > 0:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            with contextlib.redirect_stdout(stdout):
+                result = func(*args)
+            response = {'ok': True, 'result': result}
+        except BaseException as e:
+            response = {'ok': False, 'error': describe_error(e)}
+        finally:
+            if timeout > 0:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+        cpu_end = cpu_total_ms()
+        response.update({
+            'stdout': stdout.getvalue(),
+            'time_ms': int((time.perf_counter() - start) * 1000),
+            'cpu_ms': int(cpu_end - cpu_start),
+            'cpu_total_ms': cpu_end,
+            'peak_rss_kb': peak_rss_kb(),
+        })
+        return response
+
+
+def main():
+    cpu_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+    memory_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    # Keep a private handle on the protocol channel, then silence fds 1 and 2
+    channel_out = os.fdopen(os.dup(1), 'wb')
+    channel_in = os.fdopen(os.dup(0), 'rb')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    set_memory_limit(memory_mb)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    worker = Worker(cpu_seconds)
+    write_frame(channel_out, {'ok': True, 'ready': True, 'pid': os.getpid(), 'cpu_total_ms': cpu_total_ms()})
+
+    while True:
+        request = read_frame(channel_in)
+        if request is None or request.get('op') == 'exit':
+            break
+        try:
+            response = worker.handle(request, lambda frame: write_frame(channel_out, frame))
+        except MemoryError:
+            response = {'ok': False, 'error': 'Memory limit exceeded'}
+        write_frame(channel_out, response)
+
+
+if __name__ == '__main__':
+    main()
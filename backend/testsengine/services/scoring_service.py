@@ -16,445 +16,454 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 import logging
 
-from ..models import Test, Question, TestSubmission, Answer, Score
-from ..question_option_model import QuestionOption
+from ..models import Test, Question, QuestionOption, TestSubmission, Answer, Score
 
 logger = logging.getLogger(__name__)
 
 class ScoringConfig:
- """Configuration constants for the scoring system"""
-
- # Difficulty coefficients (FIXED SYSTEM REQUIREMENT)
- DIFFICULTY_COEFFICIENTS = {
- 'easy': Decimal('1.0'),
- 'medium': Decimal('1.5'),
- 'hard': Decimal('2.0')
- }
-
- # Timer settings
- TEST_DURATION_MINUTES = 20 # Fixed 20 minutes
-
- # Scoring algorithm version
- SCORING_VERSION = "1.0"
-
- # Performance levels for grading
- GRADE_THRESHOLDS = {
- 90: 'A',
- 80: 'B',
- 70: 'C',
- 60: 'D',
- 0: 'F'
- }
+    """Configuration constants for the scoring system"""
+
+    # Difficulty coefficients (FIXED SYSTEM REQUIREMENT)
+    DIFFICULTY_COEFFICIENTS = {
+        'easy': Decimal('1.0'),
+        'medium': Decimal('1.5'),
+        'hard': Decimal('2.0')
+    }
+
+    # Timer settings
+    TEST_DURATION_MINUTES = 20 # Fixed 20 minutes
+
+    # Scoring algorithm version
+    SCORING_VERSION = "1.0"
+
+    # Performance levels for grading
+    GRADE_THRESHOLDS = {
+        90: 'A',
+        80: 'B',
+        70: 'C',
+        60: 'D',
+        0: 'F'
+    }
 
 class ScoringService:
- """
- Main scoring service for calculating test scores using difficulty coefficients.
- This is the single source of truth for all scoring operations.
- """
-
- def __init__(self):
- self.config = ScoringConfig()
-
- @transaction.atomic
- def score_test_submission(self, user, test: Test, answers_data: Dict[str, str],
- time_taken_seconds: int) -> Tuple[TestSubmission, Score]:
- """
- Complete scoring workflow for a test submission.
-
- Args:
- user: User who submitted the test
- test: Test instance
- answers_data: Dict mapping question_id -> selected_answer (e.g., {'1': 'A', '2': 'B'})
- time_taken_seconds: Total time taken for the test
-
- Returns:
- Tuple of (TestSubmission, Score) instances
-
- Raises:
- ValidationError: If answers_data is invalid
- ValueError: If scoring calculation fails
- """
- user_identifier = user.username if user else "anonymous"
- logger.info(f"Starting scoring for user {user_identifier} on test {test.title}")
-
- # Validate inputs
- self._validate_submission_data(test, answers_data, time_taken_seconds)
-
- # Create TestSubmission
- submission = self._create_test_submission(user, test, answers_data, time_taken_seconds)
-
- # Create Answer records and calculate scores
- answer_results = self._create_and_score_answers(submission, answers_data)
-
- # Calculate comprehensive score
- score = self._calculate_comprehensive_score(submission, answer_results)
-
- # Mark submission as scored
- submission.scored_at = timezone.now()
- submission.scoring_version = self.config.SCORING_VERSION
- submission.save()
-
- logger.info(f"Scoring complete: {score.percentage_score}% ({score.correct_answers}/{score.total_questions})")
-
- return submission, score
-
- def _validate_submission_data(self, test: Test, answers_data: Dict[str, str],
- time_taken_seconds: int) -> None:
- """Validate submission data before processing"""
- if not answers_data:
- raise ValidationError("No answers provided for submission")
-
- if time_taken_seconds < 0:
- raise ValidationError("Time taken cannot be negative")
-
- if time_taken_seconds > (self.config.TEST_DURATION_MINUTES * 60 + 60): # Allow 1 minute grace
- logger.warning(f"Submission time ({time_taken_seconds}s) exceeds test duration")
-
- # Validate that all question IDs exist
- question_ids = set(str(q.id) for q in test.questions.all())
- provided_ids = set(answers_data.keys())
-
- if not provided_ids.issubset(question_ids):
- invalid_ids = provided_ids - question_ids
- raise ValidationError(f"Invalid question IDs: {invalid_ids}")
-
- def _create_test_submission(self, user, test: Test, answers_data: Dict[str, str],
- time_taken_seconds: int) -> TestSubmission:
- """Create TestSubmission record"""
-
- user_identifier = user.username if user else "anonymous"
-
- # Check for existing submission (one per user per test)
- existing_submission = TestSubmission.objects.filter(user=user, test=test).first()
- if existing_submission:
- logger.warning(f"Overwriting existing submission for user {user_identifier} on test {test.title}")
- existing_submission.delete()
-
- submission = TestSubmission.objects.create(
- user=user,
- test=test,
- time_taken_seconds=time_taken_seconds,
- answers_data=answers_data,
- is_complete=True,
- submitted_at=timezone.now()
- )
-
- logger.debug(f"Created TestSubmission {submission.id}")
- return submission
-
- def _create_and_score_answers(self, submission: TestSubmission,
- answers_data: Dict[str, str]) -> List[Dict[str, Any]]:
- """Create Answer records and calculate individual scores"""
-
- answer_results = []
-
- # Only score questions that have answers provided (for random selection tests)
- # Get question IDs from the answers_data keys
- answered_question_ids = set(answers_data.keys())
-
- # Get questions that were actually answered
- questions = submission.test.questions.filter(id__in=answered_question_ids).order_by('order')
-
- for question in questions:
- question_id_str = str(question.id)
- selected_answer = answers_data.get(question_id_str, '')
- if isinstance(selected_answer, str):
- selected_answer = selected_answer.strip().upper()
-
- # Robust SJT handling: if QuestionOption exists, use highest-score option as correct
- is_correct = False
- if submission.test.test_type == 'situational_judgment':
- try:
- opts = list(QuestionOption.objects.filter(question=question))
- if opts:
- max_score = max(int(getattr(o, 'score_value', 0) or 0) for o in opts)
- sel_opt = next((o for o in opts if str(o.option_letter).strip().upper() == selected_answer), None)
- is_correct = bool(sel_opt and int(getattr(sel_opt, 'score_value', 0) or 0) == max_score)
- else:
- # Fallback to standard check if no options in DB
- is_correct = question.check_answer(selected_answer)
- except Exception:
- is_correct = question.check_answer(selected_answer)
- else:
- # Standard MCQ scoring
- is_correct = question.check_answer(selected_answer)
-
- points_awarded = self.config.DIFFICULTY_COEFFICIENTS[question.difficulty_level] if is_correct else Decimal('0.0')
-
- # Create Answer record
- answer = Answer.objects.create(
- submission=submission,
- question=question,
- selected_answer=selected_answer,
- is_correct=is_correct,
- points_awarded=points_awarded,
- time_taken_seconds=0, # Individual question timing not implemented yet
- answered_at=timezone.now()
- )
-
- answer_results.append({
- 'answer': answer,
- 'question': question,
- 'is_correct': is_correct,
- 'points_awarded': points_awarded,
- 'difficulty': question.difficulty_level
- })
-
- logger.debug(f"Created {len(answer_results)} Answer records")
- return answer_results
-
- def _calculate_comprehensive_score(self, submission: TestSubmission,
- answer_results: List[Dict[str, Any]]) -> Score:
- """Calculate comprehensive score with detailed breakdown"""
-
- # Overall calculations
- total_questions = len(answer_results)
- correct_answers = sum(1 for result in answer_results if result['is_correct'])
- raw_score = sum(result['points_awarded'] for result in answer_results)
-
- # Calculate maximum possible score for the questions actually answered
- # Use standard difficulty-based scoring for all test types (including SJT)
- max_possible_score = Decimal('0.0')
- for result in answer_results:
- difficulty = result['difficulty']
- max_possible_score += self.config.DIFFICULTY_COEFFICIENTS[difficulty]
-
- # Calculate percentage
- if max_possible_score > 0:
- percentage_score = (raw_score / max_possible_score * 100).quantize(
- Decimal('0.01'), rounding=ROUND_HALF_UP
- )
- else:
- percentage_score = Decimal('0.00')
-
- # Difficulty breakdown
- difficulty_breakdown = self._calculate_difficulty_breakdown(answer_results)
-
- # Performance metrics
- time_metrics = self._calculate_time_metrics(submission, answer_results)
-
- # Create Score record
- score = Score.objects.create(
- submission=submission,
- raw_score=raw_score,
- max_possible_score=max_possible_score,
- percentage_score=percentage_score,
- correct_answers=correct_answers,
- total_questions=total_questions,
-
- # Difficulty breakdown
- easy_correct=difficulty_breakdown['easy']['correct'],
- medium_correct=difficulty_breakdown['medium']['correct'],
- hard_correct=difficulty_breakdown['hard']['correct'],
- easy_score=difficulty_breakdown['easy']['score'],
- medium_score=difficulty_breakdown['medium']['score'],
- hard_score=difficulty_breakdown['hard']['score'],
-
- # Performance metrics
- average_time_per_question=time_metrics['average'],
- fastest_question_time=time_metrics['fastest'],
- slowest_question_time=time_metrics['slowest'],
-
- # Metadata
- scoring_algorithm="difficulty_weighted",
- calculated_at=timezone.now(),
- metadata={
- 'scoring_version': self.config.SCORING_VERSION,
- 'difficulty_coefficients': {k: float(v) for k, v in self.config.DIFFICULTY_COEFFICIENTS.items()},
- 'test_duration_minutes': self.config.TEST_DURATION_MINUTES,
- 'submission_time_seconds': submission.time_taken_seconds
- }
- )
-
- logger.debug(f"Created Score {score.id}: {score.percentage_score}%")
- return score
-
- def _calculate_difficulty_breakdown(self, answer_results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
- """Calculate breakdown by difficulty level"""
-
- breakdown = {
- 'easy': {'correct': 0, 'total': 0, 'score': Decimal('0.0')},
- 'medium': {'correct': 0, 'total': 0, 'score': Decimal('0.0')},
- 'hard': {'correct': 0, 'total': 0, 'score': Decimal('0.0')}
- }
-
- for result in answer_results:
- difficulty = result['difficulty']
- breakdown[difficulty]['total'] += 1
-
- if result['is_correct']:
- breakdown[difficulty]['correct'] += 1
- breakdown[difficulty]['score'] += result['points_awarded']
-
- return breakdown
-
- def _calculate_time_metrics(self, submission: TestSubmission,
- answer_results: List[Dict[str, Any]]) -> Dict[str, Decimal]:
- """Calculate time-based performance metrics"""
-
- total_time = submission.time_taken_seconds
- total_questions = len(answer_results)
-
- if total_questions > 0:
- average_time = Decimal(str(total_time / total_questions)).quantize(
- Decimal('0.01'), rounding=ROUND_HALF_UP
- )
- else:
- average_time = Decimal('0.00')
-
- # For now, use average for fastest/slowest since individual timing isn't implemented
- # In future versions, these could be calculated from individual Answer.time_taken_seconds
- return {
- 'average': average_time,
- 'fastest': max(1, int(average_time * Decimal('0.5'))), # Estimate: 50% of average
- 'slowest': int(average_time * Decimal('2.0')) # Estimate: 200% of average
- }
-
- def get_score_summary(self, score: Score) -> Dict[str, Any]:
- """Get a formatted summary of the score results"""
-
- return {
- 'overall': {
- 'percentage': float(score.percentage_score),
- 'grade_letter': score.grade_letter,
- 'passed': score.passed,
- 'raw_score': float(score.raw_score),
- 'max_possible_score': float(score.max_possible_score),
- 'correct_answers': score.correct_answers,
- 'total_questions': score.total_questions
- },
- 'difficulty_breakdown': {
- 'easy': {
- 'correct': score.easy_correct,
- 'score': float(score.easy_score),
- 'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['easy'])
- },
- 'medium': {
- 'correct': score.medium_correct,
- 'score': float(score.medium_score),
- 'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['medium'])
- },
- 'hard': {
- 'correct': score.hard_correct,
- 'score': float(score.hard_score),
- 'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['hard'])
- }
- },
- 'performance': {
- 'average_time_per_question': float(score.average_time_per_question),
- 'fastest_question_time': score.fastest_question_time,
- 'slowest_question_time': score.slowest_question_time,
- 'total_time_taken': score.submission.time_taken_seconds
- },
- 'metadata': {
- 'scoring_algorithm': score.scoring_algorithm,
- 'calculated_at': score.calculated_at.isoformat(),
- 'test_title': score.submission.test.title,
- 'test_type': score.submission.test.test_type
- }
- }
-
- def recalculate_score(self, submission: TestSubmission) -> Score:
- """Recalculate score for an existing submission.
- Re-evaluates correctness from selected answers (fixes old SJT/MCQ submissions).
- """
- logger.info(f"Recalculating score for submission {submission.id}")
-
- # Delete existing score if it exists
- if hasattr(submission, 'score'):
- submission.score.delete()
-
- answers = submission.answers.all()
- answer_results = []
-
- if answers.exists():
- for answer in answers:
- sel = str(answer.selected_answer or '').strip().upper()
-
- # Recompute correctness fresh (with robust SJT handling)
- try:
- if submission.test.test_type == 'situational_judgment':
- opts = list(QuestionOption.objects.filter(question=answer.question))
- if opts:
- max_score = max(int(getattr(o, 'score_value', 0) or 0) for o in opts)
- sel_opt = next((o for o in opts if str(o.option_letter).strip().upper() == sel), None)
- is_correct = bool(sel_opt and int(getattr(sel_opt, 'score_value', 0) or 0) == max_score)
- else:
- is_correct = answer.question.check_answer(sel)
- else:
- is_correct = answer.question.check_answer(sel)
- except Exception:
- is_correct = answer.question.check_answer(sel)
-
- answer.is_correct = is_correct
- answer.points_awarded = self.config.DIFFICULTY_COEFFICIENTS[answer.question.difficulty_level] if is_correct else Decimal('0.0')
- answer.save(update_fields=['is_correct', 'points_awarded'])
-
- answer_results.append({
- 'answer': answer,
- 'question': answer.question,
- 'is_correct': is_correct,
- 'points_awarded': answer.points_awarded,
- 'difficulty': answer.question.difficulty_level
- })
- else:
- # No stored Answer rows: rebuild answers from stored answers_data, if any
- try:
- answers_data = submission.answers_data or {}
- except Exception:
- answers_data = {}
- answer_results = self._create_and_score_answers(submission, answers_data)
-
- # Compute comprehensive score
- score = self._calculate_comprehensive_score(submission, answer_results)
-
- # Update submission
- submission.scored_at = timezone.now()
- submission.scoring_version = self.config.SCORING_VERSION
- submission.save(update_fields=['scored_at', 'scoring_version'])
-
- logger.info(f"Score recalculated: {score.percentage_score}%")
- return score
+    """
+    Main scoring service for calculating test scores using difficulty coefficients.
+    This is the single source of truth for all scoring operations.
+    """
+
+    def __init__(self):
+        self.config = ScoringConfig()
+
+    @transaction.atomic
+    def score_test_submission(self, user, test: Test, answers_data: Dict[str, str],
+                              time_taken_seconds: int,
+                              question_ids: Optional[List[int]] = None) -> Tuple[TestSubmission, Score]:
+        """
+        Complete scoring workflow for a test submission.
+
+        Args:
+            user: User who submitted the test
+            test: Test instance
+            answers_data: Dict mapping question_id -> selected_answer (e.g., {'1': 'A', '2': 'B'})
+            time_taken_seconds: Total time taken for the test
+            question_ids: Questions drawn for the session (QuestionSampler); answers must
+                belong to them and every drawn question is scored, answered or not.
+                None scores the answered questions of the whole test.
+
+        Returns:
+            Tuple of (TestSubmission, Score) instances
+
+        Raises:
+            ValidationError: If answers_data is invalid
+            ValueError: If scoring calculation fails
+        """
+        user_identifier = user.username if user else "anonymous"
+        logger.info(f"Starting scoring for user {user_identifier} on test {test.title}")
+
+        # Validate inputs
+        self._validate_submission_data(test, answers_data, time_taken_seconds, question_ids)
+
+        # Create TestSubmission
+        submission = self._create_test_submission(user, test, answers_data, time_taken_seconds)
+
+        # Create Answer records and calculate scores
+        answer_results = self._create_and_score_answers(submission, answers_data, question_ids)
+
+        # Calculate comprehensive score
+        score = self._calculate_comprehensive_score(submission, answer_results)
+
+        # Mark submission as scored
+        submission.scored_at = timezone.now()
+        submission.scoring_version = self.config.SCORING_VERSION
+        submission.save()
+
+        logger.info(f"Scoring complete: {score.percentage_score}% ({score.correct_answers}/{score.total_questions})")
+
+        return submission, score
+
+    def _validate_submission_data(self, test: Test, answers_data: Dict[str, str],
+                                  time_taken_seconds: int, question_ids: Optional[List[int]] = None) -> None:
+        """Validate submission data before processing"""
+        if not answers_data:
+            raise ValidationError("No answers provided for submission")
+
+        if time_taken_seconds < 0:
+            raise ValidationError("Time taken cannot be negative")
+
+        if time_taken_seconds > (self.config.TEST_DURATION_MINUTES * 60 + 60): # Allow 1 minute grace
+            logger.warning(f"Submission time ({time_taken_seconds}s) exceeds test duration")
+
+        # Validate that all question IDs exist (and were drawn for the session)
+        if question_ids is not None:
+            valid_ids = set(str(question_id) for question_id in question_ids)
+        else:
+            valid_ids = set(str(question_id) for question_id in test.questions.values_list('id', flat=True))
+        provided_ids = set(answers_data.keys())
+
+        if not provided_ids.issubset(valid_ids):
+            invalid_ids = provided_ids - valid_ids
+            raise ValidationError(f"Invalid question IDs: {invalid_ids}")
+
+    def _create_test_submission(self, user, test: Test, answers_data: Dict[str, str],
+                                time_taken_seconds: int) -> TestSubmission:
+        """Create TestSubmission record"""
+
+        user_identifier = user.username if user else "anonymous"
+
+        # Check for existing submission (one per user per test)
+        existing_submission = TestSubmission.objects.filter(user=user, test=test).first()
+        if existing_submission:
+            logger.warning(f"Overwriting existing submission for user {user_identifier} on test {test.title}")
+            existing_submission.delete()
+
+        submission = TestSubmission.objects.create(
+            user=user,
+            test=test,
+            time_taken_seconds=time_taken_seconds,
+            answers_data=answers_data,
+            is_complete=True,
+            submitted_at=timezone.now()
+        )
+
+        logger.debug(f"Created TestSubmission {submission.id}")
+        return submission
+
+    def _create_and_score_answers(self, submission: TestSubmission,
+                                  answers_data: Dict[str, str],
+                                  question_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Create Answer records and calculate individual scores"""
+
+        answer_results = []
+
+        if question_ids is not None:
+            # Sampled session: score the whole drawn set, unanswered questions count as wrong
+            scored_question_ids = question_ids
+        else:
+            # Without a drawn set, only score questions that have answers provided
+            scored_question_ids = set(answers_data.keys())
+
+        questions = submission.test.questions.filter(id__in=scored_question_ids).order_by('order')
+
+        for question in questions:
+            question_id_str = str(question.id)
+            selected_answer = answers_data.get(question_id_str, '')
+            if isinstance(selected_answer, str):
+                selected_answer = selected_answer.strip().upper()
+
+            # Robust SJT handling: if QuestionOption exists, use highest-score option as correct
+            is_correct = False
+            if submission.test.test_type == 'situational_judgment':
+                try:
+                    opts = list(QuestionOption.objects.filter(question=question))
+                    if opts:
+                        max_score = max(int(getattr(o, 'score_value', 0) or 0) for o in opts)
+                        sel_opt = next((o for o in opts if str(o.option_letter).strip().upper() == selected_answer), None)
+                        is_correct = bool(sel_opt and int(getattr(sel_opt, 'score_value', 0) or 0) == max_score)
+                    else:
+                        # Fallback to standard check if no options in DB
+                        is_correct = question.check_answer(selected_answer)
+                except Exception:
+                    is_correct = question.check_answer(selected_answer)
+            else:
+                # Standard MCQ scoring
+                is_correct = question.check_answer(selected_answer)
+
+            points_awarded = self.config.DIFFICULTY_COEFFICIENTS[question.difficulty_level] if is_correct else Decimal('0.0')
+
+            # Create Answer record
+            answer = Answer.objects.create(
+                submission=submission,
+                question=question,
+                selected_answer=selected_answer,
+                is_correct=is_correct,
+                points_awarded=points_awarded,
+                time_taken_seconds=0, # Individual question timing not implemented yet
+                answered_at=timezone.now()
+            )
+
+            answer_results.append({
+                'answer': answer,
+                'question': question,
+                'is_correct': is_correct,
+                'points_awarded': points_awarded,
+                'difficulty': question.difficulty_level
+            })
+
+        logger.debug(f"Created {len(answer_results)} Answer records")
+        return answer_results
+
+    def _calculate_comprehensive_score(self, submission: TestSubmission,
+                                       answer_results: List[Dict[str, Any]]) -> Score:
+        """Calculate comprehensive score with detailed breakdown"""
+
+        # Overall calculations
+        total_questions = len(answer_results)
+        correct_answers = sum(1 for result in answer_results if result['is_correct'])
+        raw_score = sum(result['points_awarded'] for result in answer_results)
+
+        # Calculate maximum possible score for the questions actually answered
+        # Use standard difficulty-based scoring for all test types (including SJT)
+        max_possible_score = Decimal('0.0')
+        for result in answer_results:
+            difficulty = result['difficulty']
+            max_possible_score += self.config.DIFFICULTY_COEFFICIENTS[difficulty]
+
+        # Calculate percentage
+        if max_possible_score > 0:
+            percentage_score = (raw_score / max_possible_score * 100).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            )
+        else:
+            percentage_score = Decimal('0.00')
+
+        # Difficulty breakdown
+        difficulty_breakdown = self._calculate_difficulty_breakdown(answer_results)
+
+        # Performance metrics
+        time_metrics = self._calculate_time_metrics(submission, answer_results)
+
+        # Create Score record
+        score = Score.objects.create(
+            submission=submission,
+            raw_score=raw_score,
+            max_possible_score=max_possible_score,
+            percentage_score=percentage_score,
+            correct_answers=correct_answers,
+            total_questions=total_questions,
+
+            # Difficulty breakdown
+            easy_correct=difficulty_breakdown['easy']['correct'],
+            medium_correct=difficulty_breakdown['medium']['correct'],
+            hard_correct=difficulty_breakdown['hard']['correct'],
+            easy_score=difficulty_breakdown['easy']['score'],
+            medium_score=difficulty_breakdown['medium']['score'],
+            hard_score=difficulty_breakdown['hard']['score'],
+
+            # Performance metrics
+            average_time_per_question=time_metrics['average'],
+            fastest_question_time=time_metrics['fastest'],
+            slowest_question_time=time_metrics['slowest'],
+
+            # Metadata
+            scoring_algorithm="difficulty_weighted",
+            calculated_at=timezone.now(),
+            metadata={
+                'scoring_version': self.config.SCORING_VERSION,
+                'difficulty_coefficients': {k: float(v) for k, v in self.config.DIFFICULTY_COEFFICIENTS.items()},
+                'test_duration_minutes': self.config.TEST_DURATION_MINUTES,
+                'submission_time_seconds': submission.time_taken_seconds
+            }
+        )
+
+        logger.debug(f"Created Score {score.id}: {score.percentage_score}%")
+        return score
+
+    def _calculate_difficulty_breakdown(self, answer_results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Calculate breakdown by difficulty level"""
+
+        breakdown = {
+            'easy': {'correct': 0, 'total': 0, 'score': Decimal('0.0')},
+            'medium': {'correct': 0, 'total': 0, 'score': Decimal('0.0')},
+            'hard': {'correct': 0, 'total': 0, 'score': Decimal('0.0')}
+        }
+
+        for result in answer_results:
+            difficulty = result['difficulty']
+            breakdown[difficulty]['total'] += 1
+
+            if result['is_correct']:
+                breakdown[difficulty]['correct'] += 1
+                breakdown[difficulty]['score'] += result['points_awarded']
+
+        return breakdown
+
+    def _calculate_time_metrics(self, submission: TestSubmission,
+                                answer_results: List[Dict[str, Any]]) -> Dict[str, Decimal]:
+        """Calculate time-based performance metrics"""
+
+        total_time = submission.time_taken_seconds
+        total_questions = len(answer_results)
+
+        if total_questions > 0:
+            average_time = Decimal(str(total_time / total_questions)).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            )
+        else:
+            average_time = Decimal('0.00')
+
+        # For now, use average for fastest/slowest since individual timing isn't implemented
+        # In future versions, these could be calculated from individual Answer.time_taken_seconds
+        return {
+            'average': average_time,
+            'fastest': max(1, int(average_time * Decimal('0.5'))), # Estimate: 50% of average
+            'slowest': int(average_time * Decimal('2.0')) # Estimate: 200% of average
+        }
+
+    def get_score_summary(self, score: Score) -> Dict[str, Any]:
+        """Get a formatted summary of the score results"""
+
+        return {
+            'overall': {
+                'percentage': float(score.percentage_score),
+                'grade_letter': score.grade_letter,
+                'passed': score.passed,
+                'raw_score': float(score.raw_score),
+                'max_possible_score': float(score.max_possible_score),
+                'correct_answers': score.correct_answers,
+                'total_questions': score.total_questions
+            },
+            'difficulty_breakdown': {
+                'easy': {
+                    'correct': score.easy_correct,
+                    'score': float(score.easy_score),
+                    'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['easy'])
+                },
+                'medium': {
+                    'correct': score.medium_correct,
+                    'score': float(score.medium_score),
+                    'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['medium'])
+                },
+                'hard': {
+                    'correct': score.hard_correct,
+                    'score': float(score.hard_score),
+                    'coefficient': float(self.config.DIFFICULTY_COEFFICIENTS['hard'])
+                }
+            },
+            'performance': {
+                'average_time_per_question': float(score.average_time_per_question),
+                'fastest_question_time': score.fastest_question_time,
+                'slowest_question_time': score.slowest_question_time,
+                'total_time_taken': score.submission.time_taken_seconds
+            },
+            'metadata': {
+                'scoring_algorithm': score.scoring_algorithm,
+                'calculated_at': score.calculated_at.isoformat(),
+                'test_title': score.submission.test.title,
+                'test_type': score.submission.test.test_type
+            }
+        }
+
+    def recalculate_score(self, submission: TestSubmission) -> Score:
+        """Recalculate score for an existing submission.
+        Re-evaluates correctness from selected answers (fixes old SJT/MCQ submissions).
+        """
+        logger.info(f"Recalculating score for submission {submission.id}")
+
+        # Delete existing score if it exists
+        if hasattr(submission, 'score'):
+            submission.score.delete()
+
+        answers = submission.answers.all()
+        answer_results = []
+
+        if answers.exists():
+            for answer in answers:
+                sel = str(answer.selected_answer or '').strip().upper()
+
+                # Recompute correctness fresh (with robust SJT handling)
+                try:
+                    if submission.test.test_type == 'situational_judgment':
+                        opts = list(QuestionOption.objects.filter(question=answer.question))
+                        if opts:
+                            max_score = max(int(getattr(o, 'score_value', 0) or 0) for o in opts)
+                            sel_opt = next((o for o in opts if str(o.option_letter).strip().upper() == sel), None)
+                            is_correct = bool(sel_opt and int(getattr(sel_opt, 'score_value', 0) or 0) == max_score)
+                        else:
+                            is_correct = answer.question.check_answer(sel)
+                    else:
+                        is_correct = answer.question.check_answer(sel)
+                except Exception:
+                    is_correct = answer.question.check_answer(sel)
+
+                answer.is_correct = is_correct
+                answer.points_awarded = self.config.DIFFICULTY_COEFFICIENTS[answer.question.difficulty_level] if is_correct else Decimal('0.0')
+                answer.save(update_fields=['is_correct', 'points_awarded'])
+
+                answer_results.append({
+                    'answer': answer,
+                    'question': answer.question,
+                    'is_correct': is_correct,
+                    'points_awarded': answer.points_awarded,
+                    'difficulty': answer.question.difficulty_level
+                })
+        else:
+            # No stored Answer rows: rebuild answers from stored answers_data, if any
+            try:
+                answers_data = submission.answers_data or {}
+            except Exception:
+                answers_data = {}
+            answer_results = self._create_and_score_answers(submission, answers_data)
+
+        # Compute comprehensive score
+        score = self._calculate_comprehensive_score(submission, answer_results)
+
+        # Update submission
+        submission.scored_at = timezone.now()
+        submission.scoring_version = self.config.SCORING_VERSION
+        submission.save(update_fields=['scored_at', 'scoring_version'])
+
+        logger.info(f"Score recalculated: {score.percentage_score}%")
+        return score
 
 class ScoringUtils:
- """Utility functions for scoring operations"""
-
- @staticmethod
- def get_test_max_score(test: Test) -> Decimal:
- """Calculate maximum possible score for a test"""
- return test.calculate_max_score()
-
- @staticmethod
- def validate_difficulty_distribution(test: Test) -> Dict[str, Any]:
- """Validate that a test has a reasonable difficulty distribution"""
-
- questions = test.questions.all()
- total_questions = questions.count()
-
- if total_questions == 0:
- return {'valid': False, 'error': 'Test has no questions'}
-
- difficulty_counts = {
- 'easy': questions.filter(difficulty_level='easy').count(),
- 'medium': questions.filter(difficulty_level='medium').count(),
- 'hard': questions.filter(difficulty_level='hard').count()
- }
-
- # Check for reasonable distribution (at least 20% each, max 60% any single difficulty)
- percentages = {k: (v / total_questions * 100) for k, v in difficulty_counts.items()}
-
- issues = []
- for difficulty, percentage in percentages.items():
- if percentage < 20:
- issues.append(f"Too few {difficulty} questions ({percentage:.1f}%)")
- elif percentage > 60:
- issues.append(f"Too many {difficulty} questions ({percentage:.1f}%)")
-
- return {
- 'valid': len(issues) == 0,
- 'issues': issues,
- 'distribution': difficulty_counts,
- 'percentages': percentages,
- 'total_questions': total_questions,
- 'max_possible_score': float(ScoringUtils.get_test_max_score(test))
- }
+    """Utility functions for scoring operations"""
+
+    @staticmethod
+    def get_test_max_score(test: Test) -> Decimal:
+        """Calculate maximum possible score for a test"""
+        return test.calculate_max_score()
+
+    @staticmethod
+    def validate_difficulty_distribution(test: Test) -> Dict[str, Any]:
+        """Validate that a test has a reasonable difficulty distribution"""
+
+        questions = test.questions.all()
+        total_questions = questions.count()
+
+        if total_questions == 0:
+            return {'valid': False, 'error': 'Test has no questions'}
+
+        difficulty_counts = {
+            'easy': questions.filter(difficulty_level='easy').count(),
+            'medium': questions.filter(difficulty_level='medium').count(),
+            'hard': questions.filter(difficulty_level='hard').count()
+        }
+
+        # Check for reasonable distribution (at least 20% each, max 60% any single difficulty)
+        percentages = {k: (v / total_questions * 100) for k, v in difficulty_counts.items()}
+
+        issues = []
+        for difficulty, percentage in percentages.items():
+            if percentage < 20:
+                issues.append(f"Too few {difficulty} questions ({percentage:.1f}%)")
+            elif percentage > 60:
+                issues.append(f"Too many {difficulty} questions ({percentage:.1f}%)")
+
+        return {
+            'valid': len(issues) == 0,
+            'issues': issues,
+            'distribution': difficulty_counts,
+            'percentages': percentages,
+            'total_questions': total_questions,
+            'max_possible_score': float(ScoringUtils.get_test_max_score(test))
+        }
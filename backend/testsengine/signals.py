@@ -0,0 +1,20 @@
+"""
+Invalidate the pre-serialized catalogue when test content changes
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from auth_api.invalidation import schedule_namespace_invalidation
+
+from .models import Question, Test
+from .services.catalogue_cache import CATALOGUE_NAMESPACE
+
+
+@receiver(post_save, sender=Test)
+@receiver(post_delete, sender=Test)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_catalogue(sender, instance, **kwargs):
+    """Bump the catalogue content version once the transaction commits"""
+    schedule_namespace_invalidation(CATALOGUE_NAMESPACE, using=kwargs.get('using'))
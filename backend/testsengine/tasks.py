@@ -0,0 +1,63 @@
+"""
+Celery tasks for the tests engine
+Handles long-running imports in the background
+"""
+
+import logging
+from typing import Optional
+
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from .models import Test
+from .question_importer import (
+    DEFAULT_BATCH_SIZE, ImportProgress, StreamingQuestionImporter, publish_import_progress
+)
+from .services.execution_queue import JobRunning, run_job
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def import_questions_file(self, name: str, test_id: int, job_id: str,
+                          batch_size: Optional[int] = None,
+                          fmt: str = 'json', delete_after: bool = True):
+    """
+    Stream a JSON/JSONL question file from default_storage into the database.
+
+    Progress is published under the job id; see question_importer.get_import_progress.
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    progress = ImportProgress(job_id=job_id, test_id=test_id)
+    try:
+        test = Test.objects.filter(pk=test_id).first()
+        if test is None:
+            progress.status = 'failed'
+            progress.errors.append({'record': None, 'error': f'Test {test_id} not found'})
+            publish_import_progress(progress)
+            return progress.to_dict()
+        importer = StreamingQuestionImporter(test, batch_size=batch_size, progress=progress)
+        result = importer.import_stored_file(name, fmt)
+        return result.to_dict()
+    finally:
+        if delete_after:
+            try:
+                default_storage.delete(name)
+            except Exception:
+                logger.warning(f"Could not remove import file {name}")
+
+
+@shared_task(bind=True, max_retries=3)
+def execute_code_job(self, job_id: str):
+    """
+    Run a queued code execution job.
+
+    Routed to the dedicated code_execution queue so slow submissions never
+    share workers with other background tasks. A redelivered job that is
+    still leased is checked again once its lease expires.
+    """
+    try:
+        job = run_job(job_id)
+    except JobRunning as e:
+        raise self.retry(countdown=e.retry_after)
+    return job['status'] if job else None
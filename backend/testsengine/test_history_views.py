@@ -5,28 +5,65 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, Max, Prefetch, Q, Sum
+
+from careerquest.db_router import replica_reads
+
+from .pagination import TestSessionKeysetPagination
+from .services.query_optimizer import monitor_query
+from .services.question_sampler import QuestionSampler, session_questions
 
 try:
-    from .models import TestSession, Test
-    from .serializers import TestSessionHistorySerializer, TestSessionCreateSerializer
+    from .models import TestSession, Test, TestAnswer
+    from .test_history_serializers import (
+        SessionQuestionSerializer, TestSessionCreateSerializer, TestSessionHistorySerializer
+    )
 except ImportError as e:
     # Create minimal fallback classes if models don't exist
     class TestSession:
         objects = None
     class Test:
         objects = None
+    TestAnswer = None
     
     class TestSessionHistorySerializer:
         pass
     class TestSessionCreateSerializer:
         pass
+    class SessionQuestionSerializer:
+        pass
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Columns read by TestSessionHistorySerializer
+HISTORY_SESSION_FIELDS = (
+    'id', 'status', 'start_time', 'end_time', 'score', 'time_spent',
+    'user__username', 'test__title', 'test__test_type', 'test__passing_score',
+)
+HISTORY_ANSWER_FIELDS = (
+    'id', 'session_id', 'selected_answer', 'is_correct', 'time_taken', 'answered_at',
+    'question__question_text', 'question__order', 'question__correct_answer', 'question__difficulty_level',
+)
+
+
+def history_queryset(user):
+    """A user's sessions, projected to what the history serializer reads (two queries per page)"""
+    return (
+        TestSession.objects.filter(user=user)
+        .select_related('test', 'user')
+        .only(*HISTORY_SESSION_FIELDS)
+        .prefetch_related(Prefetch(
+            'test_answers',
+            queryset=TestAnswer.objects.select_related('question').only(*HISTORY_ANSWER_FIELDS)
+        ))
+    )
+
+
 class TestSessionListCreateView(generics.ListCreateAPIView):
-    """List and create test sessions for authenticated user"""
+    """List (newest first, keyset-paginated) and create test sessions for authenticated user"""
     permission_classes = [IsAuthenticated]
+    pagination_class = TestSessionKeysetPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -37,13 +74,17 @@ class TestSessionListCreateView(generics.ListCreateAPIView):
         """Get test sessions for current user"""
         try:
             if TestSession.objects:
-                return TestSession.objects.filter(
-                    user=self.request.user
-                ).order_by('-created_at')
+                if self.request.method == 'POST':
+                    return TestSession.objects.filter(user=self.request.user)
+                return history_queryset(self.request.user)
             return TestSession.objects.none()
         except:
             return TestSession.objects.none()
 
+    @replica_reads
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new test session for the authenticated user"""
         try:
@@ -59,18 +100,23 @@ class TestSessionDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         try:
             if TestSession.objects:
-                return TestSession.objects.filter(user=self.request.user)
+                return history_queryset(self.request.user)
             return TestSession.objects.none()
         except:
             return TestSession.objects.none()
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def get_test_history(request):
-    """Get user's test history"""
+    """Get user's test history, newest first; pass ?cursor=<next_cursor> for the next page"""
     try:
+        paginator = TestSessionKeysetPagination()
+        sessions = paginator.paginate_queryset(history_queryset(request.user), request)
         return Response({
-            'test_history': [],
+            'test_history': TestSessionHistorySerializer(sessions, many=True).data,
+            'next': paginator.get_next_link(),
+            'next_cursor': paginator.next_cursor,
             'message': 'Test history retrieved successfully'
         })
     except Exception as e:
@@ -80,17 +126,37 @@ def get_test_history(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+@replica_reads
+@monitor_query('history_summary')
+def get_history_summary(user):
+    """Test history statistics of a user in a single aggregate query"""
+    completed = Q(status='completed')
+    stats = TestSession.objects.filter(user=user).aggregate(
+        total_sessions=Count('id'),
+        completed_sessions=Count('id', filter=completed),
+        average_score=Avg('score', filter=completed),
+        best_score=Max('score', filter=completed),
+        total_time_spent=Sum('time_spent'),
+        last_test_date=Max('start_time'),
+    )
+    return {
+        'total_sessions': stats['total_sessions'],
+        'completed_sessions': stats['completed_sessions'],
+        'average_score': round(stats['average_score'], 2) if stats['average_score'] is not None else 0,
+        'best_score': stats['best_score'] or 0,
+        # time_spent is stored in seconds
+        'total_time_spent': (stats['total_time_spent'] or 0) // 60,
+        'last_test_date': stats['last_test_date'],
+    }
+
+
 @api_view(['GET'])
-# @permission_classes([IsAuthenticated])  # Temporarily disabled for testing
+@permission_classes([IsAuthenticated])
 def get_test_history_summary(request):
     """Get user's test history summary"""
     try:
         return Response({
-            'total_tests': 0,
-            'avg_score': 0,
-            'last_test_date': None,
-            'test_categories': [],
-            'recent_tests': [],
+            **get_history_summary(request.user),
             'message': 'Test history summary retrieved successfully'
         })
     except Exception as e:
@@ -120,16 +186,21 @@ def get_session_details(request, session_id):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def start_test_session(request, test_id):
-    """Start a new test session"""
+    """Start a new test session with a server-side draw of the test's question pool"""
+    test = get_object_or_404(Test, id=test_id, is_active=True)
     try:
+        session = QuestionSampler().start_session(request.user, test)
         return Response({
             'test_id': test_id,
-            'session_id': f"session_{test_id}_user_{request.user.id}",
+            'session_id': session.id,
+            'attempt_number': session.attempt_number,
+            'question_ids': session.question_ids,
+            'questions': SessionQuestionSerializer(session_questions(session), many=True).data,
             'message': 'Test session started successfully'
-        })
+        }, status=status.HTTP_201_CREATED)
     except Exception as e:
         logger.error(f"Error starting test session: {e}")
         return Response(
             {'error': 'Failed to start test session'},
             status=status.HTTP_400_BAD_REQUEST
-        )
\ No newline at end of file
+        )
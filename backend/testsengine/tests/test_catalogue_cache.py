@@ -0,0 +1,142 @@
+"""
+Tests for the pre-serialized catalogue cache and its HTTP validators
+"""
+
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from auth_api import invalidation
+from auth_api.cache_utils import CacheManager
+
+from ..models import Question, Test
+from ..services import catalogue_cache
+from ..services.catalogue_cache import bump_content_version, combine, get_payload, get_payloads, payload_response
+
+LOCMEM_CACHES = {
+    name: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'catalogue-{name}'}
+    for name in ('default', 'dashboard', 'achievements')
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CACHE_L1={'ENABLED': False})
+class CatalogueCacheTestCase(SimpleTestCase):
+    """Payloads are built once per content version and revalidated with ETags"""
+
+    def setUp(self):
+        self.manager = CacheManager()
+        self.manager.default_cache.clear()
+        patcher = mock.patch.object(catalogue_cache, 'cache_manager', self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.builds = 0
+        self.factory = RequestFactory()
+
+    def build(self):
+        self.builds += 1
+        return {'tests': [{'id': 1, 'title': 'Verbal'}]}
+
+    def test_built_once_per_content_version(self):
+        first = get_payload('list', self.build)
+        second = get_payload('list', self.build)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(first.etag, second.etag)
+        self.assertEqual(second.body, b'{"tests":[{"id":1,"title":"Verbal"}]}')
+
+        bump_content_version()
+        get_payload('list', self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_not_modified(self):
+        payload = get_payload('list', self.build)
+
+        response = payload_response(self.factory.get('/'), payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], payload.etag)
+        self.assertIn('Last-Modified', response)
+
+        response = payload_response(self.factory.get('/', HTTP_IF_NONE_MATCH=payload.etag), payload)
+        self.assertEqual(response.status_code, 304)
+
+        response = payload_response(
+            self.factory.get('/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']), payload
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_bulk_builds_only_missing_entries(self):
+        requested = []
+
+        def build_missing(names):
+            requested.append(names)
+            return {name: {'id': int(name)} for name in names if name != '9'}
+
+        get_payloads(['1'], build_missing)
+        payloads = get_payloads(['2', '1', '9'], build_missing)
+
+        self.assertEqual(requested, [['1'], ['2', '9']])
+        self.assertEqual(list(payloads), ['2', '1'])
+        self.assertEqual(combine(payloads).body, b'{"2":{"id":2},"1":{"id":1}}')
+        self.assertNotEqual(combine(payloads).etag, combine({'1': payloads['1']}).etag)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CACHE_L1={'ENABLED': False})
+class CatalogueViewTestCase(TestCase):
+    """The catalogue endpoints serve cached payloads and revalidate them"""
+
+    def setUp(self):
+        manager = CacheManager()
+        manager.default_cache.clear()
+        for module in (catalogue_cache, invalidation):
+            patcher = mock.patch.object(module, 'cache_manager', manager)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.test = Test.objects.create(
+            title='Catalogue Test',
+            test_type='verbal_reasoning',
+            description='Served from the catalogue cache',
+            duration_minutes=20,
+            total_questions=1,
+            passing_score=70
+        )
+        self.question = Question.objects.create(
+            test=self.test, question_type='multiple_choice', question_text='Pick A',
+            options=['A', 'B'], correct_answer='A', order=1
+        )
+
+    def assert_revalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        return first
+
+    def test_list_revalidates(self):
+        response = self.assert_revalidates(reverse('test-list'))
+        tests = response.json()['tests']
+        self.assertEqual([test['id'] for test in tests], [self.test.id])
+        self.assertEqual(tests[0]['duration_minutes'], 20)
+        self.assertNotIn('error', response.json())
+
+    def test_metadata_revalidates(self):
+        response = self.assert_revalidates(reverse('test-metadata') + f'?ids={self.test.id},999')
+        self.assertEqual(list(response.json()), [str(self.test.id)])
+
+    def test_question_edit_changes_etag(self):
+        url = reverse('test-questions', kwargs={'test_id': self.test.id})
+        first = self.assert_revalidates(url)
+        self.assertEqual(first.json()[0]['question_text'], 'Pick A')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.question_text = 'Pick B'
+            self.question.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.json()[0]['question_text'], 'Pick B')
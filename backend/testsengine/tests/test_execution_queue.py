@@ -0,0 +1,159 @@
+"""
+Tests for the asynchronous code execution queue
+"""
+
+import time
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .. import code_execution_views
+from ..services import execution_queue
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+CASES = [{'input': 'n = 1', 'expected_output': '1'}, {'input': 'n = 2', 'expected_output': '1'}]
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CODE_EXECUTION_QUEUE={'MAX_ACTIVE_PER_USER': 1, 'MAX_ACTIVE_GLOBAL': 2})
+@mock.patch.object(execution_queue, '_dispatch')
+class ExecutionQueueTestCase(SimpleTestCase):
+    """Admission control and job bookkeeping"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_submit_returns_queued_job(self, dispatch):
+        job = execution_queue.submit_job(1, 'def fibonacci(n): return n', 'python', CASES)
+
+        dispatch.assert_called_once_with(job['job_id'])
+        self.assertEqual(job['status'], execution_queue.JOB_QUEUED)
+        self.assertEqual(job['total_cases'], 2)
+        self.assertNotIn('payload', job)
+
+    def test_per_user_and_global_limits(self, dispatch):
+        execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+        with self.assertRaises(execution_queue.QueueFull):
+            execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+
+        execution_queue.submit_job(2, 'x = 1', 'python', CASES)
+        with self.assertRaises(execution_queue.QueueFull):
+            execution_queue.submit_job(3, 'x = 1', 'python', CASES)
+
+    def test_slot_ttl_set_only_when_counter_is_created(self, dispatch):
+        with mock.patch.object(execution_queue, 'cache', wraps=cache) as spy:
+            job = execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+            stored = cache.get(execution_queue._job_key(job['job_id']))
+            execution_queue._finish_job(stored, execution_queue.JOB_COMPLETED)
+            execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+        spy.touch.assert_not_called()
+
+    def test_finishing_a_job_frees_its_slots(self, dispatch):
+        job = execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+        stored = cache.get(execution_queue._job_key(job['job_id']))
+        execution_queue._finish_job(stored, execution_queue.JOB_COMPLETED, result={'status': 'accepted'})
+
+        self.assertEqual(execution_queue.get_job(job['job_id'])['status'], execution_queue.JOB_COMPLETED)
+        execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+
+    def test_results_streamed_per_case(self, dispatch):
+        job = execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+        cache.set(execution_queue._case_key(job['job_id'], 1), {'passed': True})
+
+        results = execution_queue.get_job(job['job_id'])['results']
+        self.assertEqual(results, [{'index': 1, 'passed': True}])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CODE_EXECUTION_QUEUE={'MAX_ACTIVE_PER_USER': 1, 'RUNNING_LEASE': 60})
+@mock.patch.object(execution_queue, '_dispatch')
+class RedeliveredJobTestCase(SimpleTestCase):
+    """Late-acked tasks redelivered after a worker died"""
+
+    def setUp(self):
+        cache.clear()
+
+    def start(self, started_at):
+        job = execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+        stored = cache.get(execution_queue._job_key(job['job_id']))
+        stored.update({'status': execution_queue.JOB_RUNNING, 'started_at': started_at})
+        cache.set(execution_queue._job_key(job['job_id']), stored)
+        return stored
+
+    def test_leased_job_is_left_to_its_worker(self, dispatch):
+        job = self.start(time.time() - 10)
+
+        with self.assertRaises(execution_queue.JobRunning) as raised:
+            execution_queue.run_job(job['job_id'])
+
+        self.assertEqual(raised.exception.retry_after, 50)
+        self.assertEqual(execution_queue.get_job(job['job_id'])['status'], execution_queue.JOB_RUNNING)
+
+    def test_expired_lease_fails_the_job_and_frees_its_slots(self, dispatch):
+        job = self.start(time.time() - 61)
+
+        with self.assertLogs(execution_queue.logger, 'WARNING'):
+            failed = execution_queue.run_job(job['job_id'])
+
+        self.assertEqual(failed['status'], execution_queue.JOB_FAILED)
+        self.assertEqual(cache.get(execution_queue._active_key(1)), 0)
+        self.assertEqual(cache.get(execution_queue._active_key()), 0)
+        self.assertIsNone(execution_queue.run_job(job['job_id']))
+
+    def test_late_worker_does_not_free_the_slots_twice(self, dispatch):
+        job = self.start(time.time() - 61)
+        with self.assertLogs(execution_queue.logger, 'WARNING'):
+            execution_queue.run_job(job['job_id'])
+        execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+
+        with self.assertLogs(execution_queue.logger, 'WARNING'):
+            execution_queue._finish_job(job, execution_queue.JOB_COMPLETED, result={'status': 'accepted'})
+
+        self.assertEqual(execution_queue.get_job(job['job_id'])['status'], execution_queue.JOB_FAILED)
+        self.assertEqual(cache.get(execution_queue._active_key(1)), 1)
+
+    def test_task_retries_once_the_lease_expires(self, dispatch):
+        from ..tasks import execute_code_job
+
+        job = self.start(time.time() - 30)
+        with mock.patch.object(execute_code_job, 'retry', side_effect=Retry) as retry:
+            with self.assertRaises(Retry):
+                execute_code_job(job['job_id'])
+        retry.assert_called_once_with(countdown=30)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExecutionDispatchTestCase(SimpleTestCase):
+    """Jobs only run on the Celery queue"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unreachable_broker_fails_the_job_and_frees_its_slots(self):
+        with mock.patch('testsengine.tasks.execute_code_job.apply_async', side_effect=OSError('no broker')):
+            with self.assertRaises(OSError):
+                execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+
+        self.assertEqual(cache.get(execution_queue._active_key(1)), 0)
+        self.assertEqual(cache.get(execution_queue._active_key()), 0)
+
+    @mock.patch.object(execution_queue, '_dispatch')
+    def test_poll_returns_retry_after_until_finished(self, dispatch):
+        user = mock.Mock(id=1, is_authenticated=True)
+        job = execution_queue.submit_job(1, 'x = 1', 'python', CASES)
+
+        def poll():
+            request = APIRequestFactory().get('/')
+            force_authenticate(request, user=user)
+            return code_execution_views.get_code_execution(request, job['job_id'])
+
+        response = poll()
+        self.assertEqual(response['Retry-After'], str(code_execution_views.POLL_RETRY_AFTER))
+        self.assertEqual(response.data['retry_after'], code_execution_views.POLL_RETRY_AFTER)
+
+        stored = cache.get(execution_queue._job_key(job['job_id']))
+        execution_queue._finish_job(stored, execution_queue.JOB_COMPLETED, result={'status': 'accepted'})
+        response = poll()
+        self.assertFalse(response.has_header('Retry-After'))
+        self.assertEqual(response.data['status'], execution_queue.JOB_COMPLETED)
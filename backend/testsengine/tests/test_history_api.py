@@ -0,0 +1,84 @@
+"""
+Tests for the keyset-paginated test history API
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Test, TestSession
+
+
+class TestHistoryAPITestCase(TestCase):
+    """History pages are stable, bounded in queries, and the summary is one aggregate"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='historyuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.test = Test.objects.create(
+            title='History Test',
+            test_type='verbal_reasoning',
+            description='Test history pagination',
+            duration_minutes=20,
+            total_questions=10,
+            passing_score=70
+        )
+
+        now = timezone.now()
+        self.sessions = []
+        for attempt in range(1, 8):
+            session = TestSession.objects.create(
+                user=self.user, test=self.test, attempt_number=attempt,
+                status='completed', score=50 + attempt * 5, time_spent=600
+            )
+            # Pairs of sessions share a start_time so the id tie-breaker is exercised
+            TestSession.objects.filter(pk=session.pk).update(start_time=now - timedelta(hours=attempt // 2))
+            self.sessions.append(session)
+
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        TestSession.objects.create(user=other, test=self.test, status='completed', score=100)
+
+    def expected_order(self):
+        return list(
+            TestSession.objects.filter(user=self.user).order_by('-start_time', '-id').values_list('id', flat=True)
+        )
+
+    def test_pages_cover_history_once_in_order(self):
+        seen = []
+        url = reverse('test-session-list') + '?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, self.expected_order())
+
+    def test_query_count_is_independent_of_page_depth(self):
+        first = self.client.get(reverse('test-session-list') + '?page_size=2')
+        cursor = first.data['next_cursor']
+
+        # Sessions joined to test and user, then answers joined to questions
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('test-session-list') + f'?page_size=2&cursor={cursor}')
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected_order()[2:4])
+        self.assertEqual(response.data['results'][0]['test_title'], 'History Test')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('test-session-list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_summary_is_a_single_aggregate(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('test-history-summary'))
+
+        self.assertEqual(response.data['total_sessions'], 7)
+        self.assertEqual(response.data['completed_sessions'], 7)
+        self.assertEqual(response.data['average_score'], 70.0)
+        self.assertEqual(response.data['best_score'], 85)
+        self.assertEqual(response.data['total_time_spent'], 70)
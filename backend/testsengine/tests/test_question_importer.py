@@ -0,0 +1,249 @@
+"""
+Tests for the streaming question importer and its background task
+"""
+
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from auth_api import invalidation
+from auth_api.cache_utils import CacheManager
+
+from ..models import Question, Test
+from ..question_importer import (
+    IMPORT_STORAGE_DIR, MalformedRecord, StreamingQuestionImporter, get_import_progress,
+    iter_json_records, iter_jsonl_records, iter_stored_records, new_import_job, store_import_file
+)
+from ..services import catalogue_cache
+from ..tasks import import_questions_file
+
+LOCMEM_CACHES = {
+    name: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'importer-{name}'}
+    for name in ('default', 'dashboard', 'achievements')
+}
+
+
+def logical_record(question_id, answer='A', difficulty=2, order=None):
+    record = {
+        'id': question_id,
+        'question': f'Question {question_id}',
+        'correct_answer': answer,
+        'difficulty': difficulty,
+        'options': ['A', 'B', 'C', 'D'],
+    }
+    if order is not None:
+        record['order'] = order
+    return record
+
+
+def jsonl(*lines):
+    return ''.join(line + '\n' for line in lines).encode('utf-8')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CACHE_L1={'ENABLED': False})
+class QuestionImporterTestCase(TestCase):
+    """Parsing, chunked upserts, skipped records and job progress"""
+
+    def setUp(self):
+        manager = CacheManager()
+        manager.default_cache.clear()
+        for module in (catalogue_cache, invalidation):
+            patcher = mock.patch.object(module, 'cache_manager', manager)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.test = Test.objects.create(
+            title='Logical Import', test_type='logical_reasoning', description='Imported questions',
+            duration_minutes=20, total_questions=5, passing_score=70
+        )
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.storage = FileSystemStorage(location=self.media_root)
+
+    def test_jsonl_parser_streams_records_and_flags_bad_lines(self):
+        stream = io.BytesIO(jsonl(
+            json.dumps(logical_record('q1')),
+            '',
+            '{"id": "q2", broken',
+            json.dumps(logical_record('q3')),
+        ))
+
+        records = list(iter_jsonl_records(stream))
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['id'], 'q1')
+        self.assertIsInstance(records[1], MalformedRecord)
+        self.assertEqual(records[1].line_number, 3)
+        self.assertEqual(records[2]['id'], 'q3')
+
+    def test_json_parser_accepts_sections_and_lists(self):
+        sections = {'sections': [{'questions': [logical_record('q1')]}, {'questions': [logical_record('q2')]}]}
+        for document in (sections, [logical_record('q1'), logical_record('q2')]):
+            stream = io.BytesIO(json.dumps(document).encode('utf-8'))
+            ids = [record['id'] for record in iter_json_records(stream)]
+            self.assertEqual(ids, ['q1', 'q2'])
+
+    def test_records_are_upserted_in_batches(self):
+        existing = Question.objects.create(
+            test=self.test, question_type='logical_deduction', question_text='Old text',
+            options=['A', 'B'], correct_answer='D', order=1
+        )
+        importer = StreamingQuestionImporter(self.test, batch_size=2)
+        records = [logical_record(f'q{i}', difficulty=i) for i in range(1, 6)]
+
+        # One bulk upsert per batch of 2, plus the last partial batch
+        with self.assertNumQueries(3):
+            progress = importer.import_records(records)
+
+        self.assertEqual(progress.status, 'completed')
+        self.assertEqual(progress.imported, 5)
+        questions = list(Question.objects.filter(test=self.test).order_by('order'))
+        self.assertEqual([question.order for question in questions], [1, 2, 3, 4, 5])
+        self.assertEqual(questions[0].pk, existing.pk)
+        self.assertEqual(questions[0].question_text, 'Question q1')
+        self.assertEqual(questions[0].correct_answer, 'A')
+        self.assertEqual(
+            [(question.difficulty_level, question.complexity_score) for question in questions],
+            [('easy', 1), ('easy', 2), ('medium', 3), ('hard', 4), ('hard', 5)]
+        )
+        self.assertTrue(all(question.question_type == 'logical_deduction' for question in questions))
+
+    def test_invalid_records_are_skipped_and_reported(self):
+        importer = StreamingQuestionImporter(self.test, batch_size=10)
+        records = [
+            logical_record('q1'),
+            logical_record('q2', difficulty=9),
+            {'id': 'q3', 'question': 'No answer'},
+            logical_record('q4', answer=''),
+            logical_record('q5'),
+            logical_record('q6', answer='A much too long answer'),
+            logical_record('q7', order=0),
+        ]
+
+        progress = importer.import_records(records)
+
+        self.assertEqual(progress.status, 'completed')
+        self.assertEqual((progress.processed, progress.imported, progress.skipped), (7, 2, 5))
+        self.assertEqual([error['record'] for error in progress.errors], [2, 3, 4, 6, 7])
+        self.assertEqual(
+            list(Question.objects.filter(test=self.test).values_list('order', flat=True)), [1, 5]
+        )
+
+    def test_generic_records_keep_their_question_type(self):
+        verbal = Test.objects.create(
+            title='Verbal Import', test_type='verbal_reasoning', description='Imported questions',
+            duration_minutes=20, total_questions=2, passing_score=70
+        )
+        importer = StreamingQuestionImporter(verbal, collect_orders=True)
+
+        progress = importer.import_records([
+            {'question_text': 'Read it', 'question_type': 'reading_comprehension', 'passage': 'Text',
+             'correctAnswer': 'B', 'options': ['A', 'B'], 'order': 3},
+            {'question_text': 'Unknown', 'question_type': 'essay', 'correct_answer': 'A', 'options': []},
+        ])
+
+        self.assertEqual((progress.imported, progress.skipped), (1, 1))
+        self.assertEqual(importer.imported_orders, [3])
+        question = Question.objects.get(test=verbal)
+        self.assertEqual((question.question_type, question.passage, question.correct_answer),
+                         ('reading_comprehension', 'Text', 'B'))
+
+    def test_import_invalidates_the_catalogue(self):
+        version = catalogue_cache.content_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StreamingQuestionImporter(self.test).import_records([logical_record('q1')])
+
+        self.assertNotEqual(catalogue_cache.content_version(), version)
+
+    def test_malformed_jsonl_line_does_not_abort_the_import(self):
+        name = store_import_file(
+            jsonl(json.dumps(logical_record('q1')), 'not json', json.dumps(logical_record('q2'))),
+            'jsonl', storage=self.storage
+        )
+        importer = StreamingQuestionImporter(self.test)
+
+        progress = importer.import_stored_file(name, 'jsonl', storage=self.storage)
+
+        self.assertEqual(progress.status, 'completed')
+        self.assertEqual((progress.imported, progress.skipped), (2, 1))
+        self.assertIn('line 2', progress.errors[0]['error'])
+        self.assertEqual(
+            list(Question.objects.filter(test=self.test).values_list('order', flat=True)), [1, 3]
+        )
+
+    def test_background_job_reports_status_and_removes_the_file(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            name = store_import_file(
+                jsonl(json.dumps(logical_record('q1')), json.dumps(logical_record('q2', difficulty=0))),
+                'jsonl'
+            )
+            job = new_import_job(self.test.id)
+            self.assertEqual(get_import_progress(job.job_id)['status'], 'pending')
+
+            import_questions_file(name=name, test_id=self.test.id, job_id=job.job_id, fmt='jsonl')
+
+            status = get_import_progress(job.job_id)
+            self.assertEqual(status['status'], 'completed')
+            self.assertEqual(status['test_id'], self.test.id)
+            self.assertEqual((status['imported'], status['skipped']), (1, 1))
+            self.assertIsNotNone(status['finished_at'])
+            self.assertFalse(default_storage.exists(name))
+
+    def test_missing_file_marks_the_job_failed(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            job = new_import_job(self.test.id)
+            with self.assertRaises(FileNotFoundError):
+                import_questions_file(
+                    name='question_imports/missing.jsonl', test_id=self.test.id, job_id=job.job_id, fmt='jsonl'
+                )
+
+        self.assertEqual(get_import_progress(job.job_id)['status'], 'failed')
+
+    def test_missing_test_marks_the_job_failed(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            name = store_import_file(jsonl(json.dumps(logical_record('q1'))), 'jsonl')
+            job = new_import_job(999)
+
+            import_questions_file(name=name, test_id=999, job_id=job.job_id, fmt='jsonl')
+
+            status = get_import_progress(job.job_id)
+            self.assertEqual(status['status'], 'failed')
+            self.assertIn('999', status['errors'][0]['error'])
+            self.assertFalse(default_storage.exists(name))
+
+    def test_upload_is_stored_for_the_worker(self):
+        upload = SimpleUploadedFile('questions.jsonl', jsonl(json.dumps(logical_record('q1'))))
+
+        name = store_import_file(upload, 'jsonl', storage=self.storage)
+
+        self.assertTrue(name.startswith(f'{IMPORT_STORAGE_DIR}/'))
+        self.assertTrue(name.endswith('.jsonl'))
+        records = list(iter_stored_records(name, 'jsonl', storage=self.storage))
+        self.assertEqual(records[0]['id'], 'q1')
+
+    def test_import_endpoint_is_routed(self):
+        self.client.force_login(User.objects.create_user(username='importer', password='testpass'))
+
+        response = self.client.post(reverse('scoring:import_questions'), json.dumps({
+            'test_id': self.test.id,
+            'questions_data': [logical_record('q1'), logical_record('q2', answer='')],
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['question_orders'], [1])
+        self.assertEqual(response.json()['skipped_count'], 1)
+        self.assertTrue(Question.objects.filter(test=self.test, order=1).exists())
+
+        response = self.client.post(reverse('scoring:import_questions'), json.dumps({
+            'test_id': 999, 'questions_data': [logical_record('q1')],
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,160 @@
+"""
+Tests for the server-side question sampler
+"""
+
+import random
+from array import array
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Question, Test, TestSession
+from ..services import question_sampler
+from ..services.question_sampler import QuestionPool, QuestionSampler, allocate
+from ..services.scoring_service import ScoringService
+
+
+class _FixedIndex:
+    def __init__(self, pool):
+        self._pool = pool
+
+    def pool(self, test_id):
+        return self._pool
+
+
+def make_pool(difficulties):
+    pool = QuestionPool()
+    for position, difficulty in enumerate(difficulties):
+        question_id = position + 100
+        pool.by_difficulty.setdefault(difficulty, array('q')).append(question_id)
+        pool.position[question_id] = position
+    return pool
+
+
+class QuestionSamplerTestCase(SimpleTestCase):
+    """Stratified draws from an in-memory pool"""
+
+    def setUp(self):
+        # 30 easy, 60 medium, 10 hard
+        self.pool = make_pool(['easy'] * 30 + ['medium'] * 60 + ['hard'] * 10)
+        self.sampler = QuestionSampler(index=_FixedIndex(self.pool), rng=random.Random(7))
+        self.test = SimpleNamespace(id=1, total_questions=21)
+
+    def test_allocation_is_proportional_and_exact(self):
+        self.assertEqual(allocate({'easy': 30, 'medium': 60, 'hard': 10}, 21), {'easy': 6, 'medium': 13, 'hard': 2})
+        self.assertEqual(sum(allocate({'easy': 1, 'medium': 1, 'hard': 1}, 2).values()), 2)
+        self.assertEqual(allocate({'easy': 2, 'hard': 1}, 10), {'easy': 2, 'hard': 1})
+
+    def test_draw_is_stratified_and_in_question_order(self):
+        drawn = self.sampler.draw(self.test)
+
+        self.assertEqual(len(drawn), 21)
+        self.assertEqual(len(set(drawn)), 21)
+        self.assertEqual(drawn, sorted(drawn, key=self.pool.position.__getitem__))
+        difficulties = Counter(
+            difficulty for difficulty, ids in self.pool.by_difficulty.items() for question_id in drawn if question_id in ids
+        )
+        self.assertEqual(difficulties, Counter({'easy': 6, 'medium': 13, 'hard': 2}))
+
+    def test_draws_differ_between_sessions(self):
+        self.assertNotEqual(self.sampler.draw(self.test), self.sampler.draw(self.test))
+
+    def test_small_pool_is_served_whole(self):
+        sampler = QuestionSampler(index=_FixedIndex(make_pool(['easy', 'hard'])))
+        self.assertEqual(sampler.draw(self.test), [100, 101])
+
+
+class SampledScoringTestCase(TestCase):
+    """Scoring validates against the drawn set and counts skipped drawn questions"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='sampled', password='testpass')
+        self.test = Test.objects.create(
+            title='Sampled Test', test_type='verbal_reasoning', description='Pool',
+            duration_minutes=20, total_questions=2, passing_score=70
+        )
+        self.questions = [
+            Question.objects.create(
+                test=self.test, question_type='multiple_choice', question_text=f'Question {order}',
+                options=['A', 'B', 'C', 'D'], correct_answer='A', difficulty_level='easy', order=order
+            )
+            for order in range(1, 5)
+        ]
+
+    def test_answers_outside_the_drawn_set_are_rejected(self):
+        drawn = [self.questions[0].id, self.questions[2].id]
+        with self.assertRaises(ValidationError):
+            ScoringService().score_test_submission(
+                self.user, self.test, {str(self.questions[1].id): 'A'}, 300, question_ids=drawn
+            )
+
+    def test_unanswered_drawn_questions_are_scored(self):
+        drawn = [self.questions[0].id, self.questions[2].id]
+        _, score = ScoringService().score_test_submission(
+            self.user, self.test, {str(self.questions[0].id): 'A'}, 300, question_ids=drawn
+        )
+        self.assertEqual(score.total_questions, 2)
+        self.assertEqual(score.correct_answers, 1)
+
+    def test_started_session_hides_the_answer_key(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(reverse('start-session', args=[self.test.id]))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['questions']), 2)
+        for question in response.data['questions']:
+            self.assertIn('question_text', question)
+            self.assertNotIn('correct_answer', question)
+            self.assertNotIn('explanation', question)
+
+    def test_start_then_submit_scores_the_drawn_questions(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        started = client.post(reverse('start-session', args=[self.test.id]))
+        self.assertEqual(started.status_code, 201)
+        drawn = started.data['question_ids']
+
+        response = client.post(reverse('submit-test', args=[self.test.id]), {
+            'session_id': started.data['session_id'],
+            'answers': {str(drawn[0]): 'A', str(drawn[1]): 'B'},
+            'time_taken_seconds': 120,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['status'], 'submitted')
+        session = TestSession.objects.get(pk=started.data['session_id'])
+        self.assertEqual(session.status, 'completed')
+        self.assertEqual(session.score, 50)
+        self.assertEqual(session.time_spent, 120)
+
+        # The session is closed: submitting it again is refused
+        again = client.post(reverse('submit-test', args=[self.test.id]), {
+            'session_id': session.id, 'answers': {str(drawn[0]): 'A'},
+        }, format='json')
+        self.assertEqual(again.status_code, 404)
+
+    def test_concurrent_start_retries_the_attempt_number(self):
+        TestSession.objects.create(user=self.user, test=self.test, attempt_number=1)
+        # The first read is stale, as if another start committed attempt 1 in between
+        with mock.patch.object(QuestionSampler, '_next_attempt', side_effect=[1, 2]):
+            session = QuestionSampler().start_session(self.user, self.test)
+
+        self.assertEqual(session.attempt_number, 2)
+        self.assertEqual(TestSession.objects.filter(user=self.user, test=self.test).count(), 2)
+
+    def test_start_survives_an_unreachable_cache(self):
+        question_sampler.pool_index.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(question_sampler, 'content_version', side_effect=ConnectionError('cache down')):
+            response = client.post(reverse('start-session', args=[self.test.id]))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['question_ids']), 2)
@@ -0,0 +1,137 @@
+"""
+Tests for the batch rescoring engine
+"""
+
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from ..models import Test, Question, Answer, Score, TestSubmission
+from ..services.scoring_service import ScoringService
+from ..services.rescoring import BatchRescorer, rescore_submissions
+
+
+class BatchRescorerTestCase(TestCase):
+    """Bulk rescoring must agree with ScoringService.recalculate_score"""
+
+    def setUp(self):
+        self.scoring_service = ScoringService()
+        self.test = Test.objects.create(
+            title='Rescoring Test',
+            test_type='verbal_reasoning',
+            description='Batch rescoring validation',
+            duration_minutes=20,
+            total_questions=3,
+            passing_score=70
+        )
+        self.questions = [
+            Question.objects.create(
+                test=self.test,
+                question_type='multiple_choice',
+                question_text=f'Question {order}',
+                options=['A', 'B', 'C', 'D'],
+                correct_answer=answer,
+                difficulty_level=difficulty,
+                order=order
+            )
+            for order, (answer, difficulty) in enumerate(
+                [('A', 'easy'), ('B', 'medium'), ('C', 'hard')], start=1
+            )
+        ]
+
+        self.submissions = []
+        for index in range(5):
+            user = User.objects.create_user(username=f'rescore{index}', password='testpass')
+            submission, _ = self.scoring_service.score_test_submission(
+                user, self.test,
+                {str(q.id): 'A' for q in self.questions},
+                600
+            )
+            self.submissions.append(submission)
+
+    def test_rescore_picks_up_changed_answer_key(self):
+        """Changing the correct answer rescores every submission"""
+        question = self.questions[1]
+        question.correct_answer = 'A'
+        question.save()
+
+        stats = rescore_submissions(batch_size=2)
+
+        self.assertEqual(stats.submissions, 5)
+        self.assertEqual(stats.scores_changed, 5)
+        self.assertEqual(stats.answers_changed, 5)
+        self.assertEqual(stats.batches, 3)
+
+        for submission in self.submissions:
+            score = Score.objects.get(submission=submission)
+            self.assertEqual(score.correct_answers, 2)
+            self.assertEqual(score.raw_score, Decimal('2.5'))
+            answer = Answer.objects.get(submission=submission, question=question)
+            self.assertTrue(answer.is_correct)
+
+    def test_matches_scalar_recalculation(self):
+        """Bulk path produces the same Score fields as recalculate_score"""
+        question = self.questions[2]
+        question.correct_answer = 'A'
+        question.save()
+
+        BatchRescorer(batch_size=10, end_id=self.submissions[0].id).run()
+        bulk_score = Score.objects.get(submission=self.submissions[0])
+
+        scalar_score = self.scoring_service.recalculate_score(self.submissions[1])
+
+        for field in ['raw_score', 'max_possible_score', 'percentage_score',
+                      'correct_answers', 'easy_score', 'medium_score', 'hard_score']:
+            self.assertEqual(getattr(bulk_score, field), getattr(scalar_score, field), field)
+
+    def test_second_run_writes_nothing(self):
+        """Submissions whose answers and score come out the same are skipped"""
+        rescore_submissions(batch_size=10)
+        scored_at = {s.id: s.scored_at for s in TestSubmission.objects.all()}
+
+        rescorer = BatchRescorer(batch_size=10)
+        # Submissions (plus the empty last page), answers, answer key and
+        # scores; no UPDATE or INSERT
+        with self.assertNumQueries(5):
+            stats = rescorer.run()
+
+        self.assertEqual((stats.submissions, stats.unchanged), (5, 5))
+        self.assertEqual((stats.answers_changed, stats.scores_changed, stats.scores_created), (0, 0, 0))
+        self.assertEqual({s.id: s.scored_at for s in TestSubmission.objects.all()}, scored_at)
+
+    def test_answers_to_moved_questions_match_scalar_recalculation(self):
+        """A question moved to another test is still scored, as recalculate_score does"""
+        other_test = Test.objects.create(
+            title='Other Test', test_type='verbal_reasoning', description='', duration_minutes=20,
+            total_questions=1, passing_score=70
+        )
+        question = self.questions[2]
+        question.test = other_test
+        question.correct_answer = 'A'
+        question.save()
+
+        stats = BatchRescorer(batch_size=10, end_id=self.submissions[0].id).run()
+        bulk_score = Score.objects.get(submission=self.submissions[0])
+        scalar_score = self.scoring_service.recalculate_score(self.submissions[1])
+
+        self.assertEqual(stats.answers_outside_test, 1)
+        for field in ['raw_score', 'max_possible_score', 'percentage_score', 'correct_answers', 'total_questions']:
+            self.assertEqual(getattr(bulk_score, field), getattr(scalar_score, field), field)
+
+    def test_id_range_and_dry_run(self):
+        """Id range limits the run and dry run writes nothing"""
+        question = self.questions[0]
+        question.correct_answer = 'D'
+        question.save()
+
+        stats = rescore_submissions(
+            start_id=self.submissions[1].id,
+            end_id=self.submissions[2].id,
+            dry_run=True
+        )
+
+        self.assertEqual(stats.submissions, 2)
+        self.assertEqual(stats.scores_changed, 2)
+        self.assertEqual(
+            Score.objects.get(submission=self.submissions[1]).correct_answers, 1
+        )
@@ -0,0 +1,113 @@
+"""
+Tests for the content-addressed code execution result cache
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..services.code_executor import CodeExecutor
+from ..services.result_cache import ResultCache, normalize_code, case_set_version
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+CASES = [{'input': 'n = 1', 'expected_output': '1'}, {'input': 'n = 2', 'expected_output': '1'}]
+CODE = 'def fibonacci(n):\n    return 1\n'
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ResultCacheTestCase(SimpleTestCase):
+    """Keying, storage rules and counters"""
+
+    def setUp(self):
+        cache.clear()
+        self.result_cache = ResultCache()
+
+    def test_normalization_ignores_line_endings_and_trailing_whitespace(self):
+        self.assertEqual(normalize_code('x = 1  \r\ny = 2\r\n\r\n'), 'x = 1\ny = 2')
+        version = case_set_version(CASES)
+        self.assertEqual(
+            self.result_cache.key_for('x = 1\r\n', 'python', version),
+            self.result_cache.key_for('x = 1', 'python', version)
+        )
+
+    def test_test_set_changes_the_key(self):
+        first = self.result_cache.key_for(CODE, 'python', case_set_version(CASES))
+        second = self.result_cache.key_for(CODE, 'python', case_set_version(CASES[:1]))
+        third = self.result_cache.key_for(CODE, 'python', case_set_version(CASES, grading_mode='all_or_nothing'))
+        self.assertEqual(len({first, second, third}), 3)
+
+    def test_expected_outputs_do_not_change_the_key(self):
+        changed = [{**CASES[0], 'expected_output': '2'}, CASES[1]]
+        self.assertEqual(case_set_version(CASES), case_set_version(changed))
+
+    def test_oversized_entries_are_not_stored(self):
+        self.assertFalse(ResultCache(max_entry_bytes=10).set('k', {'outcomes': [{'output': 'x' * 20}]}))
+        self.assertTrue(self.result_cache.set('k', {'outcomes': []}))
+
+    def test_hit_rate(self):
+        self.result_cache.set('k', {'outcomes': []})
+        self.result_cache.get('k')
+        self.result_cache.get('missing')
+        stats = self.result_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+
+def sandbox_reporting(executor, *outcomes):
+    """Stand-in for CodeExecutor._run_batches reporting one outcome per runnable case"""
+    def run_batches(workers, code, runnable, case_results, comparator, grading_mode, deadline, report, recorded):
+        for (index, _, expected), outcome in zip(runnable, outcomes):
+            recorded[index] = outcome
+            executor._apply_outcome(case_results[index], outcome, comparator, expected)
+    return run_batches
+
+
+RETURNS_ONE = {'ok': True, 'result': 1, 'output': '1', 'time_ms': 1, 'cpu_ms': 1, 'peak_rss_kb': 1024}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedExecutionTestCase(SimpleTestCase):
+    """Resubmissions reuse the sandbox outputs and are graded again"""
+
+    def setUp(self):
+        cache.clear()
+        self.executor = CodeExecutor(pool=mock.Mock(), result_cache=ResultCache())
+
+    def run_in_sandbox(self, *outcomes):
+        with mock.patch.object(self.executor, '_run_batches', side_effect=sandbox_reporting(self.executor, *outcomes)), \
+                mock.patch.object(self.executor, '_acquire_workers', return_value=[]):
+            return self.executor.execute_code(CODE, 'python', CASES)
+
+    def test_identical_resubmission_skips_the_sandbox(self):
+        first = self.run_in_sandbox(RETURNS_ONE, RETURNS_ONE)
+
+        reported = []
+        with mock.patch.object(self.executor, '_acquire_workers') as acquire:
+            second = self.executor.execute_code(CODE + '\n\n', 'python', CASES,
+                                                on_result=lambda i, r: reported.append(i))
+
+        acquire.assert_not_called()
+        self.assertTrue(second.cached)
+        self.assertEqual((first.status, second.status), ('accepted', 'accepted'))
+        self.assertEqual(reported, [0, 1])
+
+    def test_cached_outputs_are_graded_against_current_expected_outputs(self):
+        self.run_in_sandbox(RETURNS_ONE, RETURNS_ONE)
+        entry = cache.get(self.executor.result_cache.key_for(
+            CODE, 'python', case_set_version(CASES, grading_mode=CodeExecutor.GRADING_PARTIAL)
+        ))
+        self.assertNotIn('passed', entry['outcomes'][0])
+
+        changed = [CASES[0], {**CASES[1], 'expected_output': '2'}]
+        with mock.patch.object(self.executor, '_acquire_workers') as acquire:
+            result = self.executor.execute_code(CODE, 'python', changed)
+
+        acquire.assert_not_called()
+        self.assertTrue(result.cached)
+        self.assertEqual(result.status, 'wrong_answer')
+        self.assertEqual([t['passed'] for t in result.test_results], [True, False])
+
+    def test_timeouts_are_not_cached(self):
+        timed_out = {'ok': False, 'error': CodeExecutor.TIME_LIMIT_ERROR, 'time_ms': 5000}
+        self.assertEqual(self.run_in_sandbox(RETURNS_ONE, timed_out).status, 'time_limit_exceeded')
+        self.assertEqual(self.run_in_sandbox(RETURNS_ONE, RETURNS_ONE).status, 'accepted')
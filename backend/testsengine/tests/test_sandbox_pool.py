@@ -0,0 +1,200 @@
+"""
+Tests for the pooled code execution sandbox
+"""
+
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..services.code_executor import CodeExecutor
+from ..services.problem_spec import ProblemSpec, ProblemSpecError, grade_output, infer_problem_spec
+from ..services.sandbox_pool import SandboxError, SandboxPool, SandboxWorker
+
+
+class SandboxPoolTestCase(SimpleTestCase):
+    """Pre-started workers run every case of a submission and recover from failures"""
+
+    def setUp(self):
+        self.pool = SandboxPool(size=1, case_timeout=2, cpu_seconds=1, memory_mb=256)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_submission_loaded_once_for_all_cases(self):
+        worker = self.pool.acquire()
+        try:
+            self.assertTrue(worker.load("calls = []\ndef fibonacci(n):\n    calls.append(n)\n    return len(calls)\n", 2)['ok'])
+            outputs = [worker.call('fibonacci', [n], 2)['output'] for n in range(3)]
+        finally:
+            self.pool.release(worker)
+        self.assertEqual(outputs, ['1', '2', '3'])
+
+    def test_print_does_not_break_protocol(self):
+        worker = self.pool.acquire()
+        try:
+            worker.load("import os\ndef f():\n    os.write(1, b'noise')\n    print('hi')\n    return 5\n", 2)
+            response = worker.call('f', [], 2)
+        finally:
+            self.pool.release(worker)
+        self.assertEqual(response['output'], '5')
+        self.assertEqual(response['stdout'], 'hi\n')
+
+    def test_resource_usage_reported_per_case(self):
+        worker = self.pool.acquire()
+        try:
+            worker.load("def f(mb):\n    return len(bytearray(mb * 1024 * 1024))\n", 2)
+            large = worker.call('f', [64], 2)
+            small = worker.call('f', [1], 2)
+        finally:
+            self.pool.release(worker)
+        self.assertGreaterEqual(large['cpu_ms'], 0)
+        self.assertGreater(large['peak_rss_kb'], 64 * 1024)
+        self.assertLess(small['peak_rss_kb'], large['peak_rss_kb'])
+
+    def test_cpu_limit_reported_with_usage(self):
+        worker = self.pool.acquire()
+        try:
+            worker.load("def f():\n    while True:\n        pass\n", 2)
+            with self.assertRaises(SandboxError) as context:
+                worker.call('f', [], 10)
+        finally:
+            self.pool.release(worker)
+        self.assertEqual(str(context.exception), 'Time limit exceeded')
+        self.assertGreater(context.exception.cpu_ms, 500)
+
+    def test_non_blocking_acquire(self):
+        worker = self.pool.acquire()
+        try:
+            self.assertIsNone(self.pool.acquire(blocking=False))
+        finally:
+            self.pool.release(worker)
+
+    def test_run_batch_reports_raw_results(self):
+        worker = self.pool.acquire()
+        try:
+            worker.load("import time\ndef f(x):\n    if x < 0:\n        time.sleep(5)\n    return (x, x)\n", 2)
+            frames = list(worker.run_batch('f', [{'args': [1]}, {'args': [-1]}, {'args': [2]}],
+                                           case_timeout=0.5, timeout=5))
+        finally:
+            self.pool.release(worker)
+        self.assertEqual([frame['case'] for frame in frames], [0, 1, 2])
+        self.assertEqual([frame.get('result') for frame in frames], [[1, 1], None, [2, 2]])
+        self.assertNotIn('passed', frames[0])
+        self.assertEqual(frames[1]['error'], 'Time limit exceeded')
+        self.assertEqual(frames[0]['output'], '(1, 1)')
+
+    def test_forged_frames_end_the_batch(self):
+        code = (
+            "import gc, io, json, struct\n"
+            "def f(x):\n"
+            "    channel = next(o for o in gc.get_objects() if isinstance(o, io.BufferedWriter) and o.fileno() > 2)\n"
+            "    frame = json.dumps({'ok': True, 'case': 5, 'result': 1, 'output': '1'}).encode()\n"
+            "    channel.write(struct.pack('>I', len(frame)) + frame)\n"
+            "    channel.flush()\n"
+            "    return x\n"
+        )
+        worker = self.pool.acquire()
+        try:
+            worker.load(code, 2)
+            with self.assertRaises(SandboxError) as context:
+                list(worker.run_batch('f', [{'args': [1]}, {'args': [2]}], case_timeout=1, timeout=5))
+            self.assertFalse(worker.alive)
+        finally:
+            self.pool.release(worker)
+        self.assertEqual(str(context.exception), 'Sandbox protocol error')
+
+    def test_timeout_kills_worker(self):
+        worker = self.pool.acquire()
+        try:
+            worker.load("import time\ndef f():\n    time.sleep(10)\n", 2)
+            with self.assertRaises(SandboxError):
+                worker.call('f', [], 0.5)
+            self.assertFalse(worker.alive)
+            worker = self.pool.replace(worker)
+            self.assertTrue(worker.load("def f():\n    return 1\n", 2)['ok'])
+        finally:
+            self.pool.release(worker)
+
+    def test_worker_retired_after_each_submission(self):
+        pids = []
+        for _ in range(3):
+            worker = self.pool.acquire()
+            worker.load("def f():\n    return 1\n", 2)
+            pids.append(worker.pid)
+            self.pool.release(worker)
+        self.assertEqual(len(set(pids)), 3)
+
+    @mock.patch.dict(os.environ, {'SECRET_KEY': 'not-for-candidates'})
+    def test_worker_environment_is_minimal(self):
+        worker = SandboxWorker(cpu_seconds=1, memory_mb=256)
+        try:
+            worker.load("import os\ndef f():\n    return sorted(os.environ)\n", 2)
+            response = worker.call('f', [], 2)
+        finally:
+            worker.kill()
+        self.assertNotIn('SECRET_KEY', response['output'])
+        self.assertIn('PATH', response['output'])
+
+
+class SandboxGradingTestCase(SimpleTestCase):
+    """Submissions are graded in this process, whatever they do to the sandbox"""
+
+    def setUp(self):
+        self.pool = SandboxPool(size=1, case_timeout=2, cpu_seconds=1, memory_mb=256)
+        self.executor = CodeExecutor(pool=self.pool, use_result_cache=False)
+        self.spec = {'entry': 'double', 'args': [{'name': 'x', 'type': 'int'}], 'comparator': 'exact'}
+        self.cases = [{'input': [1], 'expected_output': '2'}, {'input': [2], 'expected_output': '4'}]
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_patched_comparators_do_not_change_the_verdict(self):
+        code = (
+            "import sys\n"
+            "for module in list(sys.modules.values()):\n"
+            "    if hasattr(module, 'COMPARATORS'):\n"
+            "        module.COMPARATORS['exact'] = lambda actual, expected: True\n"
+            "def double(x):\n"
+            "    return 0\n"
+        )
+        result = self.executor.execute_code(code, 'python', self.cases, problem_spec=self.spec)
+        self.assertEqual(result.status, 'wrong_answer')
+        self.assertEqual([t['passed'] for t in result.test_results], [False, False])
+
+        # A fresh worker grades the next submission of the same problem normally
+        result = self.executor.execute_code("def double(x):\n    return x * 2\n", 'python', self.cases,
+                                            problem_spec=self.spec)
+        self.assertEqual(result.status, 'accepted')
+
+    def test_grade_output(self):
+        self.assertTrue(grade_output('exact', [1, 2], '(1, 2)', [1, 2]))
+        self.assertTrue(grade_output('unordered', [2, 1], '[2, 1]', [1, 2]))
+        self.assertTrue(grade_output('text', [1, 2], '(1, 2)', '(1, 2)'))
+        self.assertFalse(grade_output('float', 0.5, '0.5', 0.6))
+
+
+class ProblemSpecTestCase(SimpleTestCase):
+    """Test case inputs are parsed against the argument schema"""
+
+    spec = ProblemSpec.from_dict({
+        'entry': 'rotate',
+        'args': [{'name': 'nums', 'type': 'list[int]'}, {'name': 'k', 'type': 'int'}],
+    })
+
+    def test_input_forms(self):
+        self.assertEqual(self.spec.parse_args('nums = [1, 2, 3], k = 1'), [[1, 2, 3], 1])
+        self.assertEqual(self.spec.parse_args({'nums': [1], 'k': 2}), [[1], 2])
+        self.assertEqual(self.spec.parse_args([[4], 0]), [[4], 0])
+
+    def test_type_mismatch(self):
+        with self.assertRaises(ProblemSpecError):
+            self.spec.parse_args([[1, True], 1])
+        with self.assertRaises(ProblemSpecError):
+            self.spec.parse_args('nums = [1], k = "2"')
+
+    def test_legacy_inputs(self):
+        self.assertEqual(infer_problem_spec('nums = [2, 7], target = 9').entry, 'two_sum')
+        self.assertEqual(infer_problem_spec('s = "radar"').parse_args('s = "radar"'), ['radar'])
+        self.assertEqual(infer_problem_spec('n = 5').entry, 'fibonacci')
+        self.assertIsNone(infer_problem_spec('x = 1'))
@@ -0,0 +1,93 @@
+"""
+Tests for the universal scoring models
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models_scoring import QuestionResponse, TestResult, UniversalQuestion, UniversalTestSession
+
+
+def per_row_totals(session):
+    """TestResult statistics computed response by response, as before the single-query version"""
+    responses = session.responses.all()
+    totals = {
+        'total_questions': responses.count(),
+        'answered_questions': responses.filter(user_answer__isnull=False).count(),
+        'correct_answers': responses.filter(is_correct=True).count(),
+        'total_score': sum(response.calculated_score for response in responses),
+        'max_possible_score': sum(
+            response.question.base_score + (response.question.difficulty * float(response.question.difficulty_bonus))
+            for response in responses
+        ),
+        'total_time_seconds': int(sum(float(response.time_taken) for response in responses)),
+    }
+    totals['percentage'] = (Decimal(totals['total_score']) / Decimal(totals['max_possible_score'])) * 100
+    totals['average_time_per_question'] = (
+        Decimal(totals['total_time_seconds']) / Decimal(totals['answered_questions'])
+    )
+
+    breakdown = {}
+    for difficulty in range(1, 6):
+        difficulty_responses = responses.filter(question__difficulty=difficulty)
+        if difficulty_responses.exists():
+            total = difficulty_responses.count()
+            correct = difficulty_responses.filter(is_correct=True).count()
+            breakdown[difficulty] = {
+                'total': total,
+                'correct': correct,
+                'accuracy': (correct / total * 100) if total > 0 else 0
+            }
+    totals['difficulty_breakdown'] = breakdown
+    return totals
+
+
+class TestResultCalculationTestCase(TestCase):
+    """calculate_from_responses reads the responses once and keeps the per-row totals"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='scoring-models', password='testpass')
+        self.session = UniversalTestSession.objects.create(
+            user=self.user, test_id='LRT1', test_type='logical', started_at=timezone.now()
+        )
+        for index in range(12):
+            difficulty = index % 5 + 1
+            question = UniversalQuestion.objects.create(
+                id=f'lrt1_{index}', question_type='logical', question_text=f'Question {index}',
+                correct_answer='A', difficulty=difficulty, base_score=5 + index % 3,
+                difficulty_bonus=Decimal('1.5'),
+            )
+            is_correct = index % 3 != 0
+            QuestionResponse.objects.create(
+                session=self.session, question=question, user_answer='A' if is_correct else 'B',
+                time_taken=Decimal('20.5') + index, is_correct=is_correct,
+                calculated_score=question.base_score + difficulty if is_correct else 0,
+            )
+
+    def test_matches_per_row_computation(self):
+        expected = per_row_totals(self.session)
+        result = TestResult(session=self.session)
+
+        # One SELECT for the responses and their questions, one INSERT
+        with self.assertNumQueries(2):
+            result.calculate_from_responses()
+
+        for field, value in expected.items():
+            self.assertEqual(getattr(result, field), value, field)
+        self.assertTrue(result.grade)
+        self.assertTrue(result.recommendations)
+
+    def test_query_count_does_not_grow_with_responses(self):
+        for index in range(12, 40):
+            question = UniversalQuestion.objects.create(
+                id=f'lrt1_{index}', question_type='logical', question_text=f'Question {index}', correct_answer='A'
+            )
+            QuestionResponse.objects.create(
+                session=self.session, question=question, user_answer='A', time_taken=Decimal('10')
+            )
+
+        with self.assertNumQueries(2):
+            TestResult(session=self.session).calculate_from_responses()
@@ -0,0 +1,204 @@
+"""
+Property tests for the vectorized batch scorer against the scalar scoring path
+"""
+
+import random
+from django.test import SimpleTestCase
+
+from ..scoring_system import (
+    UniversalScoringSystem, GlobalScoringConfig, QuestionType, ScoreWeight,
+    TimeEfficiencyCalculator, create_question
+)
+from ..scoring_vectorized import VectorizedBatchScorer, round_half_up
+
+
+class VectorizedBatchScorerPropertyTestCase(SimpleTestCase):
+    """calculate_batch_scores must equal calculate_score for every question"""
+
+    TRIALS = 500
+
+    def _random_config(self, rng):
+        weights = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+        return GlobalScoringConfig(
+            time_weight=rng.choice(weights + [rng.random()]),
+            difficulty_weight=rng.choice(weights + [rng.random()]),
+            accuracy_weight=rng.choice(weights + [rng.random()])
+        )
+
+    def _random_time(self, rng, question_type, difficulty):
+        thresholds = TimeEfficiencyCalculator.TIME_THRESHOLDS[question_type]
+        multiplier = TimeEfficiencyCalculator.DIFFICULTY_TIME_MULTIPLIERS[difficulty]
+        boundary = rng.choice(list(thresholds.values())) * multiplier
+        # Exercise band boundaries exactly, just above them, negatives and zero
+        return rng.choice([boundary, boundary + 1e-9, rng.uniform(-5, 700), 0.0])
+
+    def test_batch_matches_scalar(self):
+        rng = random.Random(20240927)
+        question_types = [qt.value for qt in QuestionType]
+
+        for _ in range(self.TRIALS):
+            system = UniversalScoringSystem(self._random_config(rng))
+            questions, answers, times = [], {}, {}
+
+            for index in range(rng.randint(2, 25)):
+                question_type = rng.choice(question_types)
+                difficulty = rng.randint(1, 5)
+                question = create_question(
+                    id=f"q_{index}",
+                    type=question_type,
+                    question="Property test question",
+                    correct_answer="a",
+                    difficulty=difficulty,
+                    score_weight=ScoreWeight(
+                        base=rng.choice([1, 3, 5, 10]),
+                        difficulty_bonus=rng.choice([0.5, 1.0, 2.0, 2.5, rng.uniform(0, 5)])
+                    )
+                )
+                questions.append(question)
+                answers[question.id] = rng.choice(["a", "b"])
+                times[question.id] = self._random_time(rng, question.type, difficulty)
+
+            expected = {
+                q.id: system.calculate_score(q, answers[q.id], times[q.id])
+                for q in questions
+            }
+            self.assertEqual(system.calculate_batch_scores(questions, answers, times), expected)
+
+    def test_round_half_up_matches_decimal(self):
+        values = [0.5, 1.5, 2.5, 2.4999999999999996, 0.49999999999999994, 3.0000000000000004, 7.2]
+        self.assertEqual(list(round_half_up(values)), [1, 2, 3, 2, 0, 3, 7])
+
+    def test_efficiency_bands(self):
+        scorer = VectorizedBatchScorer()
+        mc = VectorizedBatchScorer.type_indices([QuestionType.MULTIPLE_CHOICE] * 6)
+        efficiency = scorer.efficiency([-1, 12, 24, 48, 96, 97], [1] * 6, mc)
+        self.assertEqual(list(efficiency), [0.0, 2.0, 1.5, 1.0, 0.5, 0.2])
+
+    def test_custom_threshold_tables(self):
+        """Per-config tables are precomputed and shared by scalar and batch paths"""
+        config = GlobalScoringConfig(
+            time_thresholds={'numerical': {'excellent': 5, 'good': 10, 'average': 20, 'slow': 40}},
+            difficulty_time_multipliers={1: 1.0}
+        )
+        system = UniversalScoringSystem(config)
+        calculator = system.time_calculator
+
+        self.assertEqual(calculator.adjusted_thresholds[(QuestionType.NUMERICAL, 1)], (5, 10, 20, 40))
+        self.assertEqual(calculator.efficiency(6, 1, QuestionType.NUMERICAL), 1.5)
+        self.assertEqual(TimeEfficiencyCalculator.calculate_efficiency(6, 1, QuestionType.NUMERICAL), 2.0)
+        self.assertEqual(
+            list(calculator.efficiency_array([4, 6, 41], [1, 1, 1], [QuestionType.NUMERICAL] * 3)),
+            [2.0, 1.5, 0.2]
+        )
+
+    def test_unsorted_thresholds_rejected(self):
+        with self.assertRaises(ValueError):
+            TimeEfficiencyCalculator({'verbal': {'excellent': 50, 'good': 10, 'average': 20, 'slow': 40}})
+
+
+def _reference_efficiency(time_taken, difficulty, question_type, time_thresholds, multipliers):
+    """The pre-table if/elif efficiency loop, kept as an oracle for the bisect lookup"""
+    if time_taken < 0:
+        return 0.0
+    thresholds = time_thresholds.get(question_type, time_thresholds[QuestionType.MULTIPLE_CHOICE])
+    multiplier = multipliers.get(difficulty, 1.0)
+    adjusted = {key: value * multiplier for key, value in thresholds.items()}
+    if time_taken <= adjusted["excellent"]:
+        return 2.0
+    elif time_taken <= adjusted["good"]:
+        return 1.5
+    elif time_taken <= adjusted["average"]:
+        return 1.0
+    elif time_taken <= adjusted["slow"]:
+        return 0.5
+    else:
+        return 0.2
+
+
+class TimeEfficiencyTableTestCase(SimpleTestCase):
+    """The precomputed tables and bisect lookup must agree with the original loop"""
+
+    CUSTOM_THRESHOLDS = {
+        QuestionType.NUMERICAL: {'excellent': 5, 'good': 10, 'average': 20, 'slow': 40},
+        QuestionType.VERBAL: {'excellent': 7.5, 'good': 7.5, 'average': 30, 'slow': 31},
+    }
+    CUSTOM_MULTIPLIERS = {1: 1.0, 3: 1.1, 5: 3.0, 6: 4.0}
+
+    def _boundary_times(self, thresholds, multiplier):
+        times = [-1.0, 0.0]
+        for value in thresholds.values():
+            boundary = value * multiplier
+            times.extend([boundary, boundary - 1e-9, boundary + 1e-9])
+        return times
+
+    def _assert_matches_reference(self, efficiency, time_thresholds, multipliers):
+        # Unrecognised types fall back to multiple choice thresholds
+        for question_type in list(QuestionType) + ['unknown']:
+            # Difficulties without a configured multiplier (0, 7) fall back to 1.0
+            for difficulty in range(0, 8):
+                thresholds = time_thresholds.get(question_type, time_thresholds[QuestionType.MULTIPLE_CHOICE])
+                for time_taken in self._boundary_times(thresholds, multipliers.get(difficulty, 1.0)):
+                    self.assertEqual(
+                        efficiency(time_taken, difficulty, question_type),
+                        _reference_efficiency(time_taken, difficulty, question_type, time_thresholds, multipliers),
+                        (question_type, difficulty, time_taken)
+                    )
+
+    def test_default_table_matches_loop_at_boundaries(self):
+        self._assert_matches_reference(
+            TimeEfficiencyCalculator.calculate_efficiency,
+            TimeEfficiencyCalculator.TIME_THRESHOLDS,
+            TimeEfficiencyCalculator.DIFFICULTY_TIME_MULTIPLIERS
+        )
+
+    def test_custom_table_matches_loop_at_boundaries(self):
+        calculator = TimeEfficiencyCalculator(self.CUSTOM_THRESHOLDS, self.CUSTOM_MULTIPLIERS)
+        time_thresholds = dict(TimeEfficiencyCalculator.TIME_THRESHOLDS)
+        time_thresholds.update(self.CUSTOM_THRESHOLDS)
+        multipliers = dict(TimeEfficiencyCalculator.DIFFICULTY_TIME_MULTIPLIERS)
+        multipliers.update(self.CUSTOM_MULTIPLIERS)
+        self._assert_matches_reference(calculator.efficiency, time_thresholds, multipliers)
+
+    def test_custom_config_changes_tables(self):
+        config = GlobalScoringConfig(
+            time_thresholds={'numerical': self.CUSTOM_THRESHOLDS[QuestionType.NUMERICAL]},
+            difficulty_time_multipliers={'5': 3.0}
+        )
+        calculator = UniversalScoringSystem(config).time_calculator
+        default = UniversalScoringSystem().time_calculator
+
+        self.assertIsNot(calculator.adjusted_thresholds, TimeEfficiencyCalculator.ADJUSTED_THRESHOLDS)
+        self.assertIs(default.adjusted_thresholds, TimeEfficiencyCalculator.ADJUSTED_THRESHOLDS)
+        self.assertEqual(calculator.adjusted_thresholds[(QuestionType.NUMERICAL, 2)], (5, 10, 20, 40))
+        self.assertEqual(calculator.adjusted_thresholds[(QuestionType.VERBAL, 5)], (135, 270, 360, 540))
+        # Untouched cells keep the built-in values and the class table is not mutated
+        self.assertEqual(
+            calculator.adjusted_thresholds[(QuestionType.VERBAL, 2)],
+            TimeEfficiencyCalculator.ADJUSTED_THRESHOLDS[(QuestionType.VERBAL, 2)]
+        )
+        self.assertEqual(TimeEfficiencyCalculator.ADJUSTED_THRESHOLDS[(QuestionType.NUMERICAL, 2)], (30, 60, 90, 150))
+
+    def test_custom_config_changes_scores(self):
+        question = create_question(
+            id="q_1", type="numerical", question="2 + 2", correct_answer="4", difficulty=2
+        )
+        weights = dict(time_weight=0.5, difficulty_weight=0.3, accuracy_weight=0.2)
+        strict = GlobalScoringConfig(
+            time_thresholds={'numerical': self.CUSTOM_THRESHOLDS[QuestionType.NUMERICAL]}, **weights
+        )
+
+        default_breakdown = UniversalScoringSystem(GlobalScoringConfig(**weights)).get_score_breakdown(question, "4", 25)
+        strict_breakdown = UniversalScoringSystem(strict).get_score_breakdown(question, "4", 25)
+        self.assertEqual(default_breakdown["breakdown"]["time_efficiency"], 2.0)
+        self.assertEqual(strict_breakdown["breakdown"]["time_efficiency"], 0.5)
+
+        times = {"q_1": 25, "q_2": 25}
+        answers = {"q_1": "4", "q_2": "4"}
+        questions = [question, create_question(
+            id="q_2", type="numerical", question="3 + 1", correct_answer="4", difficulty=2
+        )]
+        system = UniversalScoringSystem(strict)
+        self.assertEqual(
+            system.calculate_batch_scores(questions, answers, times),
+            {q.id: system.calculate_score(q, "4", 25) for q in questions}
+        )
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views, test_history_views, health_views
+from . import views, test_history_views, health_views, code_execution_views
 
 # Create a router for API versioning in the future
 router = DefaultRouter()
@@ -14,11 +14,14 @@ urlpatterns = [
     # ========================================
     path('api/health/', health_views.testsengine_health_check, name='health-check'),
     path('api/status/', health_views.testsengine_status, name='testsengine-status'),
+    path('api/status/query-profiles/<str:profile_id>/', health_views.query_profile_detail, name='query-profile-detail'),
+    path('api/status/slow-queries/', health_views.slow_query_report, name='slow-query-report'),
 
     # ========================================
     # CORE TEST MANAGEMENT ENDPOINTS
     # ========================================
     path('api/tests/', views.TestListView.as_view(), name='test-list'),
+    path('api/tests/metadata/', views.get_tests_metadata, name='test-metadata'),
     path('api/tests/<int:pk>/', views.TestDetailView.as_view(), name='test-detail'),
     path('api/tests/<int:test_id>/questions/', views.TestQuestionsView.as_view(), name='test-questions'),
 
@@ -37,6 +40,12 @@ urlpatterns = [
     path('api/test-sessions/<int:session_id>/', test_history_views.get_session_details, name='session-detail'),
     path('api/test-sessions/<int:test_id>/start/', test_history_views.start_test_session, name='start-session'),
 
+    # ========================================
+    # CODE EXECUTION ENDPOINTS
+    # ========================================
+    path('api/code-executions/', code_execution_views.submit_code_execution, name='code-execution-submit'),
+    path('api/code-executions/<str:job_id>/', code_execution_views.get_code_execution, name='code-execution-detail'),
+
     # ========================================
     # ADDITIONAL ENDPOINTS FOR FUTURE FEATURES
     # ========================================
@@ -20,6 +20,7 @@ urlpatterns = [
  # Question management
  path('question/<str:question_id>/', views_scoring.get_question_details, name='get_question'),
  path('import-questions/', views_scoring.ImportQuestionsView.as_view(), name='import_questions'),
+ path('import-questions/<str:job_id>/', views_scoring.get_import_status, name='import_status'),
 
  # Session status
  path('session/<int:session_id>/status/', views_scoring.get_session_status, name='session_status'),
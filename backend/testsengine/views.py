@@ -4,32 +4,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 
-try:
-    from .models import Test, Question, UserTest, TestResult
-    from .serializers import TestListSerializer, TestDetailSerializer, QuestionSerializer
-    from .scoring.config import ScoringConfig
-except ImportError as e:
-    # Create minimal fallback classes if models don't exist
-    class Test:
-        pass
-    class Question:
-        pass
-    class UserTest:
-        pass
-    class TestResult:
-        pass
-    
-    class TestListSerializer:
-        pass
-    class TestDetailSerializer:
-        pass
-    class QuestionSerializer:
-        pass
-    
-    class ScoringConfig:
-        def __init__(self):
-            pass
+from .services.catalogue_cache import combine, get_payload, get_payloads, payload_response
+from .services.query_optimizer import monitor_query
+from .services.scoring_service import ScoringService
+
+from .models import Test, Question, TestSession
+from .serializers import TestListSerializer, TestDetailSerializer, QuestionSerializer
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -37,6 +20,8 @@ logger = logging.getLogger(__name__)
 class TestListView(generics.ListAPIView):
     """
     List all active tests available for taking.
+
+    Served pre-serialized from the catalogue cache with ETag/Last-Modified.
     """
     serializer_class = TestListSerializer
     permission_classes = []  # Allow unauthenticated access
@@ -51,20 +36,21 @@ class TestListView(generics.ListAPIView):
         except:
             return Test.objects.none()
 
+    @monitor_query('test_catalogue')
+    def build_catalogue(self):
+        return {
+            'tests': self.get_serializer(self.get_queryset(), many=True).data,
+            # Add scoring configuration for transparency
+            'scoring_info': {
+                'version': '1.0',
+                'methodology': 'comprehensive'
+            }
+        }
+
     def list(self, request, *args, **kwargs):
         """Add metadata to the response"""
         try:
-            response = super().list(request, *args, **kwargs)
-            # Add scoring configuration for transparency
-            config = ScoringConfig()
-            response.data = {
-                'tests': response.data,
-                'scoring_info': {
-                    'version': '1.0',
-                    'methodology': 'comprehensive'
-                }
-            }
-            return response
+            return payload_response(request, get_payload('list', self.build_catalogue))
         except Exception as e:
             logger.error(f"Error in TestListView: {e}")
             return Response({'tests': [], 'error': 'Failed to load tests'})
@@ -84,7 +70,7 @@ class TestDetailView(generics.RetrieveAPIView):
 
 class TestQuestionsView(generics.ListAPIView):
     """
-    Get questions for a specific test.
+    Get questions for a specific test (pre-serialized, with ETag/Last-Modified).
     """
     serializer_class = QuestionSerializer
     permission_classes = []  # Allow unauthenticated access
@@ -96,6 +82,45 @@ class TestQuestionsView(generics.ListAPIView):
         except:
             return Question.objects.none()
 
+    @monitor_query('test_questions')
+    def build_questions(self):
+        return self.get_serializer(self.get_queryset(), many=True).data
+
+    def list(self, request, *args, **kwargs):
+        name = f"questions:{self.kwargs.get('test_id')}"
+        return payload_response(request, get_payload(name, self.build_questions))
+
+
+# Upper bound on ?ids= of the bulk metadata endpoint
+MAX_METADATA_IDS = 100
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_tests_metadata(request):
+    """
+    Metadata of several active tests at once: ?ids=1,2,3
+
+    Returns {"<id>": {...}} for the tests found; each entry is cached on
+    its own, so one request costs one cache round trip and at most one
+    query for the entries not cached yet.
+    """
+    try:
+        ids = list(dict.fromkeys(int(value) for value in request.query_params.get('ids', '').split(',') if value))
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of integers'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not ids or len(ids) > MAX_METADATA_IDS:
+        return Response({'error': f'Pass between 1 and {MAX_METADATA_IDS} ids'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    def build_missing(names):
+        tests = Test.objects.filter(id__in=[int(name) for name in names], is_active=True)
+        return {str(test.id): TestListSerializer(test).data for test in tests}
+
+    payloads = get_payloads([str(test_id) for test_id in ids], build_missing)
+    return payload_response(request, combine(payloads))
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def test_health_check(request):
@@ -109,14 +134,44 @@ def test_health_check(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def submit_test(request, test_id):
-    """Submit test answers"""
+    """
+    Submit test answers: {"answers": {"<question_id>": "A"}, "time_taken_seconds": 600, "session_id": 12}
+
+    With the session_id of a session from start-session, answers must
+    belong to the questions drawn for it and all of those are scored.
+    """
+    test = get_object_or_404(Test, id=test_id, is_active=True)
+    session = None
+    drawn_ids = None
+    if request.data.get('session_id'):
+        session = get_object_or_404(
+            TestSession, id=request.data['session_id'], user=request.user, test=test, status='in_progress'
+        )
+        drawn_ids = session.question_ids or None
+
     try:
-        test = get_object_or_404(Test, id=test_id, is_active=True)
+        answers = request.data.get('answers') or {}
+        time_taken = int(request.data.get('time_taken_seconds', 0))
+        service = ScoringService()
+        submission, score = service.score_test_submission(
+            request.user, test, answers, time_taken, question_ids=drawn_ids
+        )
+        if session is not None:
+            session.status = 'completed'
+            session.end_time = timezone.now()
+            session.score = round(score.percentage_score)
+            session.answers = answers
+            session.time_spent = time_taken
+            session.save(update_fields=['status', 'end_time', 'score', 'answers', 'time_spent'])
         return Response({
             'status': 'submitted',
             'test_id': test_id,
+            'submission_id': submission.id,
+            'score': service.get_score_summary(score),
             'message': 'Test submitted successfully'
         })
+    except (ValidationError, ValueError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.error(f"Error submitting test: {e}")
         return Response(